@@ -0,0 +1,31 @@
+"""
+Tests for bulk get_many / set_many / delete_many.
+"""
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_set_many_get_many_preserves_order(valkey_client):
+    mapping = {f"bulk_{i}": {"i": i} for i in range(50)}
+    assert await valkey_client.set_many(mapping) is True
+    keys = list(reversed(list(mapping))) + ["bulk_missing"]
+    values = await valkey_client.get_many(keys)
+    assert values[:-1] == [mapping[k] for k in keys[:-1]]
+    assert values[-1] is None
+
+
+@pytest.mark.asyncio
+async def test_set_many_with_shared_and_per_key_ttl(valkey_client):
+    await valkey_client.set_many({"ttl_a": 1, "ttl_b": 2}, ex=60)
+    assert 0 < await valkey_client.ttl("ttl_a") <= 60
+    await valkey_client.set_many({"ttl_c": 1, "ttl_d": 2}, ex={"ttl_c": 30})
+    assert 0 < await valkey_client.ttl("ttl_c") <= 30
+    assert await valkey_client.ttl("ttl_d") == -1
+
+
+@pytest.mark.asyncio
+async def test_delete_many_counts_deleted_keys(valkey_client):
+    await valkey_client.set_many({"del_a": 1, "del_b": 2, "del_c": 3})
+    assert await valkey_client.delete_many(["del_a", "del_b", "del_missing"]) == 2
+    assert await valkey_client.get_many(["del_a", "del_c"]) == [None, 3]
+    assert await valkey_client.delete_many([]) == 0
@@ -36,3 +36,15 @@ async def test_race_conditions(valkey_client):
         *[cache.get_or_set("race_key", value_fn) for _ in range(10)]
     )
     assert all(r == "value" for r in results)
+
+@pytest.mark.asyncio
+async def test_large_values_are_compressed(valkey_client):
+    """Values above the threshold are stored compressed and read back transparently"""
+    cache = ValkeyCache(valkey_client, compression="zlib", compress_threshold=1024)
+    payload = "x" * 200_000
+    await cache.set("big_key", payload, ttl=10)
+    raw = await (await valkey_client.get_client()).get("big_key")
+    assert len(raw) < len(payload) // 10
+    assert await cache.get("big_key") == payload
+    await cache.set("small_key", "tiny", ttl=10)
+    assert await (await valkey_client.get_client()).get("small_key") == b"tiny"
@@ -0,0 +1,54 @@
+"""
+Tests for the vapi Valkey Functions library.
+"""
+import time
+import uuid
+
+import pytest
+
+from app.core.valkey_core.functions import LIBRARY_NAME, LIBRARY_VERSION
+
+
+@pytest.mark.asyncio
+async def test_ensure_functions_loads_and_upgrades_library(valkey_client):
+    raw = await valkey_client.get_client()
+    try:
+        await raw.function_delete(LIBRARY_NAME)
+    except Exception:
+        pass
+    assert set((await valkey_client.ensure_functions()).values()) == {0}
+    # Already current: nothing to upgrade
+    assert set((await valkey_client.ensure_functions()).values()) == {LIBRARY_VERSION}
+    assert await valkey_client.fcall("vapi_version", read_only=True) == LIBRARY_VERSION
+
+
+@pytest.mark.asyncio
+async def test_fcall_rate_limit_primitives(valkey_client):
+    key = f"fn:{uuid.uuid4()}"
+    now = int(time.time())
+    assert await valkey_client.fcall("vapi_fixed_window", keys=[key], args=[10]) == 1
+    assert await valkey_client.fcall("vapi_fixed_window", keys=[key], args=[10]) == 2
+    count, pttl = await valkey_client.fcall("vapi_window_count", keys=[key], read_only=True)
+    assert count == 2 and 0 < pttl <= 10000
+
+    bucket = f"fn:{uuid.uuid4()}"
+    results = [
+        await valkey_client.fcall("vapi_token_bucket", keys=[bucket], args=[2, 1, 60, now])
+        for _ in range(3)
+    ]
+    assert results == [1, 1, 0]
+
+    throttle = f"fn:{uuid.uuid4()}"
+    assert await valkey_client.fcall("vapi_throttle", keys=[throttle], args=[10, now]) == 1
+    assert await valkey_client.fcall("vapi_throttle", keys=[throttle], args=[10, now]) == 0
+
+
+@pytest.mark.asyncio
+async def test_fcall_loads_library_when_missing(valkey_client):
+    raw = await valkey_client.get_client()
+    await valkey_client.ensure_functions()
+    await raw.function_delete(LIBRARY_NAME)
+    key = f"fn:{uuid.uuid4()}"
+    await raw.set(key, "v")
+    value, pttl = await valkey_client.fcall("vapi_cache_peek", keys=[key], read_only=True)
+    assert value == b"v" and pttl == -1
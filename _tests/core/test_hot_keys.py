@@ -0,0 +1,209 @@
+"""
+Tests for sampled hot-key detection.
+"""
+import pytest
+
+from app.core.valkey_core import hotkeys
+from app.core.valkey_core.client import ValkeyClient
+from app.core.valkey_core.config import ValkeyConfig
+from app.core.valkey_core.hotkeys import HotKeyMitigation, HotKeyTracker, SpaceSavingSketch
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(hotkeys.time, "monotonic", clock)
+    return clock
+
+
+def _steady_reads(tracker: HotKeyTracker, clock: _Clock, seconds: float, per_second: int) -> list[float]:
+    rates = []
+    for _ in range(int(seconds * per_second)):
+        clock.now += 1 / per_second
+        rate = tracker.record("get", "steady:key")
+        if rate is not None:
+            rates.append(rate)
+    return rates
+
+
+def test_space_saving_keeps_heavy_hitters_in_bounded_memory():
+    sketch = SpaceSavingSketch(capacity=10)
+    for i in range(5000):
+        sketch.add("hot" if i % 4 == 0 else f"cold:{i}")
+    assert len(sketch.counts) == 10
+    key, count, error = sketch.top(1)[0]
+    assert key == "hot"
+    assert count - error <= 1250 <= count
+
+
+def test_tracker_groups_by_namespace_and_command():
+    tracker = HotKeyTracker(sample_every=1, capacity=16, export_top=0)
+    for _ in range(50):
+        tracker.record("get", "user:1")
+    for _ in range(20):
+        tracker.record("incr", "rate:abc")
+    assert tracker.hot_keys(limit=1)[0]["key"] == "user:1"
+    assert [e["key"] for e in tracker.hot_keys(namespace="rate")] == ["rate:abc"]
+    assert tracker.hot_keys(command="set") == []
+
+
+@pytest.mark.asyncio
+async def test_client_reports_hot_keys(valkey_client, monkeypatch):
+    monkeypatch.setattr(ValkeyConfig, "VALKEY_HOT_KEYS_ENABLED", True)
+    monkeypatch.setattr(ValkeyConfig, "VALKEY_HOT_KEYS_SAMPLE_EVERY", 1)
+    client = ValkeyClient()
+    try:
+        await client.set("hot:key", "v")
+        for _ in range(10):
+            await client.get("hot:key")
+        await client.get("hot:other")
+        top = client.hot_keys(namespace="hot", command="get")
+        assert top[0]["key"] == "hot:key" and top[0]["count"] == 10
+    finally:
+        await client.delete("hot:key")
+        await client.shutdown()
+
+
+def test_sampled_rate_stays_steady_across_window_rolls(clock):
+    tracker = HotKeyTracker(sample_every=1, window=10, export_top=0)
+    mitigation = HotKeyMitigation(tracker, threshold=1000)
+    for _ in range(int(35 * 100)):
+        clock.now += 0.01
+        mitigation.record("steady:key")
+    assert mitigation.promoted == []
+
+    tracker.reset()
+    rates = _steady_reads(tracker, clock, 35, 100)
+    # Carried-over counts are not divided by the time since the roll
+    assert max(rates) <= 150
+    # Past the first second of the last window the estimate is the real rate
+    assert rates[-1] == pytest.approx(100, rel=0.05)
+
+
+def test_reported_rate_stays_steady_across_window_rolls(clock):
+    tracker = HotKeyTracker(sample_every=1, window=10, export_top=0)
+    _steady_reads(tracker, clock, 25, 100)
+    # Half a window after the second roll, with counts carried over from both earlier windows
+    (entry,) = tracker.hot_keys()
+    assert entry["rate"] == pytest.approx(100, rel=0.05)
+    assert entry["count"] > 500
+
+
+@pytest.mark.asyncio
+async def test_local_mitigation_promotes_serves_and_invalidates():
+    store = {"hot:k": b"v1"}
+    calls = []
+
+    async def get(key):
+        calls.append(key)
+        return store.get(key)
+
+    mitigation = HotKeyMitigation(
+        HotKeyTracker(sample_every=1, export_top=0), mode="local", threshold=5, local_ttl=60
+    )
+    for _ in range(5):
+        mitigation.record("hot:k")
+    assert mitigation.is_promoted("hot:k")
+
+    assert await mitigation.read("hot:k", get, None) == b"v1"
+    assert await mitigation.read("hot:k", get, None) == b"v1"
+    assert calls == ["hot:k"]
+
+    store["hot:k"] = b"v2"
+    assert mitigation.invalidate(["hot:k"]) == []
+    assert await mitigation.read("hot:k", get, None) == b"v2"
+
+    mitigation.cool_down = 0
+    mitigation._promoted["hot:k"] -= 1
+    assert not mitigation.is_promoted("hot:k")
+
+
+def test_replica_invalidation_does_not_need_a_local_promotion():
+    # Another process may have promoted the key and be serving its replicas
+    mitigation = HotKeyMitigation(
+        HotKeyTracker(sample_every=1, export_top=0), mode="replicas", replicas=2
+    )
+    assert not mitigation.is_promoted("cold:k")
+    assert mitigation.invalidate(["cold:k", b"cold:b"]) == [
+        "cold:k:hotrep:0",
+        "cold:k:hotrep:1",
+        b"cold:b:hotrep:0",
+        b"cold:b:hotrep:1",
+    ]
+    # Deleting the replicas themselves does not fan out further
+    assert mitigation.invalidate(mitigation.replica_keys("cold:k")) == []
+
+
+@pytest.mark.asyncio
+async def test_replica_refresh_does_not_resurrect_a_concurrent_write():
+    mitigation = HotKeyMitigation(
+        HotKeyTracker(sample_every=1, export_top=0), mode="replicas", threshold=1, replicas=1
+    )
+    mitigation.record("race:k")
+    (replica,) = mitigation.replica_keys("race:k")
+    store = {"race:k": b"old"}
+
+    def _write_through_client(value):
+        store["race:k"] = value
+        for stale in mitigation.invalidate(["race:k"]):
+            store.pop(stale, None)
+
+    async def get(key):
+        value = store.get(key)
+        if key == "race:k" and value == b"old":
+            # The write lands after the primary read, before the replica refresh
+            _write_through_client(b"new")
+        return value
+
+    async def set(key, value, px):
+        store[key] = value
+
+    async def delete(key):
+        store.pop(key, None)
+
+    assert await mitigation.read("race:k", get, set, delete) == b"old"
+    assert replica not in store
+    assert await mitigation.read("race:k", get, set, delete) == b"new"
+    assert store[replica] == b"new"
+
+    # The write lands while the replica SET is in flight, after the writer's DEL
+    async def late_set(key, value, px):
+        _write_through_client(b"newer")
+        store[key] = value
+
+    store.pop(replica)
+    assert await mitigation.read("race:k", get, late_set, delete) == b"new"
+    assert replica not in store
+
+
+@pytest.mark.asyncio
+async def test_replica_mitigation_through_client(valkey_client, monkeypatch):
+    monkeypatch.setattr(ValkeyConfig, "VALKEY_HOT_KEY_MITIGATION", "replicas")
+    monkeypatch.setattr(ValkeyConfig, "VALKEY_HOT_KEYS_SAMPLE_EVERY", 1)
+    monkeypatch.setattr(ValkeyConfig, "VALKEY_HOT_KEY_THRESHOLD", 5)
+    monkeypatch.setattr(ValkeyConfig, "VALKEY_HOT_KEY_REPLICAS", 2)
+    client = ValkeyClient()
+    mitigation = client.hot_key_mitigation
+    try:
+        await client.set("hotrep:key", {"v": 1})
+        for _ in range(20):
+            assert await client.get("hotrep:key") == {"v": 1}
+        assert "hotrep:key" in mitigation.promoted
+        raw = await client.get_client()
+        assert await raw.exists(*mitigation.replica_keys("hotrep:key")) >= 1
+
+        # A write through the client deletes the replicas, so the next read is fresh
+        await client.set("hotrep:key", {"v": 2})
+        assert await raw.exists(*mitigation.replica_keys("hotrep:key")) == 0
+        assert await client.get("hotrep:key") == {"v": 2}
+    finally:
+        await client.delete("hotrep:key", *mitigation.replica_keys("hotrep:key"))
+        await client.shutdown()
@@ -0,0 +1,171 @@
+"""
+Tests for the client-side near cache (CLIENT TRACKING invalidation).
+"""
+import asyncio
+import pytest
+from valkey.asyncio import Valkey
+
+from app.core.valkey_core.cache.near_cache import MISSING, NearCache, _TrackingSession
+from app.core.valkey_core.client import ValkeyClient
+from app.core.valkey_core.config import ValkeyConfig
+
+
+def test_near_cache_skips_reads_overlapping_invalidation():
+    """A read in flight while its key is invalidated must not be stored."""
+    cache = NearCache(max_size=2, ttl=0)
+    cache._sessions = [object()]
+    cache._live = {0}
+    token = cache.begin("k")
+    cache.invalidate(["k"])
+    cache.finish("k", token, "old")
+    assert cache.lookup("k") is MISSING
+
+    token = cache.begin("k")
+    cache.finish("k", token, "new")
+    assert cache.lookup("k") == "new"
+
+
+def test_near_cache_is_bounded():
+    cache = NearCache(max_size=2, ttl=0)
+    cache._sessions = [object()]
+    cache._live = {0}
+    for key in ("a", "b", "c"):
+        cache.finish(key, cache.begin(key), key)
+    assert cache.lookup("a") is MISSING
+    assert cache.lookup("c") == "c"
+
+
+def _active_near_cache(client: ValkeyClient) -> NearCache:
+    cache = client._near_cache = NearCache(ttl=0)
+    cache._sessions = [object()]
+    cache._live = {0}
+    return cache
+
+
+@pytest.mark.asyncio
+async def test_read_during_write_does_not_keep_the_old_value(monkeypatch):
+    """A read served before a concurrent write lands must not stay near-cached after the write."""
+    client = ValkeyClient()
+    cache = _active_near_cache(client)
+    store = {"k": client._serializer.encode("k", "old")}
+    write_sent, write_done, read_done = asyncio.Event(), asyncio.Event(), asyncio.Event()
+
+    async def _execute(command, key, *args, **kwargs):
+        if command == "set":
+            write_sent.set()
+            await write_done.wait()
+            store[key] = args[0]
+            return True
+        # Served by the server before the write was applied
+        value = store[key]
+        await read_done.wait()
+        return value
+
+    monkeypatch.setattr(client, "_execute", _execute)
+
+    # The read completes during the write's round trip
+    write = asyncio.create_task(client.set("k", "new"))
+    await write_sent.wait()
+    read_done.set()
+    assert await client.get("k") == "old"
+    write_done.set()
+    await write
+    assert cache.lookup("k") is MISSING
+    assert await client.get("k") == "new"
+
+    # The read completes after the write returned
+    cache.clear()
+    for event in (write_sent, write_done, read_done):
+        event.clear()
+    write = asyncio.create_task(client.set("k", "newer"))
+    await write_sent.wait()
+    read = asyncio.create_task(client.get("k"))
+    await asyncio.sleep(0.01)
+    write_done.set()
+    await write
+    read_done.set()
+    assert await read == "new"
+    assert cache.lookup("k") is MISSING
+
+
+class _Tracker:
+    def __init__(self, reply):
+        self.reply = reply
+
+    async def execute_command(self, *args):
+        assert args == ("CLIENT", "TRACKINGINFO")
+        return self.reply
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "reply, broken",
+    [
+        ([b"flags", [b"on", b"bcast"], b"redirect", 7, b"prefixes", []], False),
+        ({"flags": ["on", "bcast"], "redirect": 7, "prefixes": []}, False),
+        ([b"flags", [b"off"], b"redirect", -1, b"prefixes", []], True),
+        ({"flags": ["on", "bcast", "broken_redirect"], "redirect": 7, "prefixes": []}, True),
+    ],
+)
+async def test_tracking_check_marks_session_broken(reply, broken):
+    session = _TrackingSession(None, ())
+    session.tracker = _Tracker(reply)
+    await session.check()
+    assert session.broken is broken
+
+
+@pytest.mark.asyncio
+async def test_near_cache_resubscribes_when_tracking_is_lost():
+    node = Valkey(host=ValkeyConfig.VALKEY_HOST, port=ValkeyConfig.VALKEY_PORT)
+    cache = NearCache(keepalive=0.1)
+    await cache.start([node])
+    try:
+        for _ in range(50):
+            if cache.active:
+                break
+            await asyncio.sleep(0.05)
+        assert cache.active
+        cache.finish("k", cache.begin("k"), "v")
+
+        # Tracking dropped server-side without the connection closing
+        session = cache._sessions[0]
+        tracker = session.tracker
+        await tracker.execute_command("CLIENT", "TRACKING", "OFF")
+        for _ in range(50):
+            if session.tracker is not tracker and cache.active:
+                break
+            await asyncio.sleep(0.05)
+        assert session.tracker is not tracker
+        assert cache.lookup("k") is MISSING
+        assert cache.active
+    finally:
+        await cache.stop()
+        await node.aclose()
+
+
+@pytest.mark.asyncio
+async def test_near_cache_invalidated_by_other_client(valkey_client, monkeypatch):
+    """Writes from another connection evict the near-cached copy."""
+    monkeypatch.setattr(ValkeyConfig, "VALKEY_NEAR_CACHE_ENABLED", True)
+    client = ValkeyClient()
+    await client.get_client()
+    try:
+        for _ in range(50):
+            if client._near_cache.active:
+                break
+            await asyncio.sleep(0.05)
+        assert client._near_cache.active
+
+        await valkey_client.set("near_key", {"v": 1})
+        assert await client.get("near_key") == {"v": 1}
+        assert await client.get("near_key") == {"v": 1}
+        assert client._near_cache.hits == 1
+
+        await valkey_client.set("near_key", {"v": 2})
+        for _ in range(50):
+            if client._near_cache.lookup("near_key") is MISSING:
+                break
+            await asyncio.sleep(0.05)
+        assert await client.get("near_key") == {"v": 2}
+    finally:
+        await client.shutdown()
@@ -56,3 +56,42 @@ async def test_pipeline_atomicity(valkey_client):
             await pipeline2.close()
     if hasattr(client, "close"):
         await client.close()
+
+@pytest.mark.asyncio
+async def test_auto_pipeline_batches_concurrent_commands(valkey_client, monkeypatch):
+    """Concurrent single-key commands are coalesced into a few pipelines."""
+    import asyncio
+    from app.core.valkey_core.config import ValkeyConfig
+
+    monkeypatch.setattr(ValkeyConfig, "VALKEY_AUTO_PIPELINE_ENABLED", True)
+    client = ValkeyClient()
+    try:
+        results = await asyncio.gather(*[client.incr("auto_pipe_counter") for _ in range(200)])
+        assert sorted(results) == list(range(1, 201))
+        assert client._auto_pipeline.commands == 200
+        assert client._auto_pipeline.batches < 200
+        await client.set("auto_pipe_key", {"a": 1})
+        assert await client.get("auto_pipe_key") == {"a": 1}
+    finally:
+        await client.shutdown()
+
+@pytest.mark.asyncio
+async def test_batch_pipeline_streams_results_in_order(valkey_client):
+    """Commands are chunked and executed concurrently, results come back in order."""
+    pipe = valkey_client.batch_pipeline(max_commands=50, max_bytes=2048, max_inflight=3)
+    commands = (("set", (f"batch_pipe:{i}", i)) for i in range(1000))
+    assert [r async for r in pipe.stream(commands)] == [True] * 1000
+    assert pipe.chunks >= 20
+
+    values = [r async for r in pipe.stream(("get", (f"batch_pipe:{i}",)) for i in range(1000))]
+    assert values == [str(i).encode() for i in range(1000)]
+    await valkey_client.delete_many([f"batch_pipe:{i}" for i in range(1000)])
+
+@pytest.mark.asyncio
+async def test_batch_pipeline_builder_and_errors(valkey_client):
+    """Queued commands execute in order; per-command errors surface at their position."""
+    pipe = valkey_client.batch_pipeline(raise_on_error=False)
+    pipe.set("batch_pipe:str", "x").incr("batch_pipe:str").get("batch_pipe:str")
+    ok, error, value = await pipe.execute()
+    assert ok is True and isinstance(error, Exception) and value == b"x"
+    await valkey_client.delete("batch_pipe:str")
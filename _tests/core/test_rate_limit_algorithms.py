@@ -240,3 +240,24 @@ async def test_algorithms_allow_and_block_multiple(algo_func, kwargs, valkey_cli
     await asyncio.sleep(kwargs.get("window", kwargs.get("interval", 1)) + 0.5)
     allowed7 = await algo_func(*get_args())
     assert allowed7 is True, f"allowed7 was {allowed7} for {algo_func.__name__} with kwargs={kwargs}"
+
+
+async def test_sliding_window_counts_through_the_client_pipeline(monkeypatch):
+    """ValkeyClient.pipeline() is a coroutine: using it un-awaited made the limiter always fail open."""
+    class _Pipeline:
+        def __getattr__(self, name):
+            return lambda *args, **kwargs: None
+
+        async def execute(self):
+            return [0, 1, 3, True]
+
+    class _Client:
+        async def pipeline(self):
+            return _Pipeline()
+
+    monkeypatch.setattr(ValkeyConfig, "VALKEY_FUNCTIONS_ENABLED", False)
+    monkeypatch.setattr(
+        "app.core.valkey_core.algorithims.rate_limit.sliding_window.get_valkey_client", lambda: _Client()
+    )
+    assert await is_allowed_sliding_window("test:sliding", 2, 60) is False
+    assert await is_allowed_sliding_window("test:sliding", 3, 60) is True
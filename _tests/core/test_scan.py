@@ -0,0 +1,24 @@
+"""
+Tests for streaming scan_iter / scan_apply.
+"""
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_scan_iter_streams_batches(valkey_client):
+    await valkey_client.set_many({f"scan:{i}": i for i in range(500)})
+    await valkey_client.rpush("scan:list", "x")
+    batches = [batch async for batch in valkey_client.scan_iter("scan:*", count=50)]
+    keys = {key for batch in batches for key in batch}
+    assert len(keys) == 501
+    assert len(batches) > 1
+    lists = [key async for batch in valkey_client.scan_iter("scan:*", type="list") for key in batch]
+    assert lists == [b"scan:list"]
+
+
+@pytest.mark.asyncio
+async def test_scan_apply_streams_deletes(valkey_client):
+    await valkey_client.set_many({f"purge:{i}": i for i in range(300)})
+    processed = await valkey_client.scan_apply(valkey_client.delete_many, "purge:*", count=25)
+    assert processed == 300
+    assert await valkey_client.scan("purge:*") == []
@@ -0,0 +1,32 @@
+"""
+Tests for the EVALSHA script registry.
+"""
+import uuid
+
+import pytest
+
+from app.core.valkey_core.scripts import SCRIPTS, register_script
+
+ECHO_LUA = "return {KEYS[1], ARGV[1]}"
+
+
+def test_register_script_is_idempotent_and_rejects_conflicts():
+    script = register_script("test_echo", ECHO_LUA)
+    assert register_script("test_echo", ECHO_LUA) is script
+    assert len(script.sha) == 40
+    with pytest.raises(ValueError):
+        register_script("test_echo", "return 1")
+
+
+@pytest.mark.asyncio
+async def test_run_script_reloads_after_script_flush(valkey_client):
+    script = register_script("test_echo", ECHO_LUA)
+    key = f"script:{uuid.uuid4()}"
+    assert await valkey_client.run_script(script, keys=[key], args=["a"]) == [key.encode(), b"a"]
+
+    raw = await valkey_client.get_client()
+    await raw.script_flush()
+    assert await raw.script_exists(script.sha) == [False]
+    # NOSCRIPT -> registry reloaded -> EVALSHA retried
+    assert await valkey_client.run_script("test_echo", keys=[key], args=["b"]) == [key.encode(), b"b"]
+    assert await raw.script_exists(*(s.sha for s in SCRIPTS.values())) == [True] * len(SCRIPTS)
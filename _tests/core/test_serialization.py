@@ -0,0 +1,87 @@
+"""
+Tests for pluggable value codecs.
+"""
+import pytest
+from valkey.exceptions import DataError
+
+from app.core.valkey_core.client import ValkeyClient
+from app.core.valkey_core.cache.valkey_cache import ValkeyCache
+from app.core.valkey_core.serialization import (
+    JSON_MARKER,
+    RAW_MARKER,
+    ZLIB_MARKER,
+    Compressor,
+    ValueSerializer,
+    decompress,
+)
+
+
+def test_marker_dispatch_and_legacy_fallback():
+    serializer = ValueSerializer("json", fallback=ValkeyClient._maybe_json_decode)
+    encoded = serializer.encode("k", {"a": [1, 2]})
+    assert encoded[:1] == JSON_MARKER
+    assert serializer.decode(encoded) == {"a": [1, 2]}
+    # Values written before codecs existed still decode
+    assert serializer.decode(b'{"a": 1}') == {"a": 1}
+    # Integers stay unmarked so INCR keeps working
+    assert serializer.encode("k", 42) == b"42"
+
+
+def test_namespace_override_and_pickle_guard():
+    serializer = ValueSerializer("json", {"obj:": "pickle"})
+    assert serializer.decode(serializer.encode("obj:1", {1, 2})) == {1, 2}
+    with pytest.raises(DataError):
+        ValueSerializer("json").decode(serializer.encode("obj:1", {1, 2}))
+
+
+@pytest.mark.asyncio
+async def test_uncompressed_value_with_a_marker_byte_reads_unchanged():
+    # Written before compression existed, or by another client
+    value = b"\x05plain text"
+    assert value[:1] == ZLIB_MARKER
+    assert decompress(value) == value
+    read_bytes = []
+    compressor = Compressor("zlib", on_bytes=lambda *counts: read_bytes.append(counts))
+    assert compressor.decompress(value) == value
+    assert read_bytes == []
+    assert ValueSerializer("json").decode(value) == value
+
+    class _RawClient:
+        async def get(self, key):
+            return value
+
+    assert await ValkeyCache(_RawClient(), compression="zlib").get("legacy") == "\x05plain text"
+
+
+@pytest.mark.asyncio
+async def test_raw_bytes_passthrough(valkey_client):
+    blob = b"\x00\xff binary"
+    await valkey_client.set("blob_key", blob)
+    raw = await (await valkey_client.get_client()).get("blob_key")
+    assert raw == RAW_MARKER + blob
+    assert await valkey_client.get("blob_key") == blob
+
+
+@pytest.mark.asyncio
+async def test_incr_after_set(valkey_client):
+    await valkey_client.set("codec_counter", 5)
+    assert await valkey_client.incr("codec_counter") == 6
+    assert await valkey_client.get("codec_counter") == 6
+
+
+@pytest.mark.asyncio
+async def test_client_compresses_above_threshold(valkey_client, monkeypatch):
+    from app.core.valkey_core.config import ValkeyConfig
+
+    monkeypatch.setattr(ValkeyConfig, "VALKEY_COMPRESSION", "lzma")
+    monkeypatch.setattr(ValkeyConfig, "VALKEY_COMPRESSION_THRESHOLD", 1024)
+    client = ValkeyClient()
+    try:
+        document = {"rows": [{"id": i, "name": "row"} for i in range(5000)]}
+        await client.set("compressed_doc", document)
+        raw = await (await client.get_client()).get("compressed_doc")
+        assert raw[:1] == b"\x06"
+        # Readers without compression configured still decode it
+        assert await valkey_client.get("compressed_doc") == document
+    finally:
+        await client.shutdown()
@@ -0,0 +1,47 @@
+"""
+Tests for optimistic WATCH/MULTI/EXEC transactions.
+"""
+import asyncio
+import uuid
+
+import pytest
+from fastapi import HTTPException
+
+
+@pytest.mark.asyncio
+async def test_concurrent_transactions_do_not_lose_updates(valkey_client):
+    key = f"tx:{uuid.uuid4()}"
+
+    async def _bump(pipe):
+        current = int(await pipe.get(key) or 0)
+        await asyncio.sleep(0)  # let the other writers read the same value
+        pipe.multi()
+        pipe.set(key, current + 1)
+        return current + 1
+
+    results = await asyncio.gather(
+        *(valkey_client.transaction(_bump, key, max_attempts=100, value_from_callable=True) for _ in range(20))
+    )
+    assert sorted(results) == list(range(1, 21))
+    assert int(await (await valkey_client.aconn()).get(key)) == 20
+    contended = valkey_client.transaction_conflicts()
+    assert contended and contended[0]["key"] == key and 0 < contended[0]["rate"] < 1
+    await valkey_client.delete(key)
+
+
+@pytest.mark.asyncio
+async def test_transaction_raises_conflict_when_attempts_exhausted(valkey_client):
+    key = f"tx:{uuid.uuid4()}"
+    raw = await valkey_client.aconn()
+
+    async def _always_raced(pipe):
+        await pipe.get(key)
+        await raw.incr(key)  # another writer changes the watched key
+        pipe.multi()
+        pipe.set(key, 0)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await valkey_client.transaction(_always_raced, key, max_attempts=3)
+    assert exc_info.value.status_code == 409
+    assert int(await raw.get(key)) == 3
+    await valkey_client.delete(key)
@@ -0,0 +1,41 @@
+"""
+Tests for connection pool warm-up.
+"""
+import pytest
+
+from app.core.valkey_core.client import ValkeyClient
+from app.core.valkey_core.config import ValkeyConfig
+
+
+@pytest.mark.asyncio
+async def test_warm_up_opens_connections_and_reports_stages():
+    ValkeyConfig.VALKEY_METRICS_ENABLED = False
+    client = ValkeyClient()
+    try:
+        assert client.warm_up_report is None
+        report = await client.warm_up(3)
+        assert report["connections"] == {"primary": 3}
+        assert {"scripts", "functions", "connections"} <= set(report["stages"])
+        assert report["total"] >= report["stages"]["connections"]
+        assert client.warm_up_report is report
+
+        pool = (await client.get_client()).connection_pool
+        idle = [c for c in pool._available_connections if c.is_connected]
+        assert len(idle) >= 3
+        # The first command reuses a warm connection instead of connecting
+        await client.set("warm:key", "v")
+        assert len(pool._available_connections) >= 3
+    finally:
+        await client.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_warm_up_is_capped_by_pool_size():
+    ValkeyConfig.VALKEY_METRICS_ENABLED = False
+    client = ValkeyClient()
+    try:
+        pool = (await client.get_client()).connection_pool
+        report = await client.warm_up(pool.max_connections + 10)
+        assert report["connections"]["primary"] == pool.max_connections
+    finally:
+        await client.shutdown()
@@ -0,0 +1,84 @@
+"""
+Tests for the adaptive concurrency limiter.
+"""
+import asyncio
+
+import pytest
+from valkey.exceptions import MaxConnectionsError
+
+from app.core.valkey_core.client import ValkeyClient
+from app.core.valkey_core.concurrency import AdaptiveLimiter
+from app.core.valkey_core.config import ValkeyConfig
+
+
+def _sleeping(delay: float):
+    async def _call():
+        await asyncio.sleep(delay)
+        return delay
+    return _call
+
+
+@pytest.mark.asyncio
+async def test_limit_shrinks_when_latency_rises_and_grows_back():
+    limiter = AdaptiveLimiter(initial=20, min_limit=2, max_limit=50, window=10, export=False)
+    # Fast baseline, with the limit in use so it may grow
+    await asyncio.gather(*(limiter.run(_sleeping(0.001)) for _ in range(10)))
+    grown = limiter.limit
+    assert grown > 20
+    # Latency far above the baseline: multiplicative decrease
+    await asyncio.gather(*(limiter.run(_sleeping(0.02)) for _ in range(10)))
+    assert limiter.limit < grown
+    assert limiter.inflight == 0
+
+
+@pytest.mark.asyncio
+async def test_excess_callers_queue_then_are_shed():
+    limiter = AdaptiveLimiter(initial=2, min_limit=1, window=1000, max_queue=1, queue_timeout=0.05, export=False)
+    release = asyncio.Event()
+
+    async def _blocked():
+        await release.wait()
+
+    running = [asyncio.create_task(limiter.run(_blocked)) for _ in range(2)]
+    await asyncio.sleep(0)
+    assert limiter.inflight == 2
+    queued = asyncio.create_task(limiter.run(_sleeping(0)))
+    await asyncio.sleep(0)
+    assert limiter.queued == 1
+    # Queue full: shed immediately
+    with pytest.raises(MaxConnectionsError):
+        await limiter.run(_sleeping(0))
+    release.set()
+    await asyncio.gather(*running, queued)
+    assert limiter.inflight == 0 and limiter.shed == 1
+
+    # Nothing frees a slot within queue_timeout: shed after waiting
+    release.clear()
+    running = [asyncio.create_task(limiter.run(_blocked)) for _ in range(2)]
+    await asyncio.sleep(0)
+    with pytest.raises(MaxConnectionsError):
+        await limiter.run(_sleeping(0))
+    release.set()
+    await asyncio.gather(*running)
+    assert limiter.shed == 2 and limiter.queued == 0
+
+
+@pytest.mark.asyncio
+async def test_client_commands_run_within_the_limit(monkeypatch):
+    monkeypatch.setattr(ValkeyConfig, "VALKEY_ADAPTIVE_CONCURRENCY", True)
+    monkeypatch.setattr(ValkeyConfig, "VALKEY_CONCURRENCY_INITIAL", 4)
+    client = ValkeyClient()
+    peak = {"now": 0, "max": 0}
+
+    async def _dispatch(command, *args, **kwargs):
+        peak["now"] += 1
+        peak["max"] = max(peak["max"], peak["now"])
+        await asyncio.sleep(0.005)
+        peak["now"] -= 1
+        return 1
+
+    monkeypatch.setattr(client, "_dispatch", _dispatch)
+    results = await asyncio.gather(*(client.incr(f"limit:{i}") for i in range(20)))
+    assert results == [1] * 20
+    assert peak["max"] <= 4
+    assert client.concurrency_limiter.inflight == 0
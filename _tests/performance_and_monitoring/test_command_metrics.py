@@ -0,0 +1,76 @@
+"""
+Tests for the track_valkey_metrics recorder (pre-bound, sampled, aggregated).
+"""
+import pytest
+
+from app.core.prometheus.metrics import get_cache_count, get_cache_latency
+from app.core.valkey_core.client import ValkeyClient
+from app.core.valkey_core.config import ValkeyConfig
+from app.core.valkey_core.decorators import MetricsRecorder, track_valkey_metrics
+
+
+def _value(collector, suffix: str, *label_values: str) -> float:
+    return sum(
+        sample.value
+        for metric in collector.collect()
+        for sample in metric.samples
+        if sample.name.endswith(suffix) and set(label_values) <= set(sample.labels.values())
+    )
+
+
+class _Store:
+    def __init__(self, recorder: MetricsRecorder):
+        self._metrics_recorder = recorder
+
+    @track_valkey_metrics('get')
+    async def get(self, key):
+        return None if key == "missing" else key
+
+
+@pytest.mark.asyncio
+async def test_sampling_keeps_counts_exact_and_times_every_nth_call():
+    store = _Store(MetricsRecorder("rec_sampled", sample_rate=0.25))
+    for key in ["a", "b", "missing", "c"] * 5:
+        await store.get(key)
+    assert _value(get_cache_count(), "_total", "rec_sampled", "hit") == 15
+    assert _value(get_cache_count(), "_total", "rec_sampled", "miss") == 5
+    assert _value(get_cache_latency(), "_count", "rec_sampled", "get") == 5
+
+
+@pytest.mark.parametrize("sample_rate", [0.3, 1.5, -0.1])
+def test_sample_rates_other_than_one_in_n_are_rejected(sample_rate):
+    with pytest.raises(ValueError):
+        MetricsRecorder("rec_invalid", sample_rate=sample_rate)
+
+
+@pytest.mark.asyncio
+async def test_aggregated_metrics_are_published_on_flush():
+    recorder = MetricsRecorder("rec_aggregated", aggregate=True, max_buffered=100)
+    store = _Store(recorder)
+    for _ in range(10):
+        await store.get("a")
+    assert _value(get_cache_count(), "_total", "rec_aggregated", "hit") == 0
+    recorder.flush()
+    assert _value(get_cache_count(), "_total", "rec_aggregated", "hit") == 10
+    assert _value(get_cache_latency(), "_count", "rec_aggregated", "get") == 10
+    assert _value(get_cache_latency(), "_bucket", "rec_aggregated", "get", "+Inf") == 10
+
+    # A full buffer is flushed early; counts wait for the next flush
+    for _ in range(100):
+        await store.get("a")
+    assert _value(get_cache_latency(), "_count", "rec_aggregated", "get") == 110
+    assert _value(get_cache_count(), "_total", "rec_aggregated", "hit") == 10
+
+
+@pytest.mark.asyncio
+async def test_client_flushes_aggregated_metrics_on_shutdown(monkeypatch):
+    monkeypatch.setattr(ValkeyConfig, "VALKEY_METRICS_AGGREGATE", True)
+    client = ValkeyClient()
+    namespace = client._metrics_namespace
+    before = _value(get_cache_count(), "_total", namespace, "set")
+    try:
+        await client.set("metrics:key", "v")
+        assert client._metrics_recorder.aggregate
+    finally:
+        await client.shutdown()
+    assert _value(get_cache_count(), "_total", namespace, "set") == before + 1
@@ -0,0 +1,75 @@
+"""
+Per-call overhead of the command dispatch path, and its error mapping.
+"""
+import logging
+import time
+
+import pytest
+from fastapi import HTTPException
+from valkey.exceptions import InvalidResponse, MaxConnectionsError
+
+from app.core.valkey_core.client import ValkeyClient
+from app.core.valkey_core.exceptions.exceptions import handle_valkey_exceptions
+
+logger = logging.getLogger(__name__)
+
+
+async def _noop():
+    return 1
+
+
+async def _per_call_ns(call, n: int = 20000) -> float:
+    best = float("inf")
+    for _ in range(3):
+        started = time.perf_counter_ns()
+        for _ in range(n):
+            await call()
+        best = min(best, (time.perf_counter_ns() - started) / n)
+    return best
+
+
+class _FakeConnection:
+    async def ttl(self, key):
+        return 42
+
+
+@pytest.mark.asyncio
+async def test_dispatch_overhead_benchmark():
+    """Benchmark only: logs per-call costs (run with -o log_cli=true), asserts no timings."""
+    assert await handle_valkey_exceptions(_noop, logger=logger, endpoint="x") == 1
+    client = ValkeyClient()
+    client._client = _FakeConnection()
+    assert await client.ttl("k") == 42
+
+    bare = await _per_call_ns(_noop)
+    wrapped = await _per_call_ns(lambda: handle_valkey_exceptions(_noop, logger=logger, endpoint="x"))
+    command = await _per_call_ns(lambda: client.ttl("k"))
+    logger.info(
+        f"Dispatch overhead per call: await {bare:.0f}ns, "
+        f"handle_valkey_exceptions +{wrapped - bare:.0f}ns, ttl() on a fake connection {command:.0f}ns"
+    )
+
+
+@pytest.mark.asyncio
+async def test_run_maps_errors_only_when_they_happen():
+    client = ValkeyClient()
+
+    async def _echo(*args):
+        return args
+
+    async def _exhausted():
+        raise MaxConnectionsError("Too many connections")
+
+    async def _unmapped():
+        raise InvalidResponse("garbage")
+
+    assert await client._run("valkey.echo", None, _echo, "a", 1) == ("a", 1)
+    with pytest.raises(HTTPException) as exc_info:
+        await client._run("valkey.echo", 1.0, _exhausted)
+    assert exc_info.value.status_code == 429
+    assert exc_info.value.detail["endpoint"] == "valkey.echo"
+    with pytest.raises(HTTPException) as exc_info:
+        await client._run("valkey.echo", None, _unmapped)
+    assert exc_info.value.status_code == 500
+    with pytest.raises(MaxConnectionsError):
+        await client._run("valkey.echo", None, _exhausted, wrap_http_exception=False)
@@ -0,0 +1,61 @@
+"""
+Tests for hedged reads.
+"""
+import asyncio
+
+import pytest
+
+from app.core.valkey_core.client import ValkeyClient
+from app.core.valkey_core.config import ValkeyConfig
+from app.core.valkey_core.hedging import Hedger, LatencyTracker
+
+
+def test_latency_tracker_percentile():
+    tracker = LatencyTracker(percentile=0.9, size=100, refresh=100)
+    for i in range(100):
+        tracker.observe(i / 1000)
+    assert tracker.value == pytest.approx(0.09)
+
+
+@pytest.mark.asyncio
+async def test_hedge_wins_over_stalled_read_within_budget():
+    hedger = Hedger(max_delay=0.005, budget=0.0, burst=1, export=False)
+    calls = []
+
+    def _read(delay):
+        async def _call():
+            calls.append(delay)
+            await asyncio.sleep(delay)
+            return delay
+        return _call
+
+    assert await hedger.run(_read(1.0), _read(0.0)) == 0.0
+    assert hedger.hedge_wins == 1
+    # Budget spent: the next slow read is not duplicated
+    assert await hedger.run(_read(0.02), _read(0.0)) == 0.02
+    assert hedger.hedged == 1 and len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_client_hedges_reads_on_a_second_connection(valkey_client, monkeypatch):
+    monkeypatch.setattr(ValkeyConfig, "VALKEY_HEDGE_READS", True)
+    monkeypatch.setattr(ValkeyConfig, "VALKEY_HEDGE_MAX_DELAY", 0.01)
+    client = ValkeyClient()
+    try:
+        await client.set("hedge:key", {"a": 1})
+        raw = await client.get_client()
+        original = raw.get
+        stalled = []
+
+        async def _get(key):
+            if not stalled:
+                stalled.append(key)
+                await asyncio.sleep(1)
+            return await original(key)
+
+        raw.get = _get
+        assert await asyncio.wait_for(client.get("hedge:key"), 0.5) == {"a": 1}
+        assert client._hedger.hedge_wins == 1
+    finally:
+        await client.delete("hedge:key")
+        await client.shutdown()
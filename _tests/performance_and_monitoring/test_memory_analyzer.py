@@ -0,0 +1,43 @@
+"""
+Tests for the keyspace memory analyzer.
+"""
+import uuid
+
+import pytest
+
+from app.core.valkey_core.analyzer import KeyspaceAnalyzer, key_prefix, ttl_bucket
+
+
+def test_prefix_and_ttl_buckets():
+    assert key_prefix("lru:123") == "lru:"
+    assert key_prefix(b"rate_meta:u1:x", depth=2) == "rate_meta:u1:"
+    assert key_prefix("plain") == ""
+    assert ttl_bucket(-1) == "none"
+    assert ttl_bucket(30_000) == "<1m"
+    assert ttl_bucket(2 * 86400 * 1000) == "<7d"
+
+
+@pytest.mark.asyncio
+async def test_analyzer_aggregates_per_prefix(valkey_client):
+    ns = f"analyzer-{uuid.uuid4()}"
+    raw = await valkey_client.get_client()
+    small = [f"{ns}:small:{i}" for i in range(20)]
+    await raw.mset({key: "x" for key in small})
+    await raw.set(f"{ns}:big:1", "x" * 100_000, ex=600)
+    try:
+        report = await KeyspaceAnalyzer(
+            valkey_client, match=f"{ns}:*", depth=2, top=3, max_keys_per_second=10_000
+        ).run()
+        result = report.as_dict()
+        assert result["inspected"] == 21
+        big = result["prefixes"][f"{ns}:big:"]
+        assert big["keys"] == 1 and big["bytes"] >= 100_000 and big["ttl"] == {"<1h": 1}
+        assert result["prefixes"][f"{ns}:small:"]["keys"] == 20
+        assert result["prefixes"][f"{ns}:small:"]["types"] == {"string": 20}
+        assert result["biggest"][0]["key"] == f"{ns}:big:1"
+        assert len(result["biggest"]) == 3
+
+        limited = await KeyspaceAnalyzer(valkey_client, match=f"{ns}:*", max_keys=5).run()
+        assert limited.inspected == 5
+    finally:
+        await raw.delete(*small, f"{ns}:big:1")
@@ -0,0 +1,56 @@
+"""
+Tests for connection pool instrumentation.
+"""
+import asyncio
+
+import pytest
+from prometheus_client import REGISTRY
+from valkey.asyncio import Valkey
+from valkey.exceptions import ConnectionError
+
+from app.core.valkey_core.client import ValkeyClient
+from app.core.valkey_core.config import ValkeyConfig
+from app.core.valkey_core.pools import InstrumentedConnectionPool, instrument_client, pool_stats
+
+
+def _sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(f"{ValkeyConfig.VALKEY_METRICS_NAMESPACE}_{name}", labels) or 0.0
+
+
+@pytest.mark.asyncio
+async def test_instrumented_pool_counts_connections_and_checkouts():
+    raw = Valkey(host=ValkeyConfig.VALKEY_HOST, port=ValkeyConfig.VALKEY_PORT, max_connections=2)
+    instrument_client(raw)
+    pool = raw.connection_pool
+    assert isinstance(pool, InstrumentedConnectionPool)
+    node = pool.node
+    created = _sample("pool_connections_created_total", node=node)
+    checkouts = _sample("pool_checkout_seconds_count", node=node)
+    exhausted = _sample("pool_errors_total", node=node, kind="exhausted")
+    try:
+        await asyncio.gather(raw.ping(), raw.ping())
+        assert _sample("pool_connections_created_total", node=node) == created + 2
+        assert _sample("pool_checkout_seconds_count", node=node) == checkouts + 2
+        assert pool_stats(raw) == {node: {"in_use": 0, "idle": 2, "max": 2}}
+
+        results = await asyncio.gather(*(raw.ping() for _ in range(3)), return_exceptions=True)
+        assert sum(isinstance(r, ConnectionError) for r in results) == 1
+        assert _sample("pool_errors_total", node=node, kind="exhausted") == exhausted + 1
+    finally:
+        await raw.aclose()
+    assert _sample("pool_connection_lifetime_seconds_count", node=node) >= 2
+
+
+@pytest.mark.asyncio
+async def test_client_instruments_its_pools_when_metrics_are_enabled(monkeypatch):
+    monkeypatch.setattr(ValkeyConfig, "VALKEY_METRICS_ENABLED", True)
+    client = ValkeyClient()
+    try:
+        await client.set("pool:key", "v")
+        stats = client.pool_stats()
+        assert len(stats) == 1
+        (counts,) = stats.values()
+        assert counts["in_use"] == 0 and counts["idle"] >= 1
+        assert isinstance((await client.get_client()).connection_pool, InstrumentedConnectionPool)
+    finally:
+        await client.shutdown()
@@ -0,0 +1,76 @@
+"""
+Tests for self-tuning connection pool sizing.
+"""
+import asyncio
+
+import pytest
+from valkey.asyncio import Valkey
+
+from app.core.valkey_core.client import ValkeyClient
+from app.core.valkey_core.config import ValkeyConfig
+from app.core.valkey_core.pools import PoolMonitor, PoolSizer, instrument_client, pool_stats
+
+
+def _raw(max_connections: int = 20) -> tuple[Valkey, PoolMonitor]:
+    raw = Valkey(host=ValkeyConfig.VALKEY_HOST, port=ValkeyConfig.VALKEY_PORT, max_connections=max_connections)
+    monitor = PoolMonitor(export=False)
+    instrument_client(raw, monitor)
+    return raw, monitor
+
+
+@pytest.mark.asyncio
+async def test_sizer_opens_the_floor_and_grows_with_demand():
+    raw, monitor = _raw()
+    sizer = PoolSizer(monitor, floor=2, ceiling=10, idle_timeout=60, smoothing=1.0)
+    pool = raw.connection_pool
+    try:
+        await sizer.tick([pool])
+        assert pool_stats(raw)[pool.node]["idle"] == 2
+
+        # A burst of 8 concurrent commands: 6 connections opened on the request path
+        await asyncio.gather(*(raw.execute_command("DEBUG", "SLEEP", "0.05") for _ in range(8)))
+        await sizer.tick([pool])
+        # ceil(8 * 1.25) + 6 on-demand connects, capped by the ceiling
+        assert sizer.targets[pool.node] == 10
+        assert pool_stats(raw)[pool.node]["idle"] == 10
+        assert all(c.is_connected for c in pool._available_connections)
+    finally:
+        await raw.aclose()
+
+
+@pytest.mark.asyncio
+async def test_sizer_closes_idle_connections_down_to_the_floor():
+    raw, monitor = _raw()
+    sizer = PoolSizer(monitor, floor=2, ceiling=10, idle_timeout=0.2, smoothing=1.0)
+    pool = raw.connection_pool
+    try:
+        await asyncio.gather(*(raw.execute_command("DEBUG", "SLEEP", "0.05") for _ in range(6)))
+        await sizer.tick([pool])
+        assert pool_stats(raw)[pool.node]["idle"] >= 6
+
+        # Quiet period, but connections not idle long enough yet
+        changes = await sizer.tick([pool])
+        assert changes[pool.node] == 0
+        await asyncio.sleep(0.3)
+        changes = await sizer.tick([pool])
+        assert pool_stats(raw)[pool.node]["idle"] == 2
+        assert changes[pool.node] < 0
+        assert await raw.ping()
+    finally:
+        await raw.aclose()
+
+
+@pytest.mark.asyncio
+async def test_client_sizes_its_pools_in_the_background(monkeypatch):
+    monkeypatch.setattr(ValkeyConfig, "VALKEY_POOL_AUTOSIZE", True)
+    monkeypatch.setattr(ValkeyConfig, "VALKEY_POOL_SIZE", 3)
+    monkeypatch.setattr(ValkeyConfig, "VALKEY_POOL_SIZING_INTERVAL", 0.01)
+    client = ValkeyClient()
+    try:
+        await client.set("sizing:key", "v")
+        await asyncio.sleep(0.1)
+        (counts,) = client.pool_stats().values()
+        assert counts["idle"] >= 3
+        assert min(client.pool_sizer.targets.values()) >= 3
+    finally:
+        await client.shutdown()
@@ -18,7 +18,7 @@ import pytest
 from app.core.valkey_core.config import ValkeyConfig
 ValkeyConfig.VALKEY_METRICS_ENABLED = False
 
-from app.core.valkey_core.limiting.rate_limit import check_rate_limit
+from app.core.valkey_core.limiting.rate_limit import check_rate_limit, increment_rate_limit
 
 logger = logging.getLogger(__name__)
 
@@ -176,4 +176,20 @@ async def test_performance_under_load(valkey_client):
         raise
     finally:
         # No explicit close needed; see debugging_tests.md
-        pass
\ No newline at end of file
+        pass
+
+
+@pytest.mark.asyncio
+async def test_concurrent_increments_get_distinct_counts(valkey_client):
+    """A hot key never runs out of retries: every concurrent increment returns its own count."""
+    import uuid
+    identifier = f"hot_id_{uuid.uuid4()}"
+    with patch("app.core.valkey_core.limiting.rate_limit.client", valkey_client):
+        counts = await asyncio.gather(
+            *(increment_rate_limit(identifier, "hot_endpoint", window=60) for _ in range(50))
+        )
+    key = f"rate_limit:hot_endpoint:{identifier}"
+    assert sorted(counts) == list(range(1, 51))
+    raw = await valkey_client.aconn()
+    assert 0 < await raw.ttl(key) <= 60
+    await raw.delete(key)
@@ -6,9 +6,15 @@ import logging
 from unittest.mock import patch
 
 import pytest
+from fastapi import HTTPException
+from valkey.exceptions import ConnectionError, ResponseError
 from ...exceptions.exceptions import TimeoutError
 
+from app.core.valkey_core.client import ValkeyClient
 from app.core.valkey_core.client import client as valkey_client
+from app.core.valkey_core.config import ValkeyConfig
+from app.core.valkey_core.exceptions.exceptions import CircuitOpenError
+from app.core.valkey_core.limiting.circuit_breaker import CLOSED, OPEN, CircuitBreaker
 
 logger = logging.getLogger(__name__)
 
@@ -69,3 +75,101 @@ async def test_valkey_timeout_error_classification(monkeypatch):
     with pytest.raises(TimeoutError):
         await client.get("test_key", wrap_http_exception=False)
 
+
+
+def _breaker_client(monkeypatch, dispatch):
+    monkeypatch.setattr(ValkeyConfig, "VALKEY_CIRCUIT_BREAKER_ENABLED", True)
+    monkeypatch.setattr(ValkeyConfig, "VALKEY_CIRCUIT_FAILURE_THRESHOLD", 3)
+    monkeypatch.setattr(ValkeyConfig, "VALKEY_CIRCUIT_RESET_TIMEOUT", 0.05)
+    client = ValkeyClient()
+    monkeypatch.setattr(client, "_dispatch", dispatch)
+    monkeypatch.setattr(client, "_node_of", AsyncMock(return_value="node-a"))
+    return client
+
+
+@pytest.mark.asyncio
+async def test_circuit_opens_and_fails_fast(monkeypatch):
+    calls = {"count": 0}
+
+    async def down(command, *args, **kwargs):
+        calls["count"] += 1
+        raise ConnectionError("brownout")
+
+    client = _breaker_client(monkeypatch, down)
+    for _ in range(3):
+        with pytest.raises(ConnectionError):
+            await client.get("cb:key", wrap_http_exception=False)
+    assert client.circuit_breakers.states() == {"node-a/read": OPEN}
+
+    with pytest.raises(CircuitOpenError) as exc_info:
+        await client.get("cb:key", wrap_http_exception=False)
+    assert exc_info.value.node == "node-a" and exc_info.value.kind == "read"
+    # Failed fast: the node was not called again
+    assert calls["count"] == 3
+    with pytest.raises(HTTPException) as http_info:
+        await client.get("cb:key")
+    assert http_info.value.status_code == 503
+
+    # Writes to the same node have their own circuit
+    with pytest.raises(ConnectionError):
+        await client._execute("incr", "cb:counter")
+    assert client.circuit_breakers.states()["node-a/write"] == CLOSED
+
+
+@pytest.mark.asyncio
+async def test_circuit_half_open_trial_closes_it(monkeypatch):
+    state = {"healthy": False}
+
+    async def flaky(command, *args, **kwargs):
+        if not state["healthy"]:
+            raise ConnectionError("brownout")
+        return b'"v"'
+
+    client = _breaker_client(monkeypatch, flaky)
+    for _ in range(3):
+        with pytest.raises(ConnectionError):
+            await client._execute("get", "cb:key")
+    state["healthy"] = True
+    await asyncio.sleep(0.06)
+    assert await client.get("cb:key") == "v"
+    assert client.circuit_breakers.states() == {"node-a/read": CLOSED}
+
+
+@pytest.mark.asyncio
+async def test_circuit_fallback_answers_while_open(monkeypatch):
+    async def down(command, *args, **kwargs):
+        raise ConnectionError("brownout")
+
+    client = _breaker_client(monkeypatch, down)
+    for _ in range(3):
+        with pytest.raises(ConnectionError):
+            await client._execute("get", "cb:key")
+    client.circuit_breakers.set_fallback("read", lambda command, args: None)
+    assert await client.get("cb:key") is None
+
+
+@pytest.mark.asyncio
+async def test_command_errors_do_not_open_the_circuit():
+    breaker = CircuitBreaker("node-a", "write", failure_threshold=2, export=False)
+
+    async def wrong_type():
+        raise ResponseError("WRONGTYPE Operation against a key holding the wrong kind of value")
+
+    for _ in range(5):
+        with pytest.raises(ResponseError):
+            await breaker.call(wrong_type)
+    assert breaker.state == CLOSED
+
+    async def down():
+        raise ConnectionError("down")
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            await breaker.call(down)
+    # 2 failures out of 7 calls is below the default 50% failure rate
+    assert breaker.state == CLOSED
+    for _ in range(6):
+        with pytest.raises(ConnectionError):
+            await breaker.call(down)
+    assert breaker.state == OPEN
+    assert breaker.retry_after > 0
@@ -0,0 +1,134 @@
+"""
+Tests for client-side consistent-hash sharding (VAPI_SHARDING_ENABLED).
+"""
+import uuid
+from collections import Counter
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app.core.valkey_core.client import ValkeyClient
+from app.core.valkey_core.config import ValkeyConfig
+from app.core.valkey_core.sharding import HashRing, ShardedValkey
+
+KEYS = [f"ring:{i}" for i in range(20000)]
+
+
+def test_ring_balances_and_moves_keys_minimally():
+    ring = HashRing({"a": 1, "b": 1, "c": 1})
+    before = {key: ring.get(key) for key in KEYS}
+    counts = Counter(before.values())
+    assert min(counts.values()) > len(KEYS) / 3 * 0.8
+
+    ring.add("d")
+    after = {key: ring.get(key) for key in KEYS}
+    moved = [key for key in KEYS if before[key] != after[key]]
+    # Only the new node's share moves, and only onto the new node
+    assert len(moved) < len(KEYS) * 0.35
+    assert {after[key] for key in moved} == {"d"}
+
+    ring.remove("d")
+    assert {key: ring.get(key) for key in KEYS} == before
+
+
+def test_ring_honours_hash_tags_and_weights():
+    ring = HashRing({"a": 1, "b": 3})
+    assert len({ring.get(f"user:{{42}}:{field}") for field in ("profile", "orders", "cart")}) == 1
+    counts = Counter(ring.get(key) for key in KEYS)
+    assert counts["b"] > 2 * counts["a"]
+
+
+@pytest.mark.asyncio
+async def test_sharded_client_splits_multi_key_ops(valkey_client, monkeypatch):
+    """Two ring members backed by the same server exercise the per-shard split paths."""
+    monkeypatch.setattr(ValkeyConfig, "VALKEY_SHARDING_ENABLED", True)
+    monkeypatch.setattr(ValkeyConfig, "VALKEY_SHARD_NODES", [
+        {"name": "s1", "host": ValkeyConfig.VALKEY_HOST, "port": ValkeyConfig.VALKEY_PORT},
+        {"name": "s2", "host": ValkeyConfig.VALKEY_HOST, "port": ValkeyConfig.VALKEY_PORT},
+    ])
+    client = ValkeyClient()
+    prefix = f"sharded:{uuid.uuid4()}"
+    keys = [f"{prefix}:{i}" for i in range(50)]
+    try:
+        raw = await client.get_client()
+        assert isinstance(raw, ShardedValkey)
+        assert len(raw.group_by_shard(keys)) == 2
+
+        assert await client.set_many({key: i for i, key in enumerate(keys)})
+        assert await client.get_many(keys) == list(range(50))
+        assert await client.incr(keys[0]) == 1
+
+        pipe = raw.pipeline(transaction=False)
+        for key in keys[:5]:
+            pipe.exists(key)
+        assert await pipe.execute() == [1] * 5
+
+        scanned = set()
+        async for batch in client.scan_iter(f"{prefix}:*"):
+            scanned.update(batch)
+        # Both ring members scan the same server here
+        assert len(scanned) == 50
+        assert await client.delete_many(keys) == 50
+    finally:
+        await client.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_rebalancer_moves_only_remapped_keys(valkey_client):
+    """Old ring {s1} -> new ring {s1, s2}, both backed by the test server."""
+    from app.core.valkey_core.rebalance import ShardRebalancer
+
+    node = {"host": ValkeyConfig.VALKEY_HOST, "port": ValkeyConfig.VALKEY_PORT}
+    old_nodes = [{"name": "s1", **node}]
+    new_nodes = [{"name": "s1", **node}, {"name": "s2", **node}]
+    prefix = f"rebalance:{uuid.uuid4()}"
+    keys = [f"{prefix}:{i}" for i in range(200)]
+    raw = await valkey_client.get_client()
+    await raw.mset({key: "v" for key in keys})
+    await raw.expire(keys[0], 300)
+    try:
+        ring = HashRing({"s1": 1, "s2": 1})
+        expected = sum(1 for key in keys if ring.get(key) == "s2")
+        dry = await ShardRebalancer(old_nodes, new_nodes, match=f"{prefix}:*", dry_run=True).run()
+        assert dry.moved == expected
+
+        # Same server on both sides: RESTORE without REPLACE hits BUSYKEY and is skipped
+        progress = await ShardRebalancer(old_nodes, new_nodes, match=f"{prefix}:*").run()
+        assert progress.moved == 0 and progress.skipped == expected
+
+        progress = await ShardRebalancer(
+            old_nodes, new_nodes, match=f"{prefix}:*", replace=True, rate_limit=10000
+        ).run()
+        assert progress.moved == expected and progress.failed == 0
+        assert await raw.get(keys[0]) == b"v"
+        assert 0 < await raw.ttl(keys[0]) <= 300
+    finally:
+        await raw.delete(*keys)
+
+
+@pytest.mark.asyncio
+async def test_rebalancer_dry_run_does_not_count_as_traffic(monkeypatch):
+    from app.core.valkey_core.rebalance import ShardRebalancer
+
+    class _Shard:
+        async def scan(self, cursor, match, count):
+            return 0, KEYS[:200]
+
+        async def aclose(self):
+            pass
+
+    def moved_total() -> float:
+        name = f"{ValkeyConfig.VALKEY_METRICS_NAMESPACE}_rebalance_keys_total"
+        return REGISTRY.get_sample_value(name, {"status": "moved"}) or 0.0
+
+    monkeypatch.setattr(ValkeyConfig, "VALKEY_METRICS_ENABLED", True)
+    node = {"host": "localhost", "port": 6379}
+    rebalancer = ShardRebalancer(
+        [{"name": "s1", **node}], [{"name": "s1", **node}, {"name": "s2", **node}], dry_run=True
+    )
+    rebalancer._shards = {"s1": _Shard()}
+    before = moved_total()
+    progress = await rebalancer.run()
+    ring = HashRing({"s1": 1, "s2": 1})
+    assert progress.moved == sum(1 for key in KEYS[:200] if ring.get(key) == "s2") > 0
+    assert moved_total() == before
@@ -0,0 +1,111 @@
+"""
+Tests for per-call and context deadlines.
+"""
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.valkey_core.client import ValkeyClient
+from app.core.valkey_core.config import ValkeyConfig
+from app.core.valkey_core.deadlines import DeadlineMiddleware, deadline, remaining
+
+
+def _slow_execute(delay: float):
+    async def _execute(command, *args, **kwargs):
+        await asyncio.sleep(delay)
+        return None
+    return _execute
+
+
+@pytest.mark.asyncio
+async def test_timeout_argument_bounds_the_call(valkey_client, monkeypatch):
+    monkeypatch.setattr(valkey_client, "_execute", _slow_execute(1.0))
+    started = time.monotonic()
+    with pytest.raises(HTTPException) as exc_info:
+        await valkey_client.get("deadline:key", timeout=0.05)
+    assert exc_info.value.status_code == 504
+    assert time.monotonic() - started < 0.5
+
+
+class _SlowConnection:
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    async def _reply(self, *args, **kwargs):
+        await asyncio.sleep(self.delay)
+        return 0
+
+    delete = publish = rpush = _reply
+
+
+@pytest.mark.asyncio
+async def test_configured_timeout_bounds_every_command(monkeypatch):
+    monkeypatch.setattr(ValkeyConfig, "VALKEY_COMMAND_TIMEOUT", 0.05)
+    client = ValkeyClient()
+    client._client = _SlowConnection(1.0)
+    monkeypatch.setattr(client, "_execute", _slow_execute(1.0))
+    calls = [
+        lambda: client.ttl("deadline:key"),
+        lambda: client.llen("deadline:list"),
+        lambda: client.delete("deadline:key"),
+        lambda: client.rpush("deadline:list", "v"),
+        lambda: client.publish("deadline:channel", "m"),
+    ]
+    for call in calls:
+        started = time.monotonic()
+        with pytest.raises(HTTPException) as exc_info:
+            await call()
+        assert exc_info.value.status_code == 504
+        assert time.monotonic() - started < 0.5
+
+    # 0 turns per-call deadlines off
+    monkeypatch.setattr(ValkeyConfig, "VALKEY_COMMAND_TIMEOUT", 0)
+    client._client = _SlowConnection(0.1)
+    assert await client.publish("deadline:channel", "m") == 0
+
+
+@pytest.mark.asyncio
+async def test_context_deadline_shortens_every_call(valkey_client, monkeypatch):
+    monkeypatch.setattr(valkey_client, "_execute", _slow_execute(1.0))
+    with deadline(0.05):
+        with deadline(10):
+            # Nested deadlines never extend the outer budget
+            assert remaining() <= 0.05
+            with pytest.raises(HTTPException):
+                await valkey_client.incr("deadline:counter")
+        # Budget exhausted: fails before sending
+        with pytest.raises(HTTPException):
+            await valkey_client.ttl("deadline:key")
+    assert remaining() is None
+
+
+@pytest.mark.asyncio
+async def test_client_recovers_after_cancelled_command(valkey_client):
+    await valkey_client.set("deadline:value", "v")
+    raw = await valkey_client.aconn()
+    for _ in range(20):
+        try:
+            await valkey_client.get("deadline:value", timeout=1e-6)
+        except HTTPException:
+            pass
+    # Connections of cancelled commands must not leak their replies
+    await raw.set("deadline:other", "o")
+    assert await raw.get("deadline:other") == b"o"
+    assert await valkey_client.get("deadline:value") == "v"
+    await valkey_client.delete("deadline:value", "deadline:other")
+
+
+@pytest.mark.asyncio
+async def test_deadline_middleware_uses_request_header():
+    seen = []
+
+    async def app(scope, receive, send):
+        seen.append(remaining())
+
+    middleware = DeadlineMiddleware(app, default=2.0)
+    await middleware({"type": "http", "headers": [(b"x-request-timeout", b"0.5")]}, None, None)
+    await middleware({"type": "http", "headers": []}, None, None)
+    assert 0 < seen[0] <= 0.5
+    assert 0.5 < seen[1] <= 2.0
@@ -0,0 +1,87 @@
+"""
+Tests for read-from-replica routing policies.
+"""
+from unittest.mock import AsyncMock
+
+import pytest
+from valkey.asyncio.cluster import ClusterNode
+from valkey.cluster import PRIMARY as PRIMARY_NODE, REPLICA as REPLICA_NODE
+
+from app.core.valkey_core.client import ValkeyClient
+from app.core.valkey_core.config import ValkeyConfig
+from app.core.valkey_core.routing import ReadRouter, read_from_primary
+
+PRIMARY = ("primary", "p")
+REPLICAS = [("r1", "a"), ("r2", "b")]
+
+
+def test_router_policies():
+    assert ReadRouter("primary").choose("k", PRIMARY, REPLICAS) == PRIMARY
+    prefer = ReadRouter("prefer-replica")
+    assert {prefer.choose("k", PRIMARY, REPLICAS) for _ in range(4)} == set(REPLICAS)
+    rr = ReadRouter("round-robin")
+    assert {rr.choose("k", PRIMARY, REPLICAS) for _ in range(6)} == {PRIMARY, *REPLICAS}
+    fastest = ReadRouter("lowest-latency")
+    for name, latency in (("primary", 0.004), ("r1", 0.001), ("r2", 0.002)):
+        fastest.stats(name).observe(latency)
+    assert fastest.choose("k", PRIMARY, REPLICAS) == ("r1", "a")
+    with pytest.raises(ValueError):
+        ReadRouter("nearest")
+
+
+def test_router_skips_lagging_and_failed_replicas():
+    router = ReadRouter("prefer-replica", max_lag=5)
+    router.update_replica("r1", {"master_link_status": "up", "master_last_io_seconds_ago": 30}, 0.001)
+    router.update_replica("r2", {"master_link_status": "down", "master_last_io_seconds_ago": 0}, 0.001)
+    assert router.choose("k", PRIMARY, REPLICAS) == PRIMARY
+    router.update_replica("r1", {"master_link_status": "up", "master_last_io_seconds_ago": 1}, 0.001)
+    assert router.choose("k", PRIMARY, REPLICAS) == ("r1", "a")
+    router.mark_failed("r1")
+    assert router.choose("k", PRIMARY, REPLICAS) == PRIMARY
+
+
+def test_router_read_your_writes_and_primary_override():
+    router = ReadRouter("prefer-replica", read_your_writes=60)
+    router.record_write(["written"])
+    assert router.choose("written", PRIMARY, REPLICAS) == PRIMARY
+    assert router.choose("other", PRIMARY, REPLICAS) != PRIMARY
+    with read_from_primary():
+        assert router.choose("other", PRIMARY, REPLICAS) == PRIMARY
+
+
+@pytest.mark.asyncio
+async def test_replica_read_falls_back_to_primary(valkey_client, monkeypatch):
+    """An unreachable replica is marked unhealthy and the read is served by the primary."""
+    monkeypatch.setattr(ValkeyConfig, "VALKEY_READ_POLICY", "prefer-replica")
+    monkeypatch.setattr(ValkeyConfig, "VALKEY_READ_YOUR_WRITES_WINDOW", 0)
+    monkeypatch.setattr(ValkeyConfig, "VALKEY_REPLICA_NODES", [{"host": "127.0.0.1", "port": 1}])
+    client = ValkeyClient()
+    try:
+        await client.set("routing:key", "value")
+        assert await client.get("routing:key") == "value"
+        assert not client._read_router.stats("127.0.0.1:1").healthy
+    finally:
+        await client.delete("routing:key")
+        await client.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_cluster_reads_outside_the_router_stay_on_primaries(monkeypatch):
+    """Only the router's targeted reads may reach replicas; raw client (and pipeline) reads may not."""
+    monkeypatch.setattr(ValkeyConfig, "VALKEY_READ_POLICY", "prefer-replica")
+    client = ValkeyClient()
+    client._cluster_mode = True
+    monkeypatch.setattr(client, "_start_client", AsyncMock())
+    raw = await client._get_cluster_client()
+    primary = ClusterNode("10.0.0.1", 6379, PRIMARY_NODE)
+    replica = ClusterNode("10.0.0.2", 6379, REPLICA_NODE)
+    slot = raw.keyslot("routing:k")
+    raw.nodes_manager.slots_cache[slot] = [primary, replica]
+    # Key parsing needs COMMAND from a live node; node selection is what's under test
+    monkeypatch.setattr(raw, "_determine_slot", AsyncMock(return_value=slot))
+
+    # Replica connections still get READONLY for the router's targeted reads
+    assert raw.connection_kwargs["valkey_connect_func"] == raw.on_connect
+    for _ in range(4):
+        assert await raw._determine_nodes("GET", "routing:k") == [primary]
+        assert await raw._determine_nodes("MGET", "routing:k") == [primary]
@@ -25,7 +25,5 @@ class ValkeyLFUCache:
         await self.client.delete(self._key(key))
 
     async def clear(self):
-        # ! Use SCAN for safety in production, not KEYS
-        keys = await self.client.scan(f"{self.namespace}:*")
-        if keys:
-            await self.client.delete(*keys)
+        # ! Use SCAN for safety in production, not KEYS; deletes stream behind the cursor
+        await self.client.scan_apply(self.client.delete_many, f"{self.namespace}:*")
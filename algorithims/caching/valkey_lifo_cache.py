@@ -41,7 +41,6 @@ class ValkeyLIFOCache:
         await self.client.lrem(self.stack_key, 0, key)
 
     async def clear(self):
-        keys = await self.client.scan(f"{self.namespace}:*")
-        if keys:
-            await self.client.delete(*keys)
+        # Deletes stream behind the SCAN cursor instead of collecting every key first
+        await self.client.scan_apply(self.client.delete_many, f"{self.namespace}:*")
         await self.client.delete(self.stack_key)
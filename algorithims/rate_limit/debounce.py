@@ -5,6 +5,7 @@
 import logging
 import time
 from app.core.valkey_core.client import get_valkey_client
+from app.core.valkey_core.config import ValkeyConfig
 
 # ! Debounce: only allow event after interval of inactivity
 # todo: Add fail-open logic and Prometheus metrics if needed
@@ -22,8 +23,10 @@ async def is_allowed_debounce(key: str, interval: int) -> bool:
     import time
     try:
         valkey_client = get_valkey_client()
-        redis = await valkey_client.aconn()
         now = int(time.time())
+        if ValkeyConfig.VALKEY_FUNCTIONS_ENABLED:
+            return await valkey_client.fcall("vapi_debounce", keys=[key], args=[interval, now]) == 1
+        redis = await valkey_client.aconn()
         ttl = await redis.ttl(key)
         if ttl > 0:
             return False
@@ -5,6 +5,7 @@
 import logging
 
 from app.core.valkey_core.client import get_valkey_client
+from app.core.valkey_core.config import ValkeyConfig
 
 # ! This implementation assumes VALKEY is healthy and available.
 # todo: Add fail-open logic and Prometheus metrics if needed
@@ -14,6 +15,9 @@ async def is_allowed_fixed_window(
 ) -> bool:
     try:
         valkey_client = get_valkey_client()
+        if ValkeyConfig.VALKEY_FUNCTIONS_ENABLED:
+            count = await valkey_client.fcall("vapi_fixed_window", keys=[key], args=[window])
+            return count <= limit
         redis = await valkey_client.aconn()
         count = await redis.incr(key)
         if count == 1:
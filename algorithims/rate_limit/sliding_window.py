@@ -5,6 +5,7 @@
 import logging
 import time
 from app.core.valkey_core.client import get_valkey_client
+from app.core.valkey_core.config import ValkeyConfig
 
 # ! Uses VALKEY sorted sets for timestamped requests
 
@@ -25,7 +26,12 @@ async def is_allowed_sliding_window(
         now = int(time.time())
         min_score = now - window
         valkey_client = get_valkey_client()
-        p = valkey_client.pipeline()
+        if ValkeyConfig.VALKEY_FUNCTIONS_ENABLED:
+            count = await valkey_client.fcall(
+                "vapi_sliding_window", keys=[key], args=[window, now, str(now)]
+            )
+            return count <= limit
+        p = await valkey_client.pipeline()
         p.zremrangebyscore(key, 0, min_score)
         p.zadd(key, {str(now): now})
         p.zcard(key)
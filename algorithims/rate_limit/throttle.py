@@ -5,6 +5,7 @@
 import logging
 import time
 from app.core.valkey_core.client import get_valkey_client
+from app.core.valkey_core.config import ValkeyConfig
 
 # ! Throttle: allow one event per interval
 # todo: Add fail-open logic and Prometheus metrics if needed
@@ -15,8 +16,10 @@ async def is_allowed_throttle(
     try:
         import time
         valkey_client = get_valkey_client()
-        redis = await valkey_client.aconn()
         now = int(time.time())
+        if ValkeyConfig.VALKEY_FUNCTIONS_ENABLED:
+            return await valkey_client.fcall("vapi_throttle", keys=[key], args=[interval, now]) == 1
+        redis = await valkey_client.aconn()
         result = await redis.setnx(key, now)
         if result:
             await redis.expire(key, interval)
@@ -5,8 +5,11 @@
 import logging
 import time
 from app.core.valkey_core.client import get_valkey_client
+from app.core.valkey_core.config import ValkeyConfig
+from app.core.valkey_core.scripts import register_script
 
-# ! Uses atomic Lua script for token refill and consume
+# ! Uses atomic Lua script for token refill and consume (sent by SHA via EVALSHA,
+# ! or the vapi_token_bucket function when VAPI_FUNCTIONS_ENABLED)
 # todo: Add fail-open logic and Prometheus metrics if needed
 
 TOKEN_BUCKET_LUA = """
@@ -31,7 +34,8 @@ else
   redis.call('EXPIRE', key, interval * 2)
   return 0
 end
-""" 
+"""
+TOKEN_BUCKET_SCRIPT = register_script("token_bucket", TOKEN_BUCKET_LUA)
 
 async def is_allowed_token_bucket(
     key: str, capacity: int, refill_rate: int, interval: int
@@ -39,17 +43,17 @@ async def is_allowed_token_bucket(
     try:
         import time
         valkey_client = get_valkey_client()
-        redis = await valkey_client.aconn()
         now = int(time.time())
-        allowed = await redis.eval(
-            TOKEN_BUCKET_LUA,
-            1,
-            key,
-            capacity,
-            refill_rate,
-            interval,
-            now,
-        )
+        if ValkeyConfig.VALKEY_FUNCTIONS_ENABLED:
+            allowed = await valkey_client.fcall(
+                "vapi_token_bucket", keys=[key], args=[capacity, refill_rate, interval, now]
+            )
+        else:
+            allowed = await valkey_client.run_script(
+                TOKEN_BUCKET_SCRIPT,
+                keys=[key],
+                args=[capacity, refill_rate, interval, now],
+            )
         return allowed == 1
     except Exception as e:
         import logging
@@ -0,0 +1,252 @@
+"""
+Keyspace memory analyzer: which prefixes (lru:, fifo:, cache:, rate_meta:...)
+hold the memory, and which keys are the biggest.
+
+Keys are streamed with ValkeyClient.scan_iter (every primary / shard in
+cluster or sharded mode). For each batch, MEMORY USAGE, TYPE and PTTL are sent
+in one non-transactional pipeline, and the results are aggregated per key
+prefix: key count, bytes, type mix and TTL distribution. The top-N biggest
+keys are kept in a bounded heap.
+
+To run against production safely:
+- sample_rate < 1 only inspects that fraction of the scanned keys (counts and
+  bytes are scaled back up in the report)
+- max_keys_per_second throttles the MEMORY USAGE lookups
+- max_keys stops after that many inspected keys
+
+Usage:
+    from app.core.valkey_core.analyzer import KeyspaceAnalyzer
+
+    report = await KeyspaceAnalyzer(client, sample_rate=0.1).run()
+    report.as_dict()
+
+CLI:
+    python -m app.core.valkey_core.analyzer --sample-rate 0.1 --rate 2000 --top 20
+"""
+
+import argparse
+import asyncio
+import heapq
+import json
+import random
+import time
+from typing import Any
+
+# Upper bounds (seconds) of the TTL buckets; keys without TTL go to "none"
+TTL_BUCKETS = ((60, "<1m"), (3600, "<1h"), (86400, "<1d"), (7 * 86400, "<7d"))
+
+
+def ttl_bucket(pttl: int) -> str:
+    if pttl is None or pttl < 0:
+        return "none"
+    for limit, label in TTL_BUCKETS:
+        if pttl < limit * 1000:
+            return label
+    return ">=7d"
+
+
+def key_prefix(key: str | bytes, separator: str = ":", depth: int = 1) -> str:
+    """Leading `depth` segments of key, with the trailing separator ("lru:"); "" if none."""
+    if isinstance(key, bytes):
+        key = key.decode("utf-8", "replace")
+    parts = key.split(separator, depth)
+    if len(parts) <= depth:
+        return ""
+    return separator.join(parts[:depth]) + separator
+
+
+class PrefixStats:
+    """Aggregated usage of one key prefix."""
+
+    __slots__ = ("keys", "bytes", "max_bytes", "types", "ttls")
+
+    def __init__(self):
+        self.keys = 0
+        self.bytes = 0
+        self.max_bytes = 0
+        self.types: dict[str, int] = {}
+        self.ttls: dict[str, int] = {}
+
+    def add(self, size: int, key_type: str, pttl: int) -> None:
+        self.keys += 1
+        self.bytes += size
+        self.max_bytes = max(self.max_bytes, size)
+        self.types[key_type] = self.types.get(key_type, 0) + 1
+        bucket = ttl_bucket(pttl)
+        self.ttls[bucket] = self.ttls.get(bucket, 0) + 1
+
+    def as_dict(self, scale: float = 1.0) -> dict:
+        return {
+            "keys": round(self.keys * scale),
+            "bytes": round(self.bytes * scale),
+            "avg_bytes": round(self.bytes / self.keys) if self.keys else 0,
+            "max_bytes": self.max_bytes,
+            "types": {t: round(n * scale) for t, n in self.types.items()},
+            "ttl": {b: round(n * scale) for b, n in self.ttls.items()},
+        }
+
+
+class KeyspaceReport:
+    def __init__(self, top: int = 20, sample_rate: float = 1.0):
+        self.top = top
+        self.sample_rate = sample_rate
+        self.scanned = 0
+        self.inspected = 0
+        self.elapsed = 0.0
+        self.prefixes: dict[str, PrefixStats] = {}
+        # Min-heap of (bytes, key, type, pttl), bounded to `top` entries
+        self._biggest: list[tuple[int, str, str, int]] = []
+
+    def add(self, key: str, size: int | None, key_type: str, pttl: int, separator: str, depth: int) -> None:
+        if size is None:
+            # Deleted or expired between SCAN and MEMORY USAGE
+            return
+        self.inspected += 1
+        prefix = key_prefix(key, separator, depth)
+        stats = self.prefixes.get(prefix)
+        if stats is None:
+            stats = self.prefixes[prefix] = PrefixStats()
+        stats.add(size, key_type, pttl)
+        entry = (size, key, key_type, pttl)
+        if len(self._biggest) < self.top:
+            heapq.heappush(self._biggest, entry)
+        elif size > self._biggest[0][0]:
+            heapq.heapreplace(self._biggest, entry)
+
+    @property
+    def biggest(self) -> list[dict]:
+        return [
+            {"key": key, "bytes": size, "type": key_type, "ttl": ttl_bucket(pttl)}
+            for size, key, key_type, pttl in sorted(self._biggest, reverse=True)
+        ]
+
+    def as_dict(self) -> dict:
+        scale = 1 / self.sample_rate
+        prefixes = sorted(self.prefixes.items(), key=lambda item: item[1].bytes, reverse=True)
+        return {
+            "scanned": self.scanned,
+            "inspected": self.inspected,
+            "sample_rate": self.sample_rate,
+            "elapsed": round(self.elapsed, 3),
+            "total_bytes": round(sum(s.bytes for s in self.prefixes.values()) * scale),
+            "prefixes": {prefix or "(no prefix)": stats.as_dict(scale) for prefix, stats in prefixes},
+            "biggest": self.biggest,
+        }
+
+
+class KeyspaceAnalyzer:
+    """
+    Aggregates memory usage per key prefix over a (sampled) SCAN.
+
+    Args:
+        client: A ValkeyClient
+        match: Only analyze keys matching this pattern
+        sample_rate: Fraction of scanned keys to inspect (0 < rate <= 1)
+        top: Number of biggest keys to report
+        batch_size: SCAN COUNT hint, also the lookup pipeline size
+        max_keys_per_second: Throttle for inspected keys (None = unlimited)
+        max_keys: Stop after inspecting this many keys (None = whole keyspace)
+        memory_samples: MEMORY USAGE SAMPLES for aggregate types (None = server default)
+        separator/depth: How prefixes are cut ("lru:123" -> "lru:" by default)
+    """
+
+    def __init__(
+        self,
+        client,
+        match: str = "*",
+        sample_rate: float = 1.0,
+        top: int = 20,
+        batch_size: int = 500,
+        max_keys_per_second: float | None = None,
+        max_keys: int | None = None,
+        memory_samples: int | None = None,
+        separator: str = ":",
+        depth: int = 1,
+    ):
+        if not 0 < sample_rate <= 1:
+            raise ValueError("sample_rate must be in (0, 1]")
+        self.client = client
+        self.match = match
+        self.sample_rate = sample_rate
+        self.top = top
+        self.batch_size = batch_size
+        self.max_keys_per_second = max_keys_per_second
+        self.max_keys = max_keys
+        self.memory_samples = memory_samples
+        self.separator = separator
+        self.depth = depth
+
+    async def run(self) -> KeyspaceReport:
+        report = KeyspaceReport(self.top, self.sample_rate)
+        started = time.monotonic()
+        raw = await self.client.get_client()
+        async for batch in self.client.scan_iter(self.match, count=self.batch_size):
+            report.scanned += len(batch)
+            if self.sample_rate < 1:
+                batch = [key for key in batch if random.random() < self.sample_rate]
+            if self.max_keys is not None:
+                batch = batch[: self.max_keys - report.inspected]
+            if batch:
+                await self._inspect(raw, batch, report)
+                if self.max_keys_per_second:
+                    ahead = report.inspected / self.max_keys_per_second - (time.monotonic() - started)
+                    if ahead > 0:
+                        await asyncio.sleep(ahead)
+            if self.max_keys is not None and report.inspected >= self.max_keys:
+                break
+        report.elapsed = time.monotonic() - started
+        return report
+
+    async def _inspect(self, raw, keys: list, report: KeyspaceReport) -> None:
+        pipe = raw.pipeline(transaction=False)
+        for key in keys:
+            pipe.memory_usage(key, samples=self.memory_samples)
+            pipe.type(key)
+            pipe.pttl(key)
+        results = await pipe.execute(raise_on_error=False)
+        for i, key in enumerate(keys):
+            size, key_type, pttl = results[3 * i:3 * i + 3]
+            if isinstance(size, Exception):
+                continue
+            if isinstance(key, bytes):
+                key = key.decode("utf-8", "replace")
+            if isinstance(key_type, bytes):
+                key_type = key_type.decode()
+            report.add(key, size, key_type, pttl, self.separator, self.depth)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Valkey memory usage per key prefix")
+    parser.add_argument("--match", default="*")
+    parser.add_argument("--sample-rate", type=float, default=1.0)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--rate", type=float, default=None, help="Max keys inspected per second")
+    parser.add_argument("--max-keys", type=int, default=None)
+    parser.add_argument("--depth", type=int, default=1, help="Prefix segments to group by")
+    args = parser.parse_args(argv)
+
+    from .client import ValkeyClient
+
+    async def _run() -> dict[str, Any]:
+        client = ValkeyClient()
+        try:
+            report = await KeyspaceAnalyzer(
+                client,
+                match=args.match,
+                sample_rate=args.sample_rate,
+                top=args.top,
+                batch_size=args.batch_size,
+                max_keys_per_second=args.rate,
+                max_keys=args.max_keys,
+                depth=args.depth,
+            ).run()
+            return report.as_dict()
+        finally:
+            await client.shutdown()
+
+    print(json.dumps(asyncio.run(_run()), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Automatic pipelining for ValkeyClient.
+
+Single-key commands awaited concurrently by many coroutines are queued and
+sent as one non-transactional pipeline per flush, instead of each coroutine
+checking out a pool connection and paying its own round trip. Replies are
+demultiplexed back to the waiting futures in order.
+
+Flush policy:
+- window_us == 0: flush on the next event loop iteration (everything issued
+  in the current tick is batched together)
+- window_us > 0: flush after that many microseconds, trading a little latency
+  for bigger batches
+- At most max_batch commands per pipeline and max_inflight pipelines at once.
+  While all pipelines are busy, new commands keep queueing, so batches grow
+  under load and the socket count stays fixed.
+"""
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from valkey.exceptions import ConnectionError
+
+logger = logging.getLogger(__name__)
+
+
+class AutoPipeliner:
+    """
+    Queues commands issued in the same loop tick and flushes them as pipelines.
+
+    Usage:
+        pipeliner = AutoPipeliner(client.get_client)
+        value = await pipeliner.execute("get", "my_key")
+        await pipeliner.execute("set", "my_key", "v", ex=60)
+    """
+
+    def __init__(
+        self,
+        get_client: Callable[[], Awaitable[Any]],
+        window_us: int = 0,
+        max_batch: int = 1000,
+        max_inflight: int = 8,
+    ):
+        self._get_client = get_client
+        self.window_us = window_us
+        self.max_batch = max_batch
+        self.max_inflight = max_inflight
+        self._queue: list[tuple[str, tuple, dict, asyncio.Future]] = []
+        self._scheduled = False
+        self._inflight = 0
+        self._tasks: set[asyncio.Task] = set()
+        self.batches = 0
+        self.commands = 0
+
+    async def execute(self, command: str, *args: Any, **kwargs: Any) -> Any:
+        """
+        Queue a pipeline command method (e.g. "get", "set", "incr") and wait
+        for its reply. Per-command errors are raised to the caller only.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.append((command, args, kwargs, future))
+        if len(self._queue) >= self.max_batch:
+            self._flush()
+        else:
+            self._schedule(loop)
+        return await future
+
+    def _schedule(self, loop: asyncio.AbstractEventLoop) -> None:
+        if self._scheduled:
+            return
+        self._scheduled = True
+        if self.window_us:
+            loop.call_later(self.window_us / 1_000_000, self._flush)
+        else:
+            loop.call_soon(self._flush)
+
+    def _flush(self) -> None:
+        self._scheduled = False
+        while self._queue and self._inflight < self.max_inflight:
+            batch = self._queue[: self.max_batch]
+            del self._queue[: self.max_batch]
+            self._inflight += 1
+            task = asyncio.get_running_loop().create_task(self._send(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, batch: list[tuple[str, tuple, dict, asyncio.Future]]) -> None:
+        try:
+            # Drop commands whose callers were cancelled while queued
+            batch = [item for item in batch if not item[3].done()]
+            if not batch:
+                return
+            try:
+                client = await self._get_client()
+                pipe = client.pipeline(transaction=False)
+                for command, args, kwargs, _ in batch:
+                    getattr(pipe, command)(*args, **kwargs)
+                results = await pipe.execute(raise_on_error=False)
+            except Exception as exc:
+                for *_, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                return
+            self.batches += 1
+            self.commands += len(batch)
+            logger.debug(f"Valkey auto-pipeline flushed {len(batch)} commands")
+            for (*_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+        finally:
+            self._inflight -= 1
+            if self._queue:
+                self._flush()
+
+    async def close(self) -> None:
+        """Fail queued commands and wait for in-flight pipelines to finish."""
+        queued, self._queue = self._queue, []
+        for *_, future in queued:
+            if not future.done():
+                future.set_exception(ConnectionError("Valkey auto-pipeline closed"))
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
@@ -0,0 +1,228 @@
+"""
+Chunked, node-aware pipelines for large batches.
+
+A plain pipeline buffers every queued command and every reply until
+execute() returns, and in cluster mode one slow node holds up the whole
+batch. BatchPipeline streams instead:
+
+- commands are grouped by the node that owns their first key (cluster
+  primary, shard, or the single standalone node)
+- each group is cut into chunks of at most max_commands commands /
+  max_bytes of arguments, and a chunk is sent as soon as it is full
+- at most max_inflight chunks run at once, concurrently across nodes
+- results are yielded in the order the commands were given
+
+Only a window of max_inflight * max_commands commands (and their replies) is
+held at any time, so memory stays flat however many commands are streamed
+through. Chunks are non-transactional pipelines: there is no atomicity across
+commands.
+
+Usage:
+    pipe = client.batch_pipeline()
+    async for result in pipe.stream(("set", (f"k:{i}", i)) for i in range(100_000)):
+        ...
+
+    # or queue a small batch builder-style
+    pipe.set("a", 1)
+    pipe.incr("b")
+    results = await pipe.execute()
+"""
+
+import asyncio
+import logging
+from collections import deque
+from collections.abc import AsyncIterable, AsyncIterator, Iterable
+from typing import Any
+
+from valkey.asyncio import ValkeyCluster
+
+from .exceptions.exceptions import handle_valkey_exceptions
+from .sharding import ShardedValkey
+
+logger = logging.getLogger(__name__)
+
+# Group of keyless commands (they run on the default node)
+_DEFAULT_GROUP = ""
+
+
+def _size(value: Any) -> int:
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(_size(k) + _size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(_size(v) for v in value)
+    return 8
+
+
+class _Chunk:
+    __slots__ = ("group", "commands", "bytes", "task", "cursor")
+
+    def __init__(self, group: str):
+        self.group = group
+        self.commands: list[tuple[str, tuple, dict]] = []
+        self.bytes = 0
+        self.task: asyncio.Task | None = None
+        # Index of the next result to hand out
+        self.cursor = 0
+
+
+class BatchPipeline:
+    """
+    Streams commands through bounded, per-node pipeline chunks.
+
+    Args:
+        client: A raw client (Valkey, ValkeyCluster or ShardedValkey), or an
+            async callable returning one (e.g. ValkeyClient.get_client)
+        max_commands: Max commands per chunk
+        max_bytes: Max approximate argument bytes per chunk
+        max_inflight: Max chunks executing at once
+        raise_on_error: Raise a command's error when its result is reached
+            (otherwise the exception is yielded in its place)
+    """
+
+    def __init__(
+        self,
+        client,
+        max_commands: int = 1000,
+        max_bytes: int = 1 << 20,
+        max_inflight: int = 4,
+        raise_on_error: bool = True,
+    ):
+        self._client = client
+        self.max_commands = max(1, max_commands)
+        self.max_bytes = max_bytes
+        self.max_inflight = max(1, max_inflight)
+        self.raise_on_error = raise_on_error
+        self._queued: list[tuple[str, tuple, dict]] = []
+        self.chunks = 0
+
+    def __getattr__(self, name: str):
+        """Builder-style queueing: pipe.set(key, value, ex=60)"""
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        def _queue(*args, **kwargs) -> "BatchPipeline":
+            self._queued.append((name, args, kwargs))
+            return self
+
+        return _queue
+
+    def __len__(self) -> int:
+        return len(self._queued)
+
+    async def execute(self) -> list[Any]:
+        """Run the commands queued builder-style and return all results in order."""
+        queued, self._queued = self._queued, []
+        return [result async for result in self.stream(queued)]
+
+    async def _raw_client(self):
+        client = self._client
+        if callable(client) and not hasattr(client, "pipeline"):
+            client = await client()
+        return client
+
+    def _grouper(self, client):
+        """Returns key -> group name for the client's topology"""
+        if isinstance(client, ValkeyCluster):
+            return lambda key: client.get_node_from_key(key).name
+        if isinstance(client, ShardedValkey):
+            return client.ring.get
+        return lambda key: _DEFAULT_GROUP
+
+    @staticmethod
+    def _pipeline(client, group: str):
+        if isinstance(client, ValkeyCluster):
+            # Every command of the chunk maps to one node: one request, and
+            # MOVED/ASK redirects are still handled by the cluster pipeline
+            return client.pipeline()
+        if isinstance(client, ShardedValkey):
+            return client.shards[group or next(iter(client.shards))].pipeline(transaction=False)
+        return client.pipeline(transaction=False)
+
+    async def stream(
+        self, commands: Iterable[tuple] | AsyncIterable[tuple]
+    ) -> AsyncIterator[Any]:
+        """
+        Execute commands and yield their results in order.
+
+        Args:
+            commands: (command, args) or (command, args, kwargs) tuples, where
+                command is a pipeline method name ("set", "hset", ...). May be
+                a (async) generator: it is consumed lazily.
+        """
+        client = await self._raw_client()
+        if isinstance(client, ValkeyCluster):
+            await client.initialize()
+        group_of = self._grouper(client)
+        semaphore = asyncio.Semaphore(self.max_inflight)
+        window = self.max_inflight * self.max_commands
+        open_chunks: dict[str, _Chunk] = {}
+        # One entry per command not yet yielded: the chunk holding its result
+        order: deque[_Chunk] = deque()
+
+        async def _run(chunk: _Chunk) -> list[Any]:
+            async with semaphore:
+                pipe = self._pipeline(client, chunk.group)
+                for command, args, kwargs in chunk.commands:
+                    getattr(pipe, command)(*args, **kwargs)
+                return await handle_valkey_exceptions(
+                    lambda: pipe.execute(raise_on_error=False),
+                    logger=logger,
+                    endpoint="valkey.batch_pipeline",
+                )
+
+        def _dispatch(chunk: _Chunk) -> None:
+            if open_chunks.get(chunk.group) is chunk:
+                del open_chunks[chunk.group]
+            chunk.task = asyncio.create_task(_run(chunk))
+            self.chunks += 1
+
+        async def _next_result() -> Any:
+            chunk = order.popleft()
+            if chunk.task is None:
+                # Head-of-line command still buffered: send its partial chunk
+                _dispatch(chunk)
+            results = await chunk.task
+            result = results[chunk.cursor]
+            chunk.cursor += 1
+            if chunk.cursor == len(chunk.commands):
+                # Drop references so replies are freed as soon as they're yielded
+                chunk.commands, chunk.task = [], None
+            if self.raise_on_error and isinstance(result, Exception):
+                raise result
+            return result
+
+        if isinstance(commands, AsyncIterable):
+            source = commands
+        else:
+            async def _iterate():
+                for item in commands:
+                    yield item
+            source = _iterate()
+
+        try:
+            async for item in source:
+                command, args = item[0], tuple(item[1])
+                kwargs = item[2] if len(item) > 2 else {}
+                group = group_of(args[0]) if args else _DEFAULT_GROUP
+                chunk = open_chunks.get(group)
+                if chunk is None:
+                    chunk = open_chunks[group] = _Chunk(group)
+                chunk.commands.append((command, args, kwargs))
+                chunk.bytes += len(command) + _size(args) + _size(kwargs)
+                order.append(chunk)
+                if len(chunk.commands) >= self.max_commands or chunk.bytes >= self.max_bytes:
+                    _dispatch(chunk)
+                while len(order) > window:
+                    yield await _next_result()
+            for chunk in list(open_chunks.values()):
+                _dispatch(chunk)
+            while order:
+                yield await _next_result()
+        finally:
+            for chunk in set(order):
+                if chunk.task is not None:
+                    chunk.task.cancel()
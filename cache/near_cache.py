@@ -0,0 +1,283 @@
+"""
+Near cache (client-side caching) for ValkeyClient.
+
+Keeps a bounded in-process copy of recently read keys and evicts entries when
+the server reports that they changed, using CLIENT TRACKING in BCAST mode with
+invalidations REDIRECTed to a dedicated pub/sub connection per node.
+
+Why BCAST + REDIRECT:
+- Works with both RESP2 and RESP3 connections (invalidations arrive on the
+  ``__redis__:invalidate`` channel).
+- The pooled connections that serve reads don't need tracking state, so any
+  connection can serve a read and the pool stays untouched.
+
+Coherence rules:
+- Entries are only stored while every node's tracking session is live.
+- A read that overlaps an invalidation of the same key is never stored.
+- Losing a tracking connection flushes the whole near cache.
+- The tracking connection is checked with ``CLIENT TRACKINGINFO`` every
+  ``VALKEY_NEAR_CACHE_KEEPALIVE`` seconds, which also keeps it from idling out
+  (``timeout`` in valkey.conf); tracking found off counts as a lost connection.
+- ``VALKEY_NEAR_CACHE_TTL`` bounds staleness for anything tracking can't see
+  (e.g. a slot migrating to a node that wasn't tracked when we subscribed).
+
+Values are returned by reference: treat near-cached objects as read-only.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "__redis__:invalidate"
+
+# Sentinel returned by NearCache.lookup on a miss (None is a valid cached value)
+MISSING = object()
+
+
+def _text(value: Any) -> Any:
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+class _TrackingSession:
+    """
+    CLIENT TRACKING session against a single node.
+
+    Holds the pub/sub connection receiving invalidations and the connection
+    that owns the tracking state. If either reconnects, the server-side
+    tracking is gone, so the session is marked broken and rebuilt.
+    """
+
+    def __init__(self, node_client, prefixes: tuple[str, ...]):
+        self._node_client = node_client
+        self._prefixes = prefixes
+        self.pubsub = None
+        self.tracker = None
+        self.broken = False
+
+    async def open(self) -> None:
+        self.pubsub = self._node_client.pubsub()
+        # CLIENT ID must be read before SUBSCRIBE puts the connection in pub/sub mode
+        await self.pubsub.execute_command("CLIENT", "ID")
+        listener_id = await self.pubsub.parse_response(block=True)
+        await self.pubsub.subscribe(INVALIDATION_CHANNEL)
+
+        self.tracker = self._node_client.client()
+        args = ["CLIENT", "TRACKING", "ON", "REDIRECT", listener_id, "BCAST"]
+        for prefix in self._prefixes:
+            args.extend(("PREFIX", prefix))
+        await self.tracker.execute_command(*args)
+
+        self.pubsub.connection.register_connect_callback(self._on_reconnect)
+        self.tracker.connection.register_connect_callback(self._on_reconnect)
+
+    async def _on_reconnect(self, connection) -> None:
+        self.broken = True
+
+    async def check(self) -> None:
+        """Mark the session broken unless the node still redirects invalidations to us."""
+        info = await self.tracker.execute_command("CLIENT", "TRACKINGINFO")
+        # RESP2 replies with a flat list, RESP3 with a map
+        if isinstance(info, (list, tuple)):
+            info = dict(zip(info[::2], info[1::2]))
+        info = {_text(field): value for field, value in info.items()}
+        flags = {_text(flag) for flag in info.get("flags") or ()}
+        if "on" not in flags or "broken_redirect" in flags:
+            logger.warning(f"Near cache tracking lost on the server (flags: {sorted(flags)})")
+            self.broken = True
+
+    async def close(self) -> None:
+        for conn in (self.pubsub, self.tracker):
+            if conn is None:
+                continue
+            try:
+                await conn.aclose()
+            except Exception as e:
+                logger.debug(f"Error closing near cache tracking connection: {e}")
+        self.pubsub = None
+        self.tracker = None
+
+
+class NearCache:
+    """
+    Bounded LRU of decoded values, invalidated by server push messages.
+
+    Usage (driven by ValkeyClient.get):
+        value = near_cache.lookup(key)
+        if value is MISSING:
+            token = near_cache.begin(key)
+            value = ...  # network read
+            near_cache.finish(key, token, value)
+    """
+
+    def __init__(
+        self,
+        max_size: int = 10000,
+        ttl: float = 60.0,
+        prefixes: Iterable[str] = (),
+        on_invalidate: Callable[[int], None] | None = None,
+        keepalive: float = 30.0,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.keepalive = keepalive
+        self.prefixes = tuple(prefixes)
+        self._on_invalidate = on_invalidate
+        self._entries: OrderedDict[str, tuple[Any, float]] = OrderedDict()
+        # Reads in flight per key, and keys invalidated while a read was in flight
+        self._pending: dict[str, int] = {}
+        self._stale: set[str] = set()
+        self._flush_epoch = 0
+        self._sessions: list[_TrackingSession] = []
+        self._tasks: list[asyncio.Task] = []
+        self._live: set[int] = set()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def active(self) -> bool:
+        """True when every node's tracking session is subscribed."""
+        return bool(self._sessions) and len(self._live) == len(self._sessions)
+
+    def _tracks(self, key: str) -> bool:
+        return not self.prefixes or key.startswith(self.prefixes)
+
+    def lookup(self, key: str) -> Any:
+        """Return the cached value for key, or MISSING."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return MISSING
+        value, expires_at = entry
+        if expires_at and expires_at < time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return MISSING
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def begin(self, key: str) -> int:
+        """Register a read in flight for key. Returns a token for finish()."""
+        self._pending[key] = self._pending.get(key, 0) + 1
+        return self._flush_epoch
+
+    def finish(self, key: str, token: int, value: Any = MISSING) -> None:
+        """
+        Complete a read started with begin(). The value is stored only if the
+        key wasn't invalidated (or the cache flushed) while the read was in flight.
+        Pass no value when the read failed.
+        """
+        remaining = self._pending.get(key, 0) - 1
+        stale = key in self._stale
+        if remaining > 0:
+            self._pending[key] = remaining
+        else:
+            self._pending.pop(key, None)
+            self._stale.discard(key)
+        if (
+            value is MISSING
+            or stale
+            or token != self._flush_epoch
+            or not self.active
+            or not self._tracks(key)
+        ):
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl else 0.0
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, keys: Iterable[str | bytes] | None) -> None:
+        """Drop keys from the near cache. None drops everything."""
+        if keys is None:
+            count = len(self._entries)
+            self._entries.clear()
+            self._stale.update(self._pending)
+            self._flush_epoch += 1
+        else:
+            count = 0
+            for key in keys:
+                if isinstance(key, bytes):
+                    key = key.decode("utf-8")
+                if self._entries.pop(key, None) is not None:
+                    count += 1
+                if key in self._pending:
+                    self._stale.add(key)
+        if count:
+            self.invalidations += count
+            if self._on_invalidate:
+                self._on_invalidate(count)
+
+    def clear(self) -> None:
+        self.invalidate(None)
+
+    def stats(self) -> dict:
+        return {
+            "active": self.active,
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+    async def start(self, node_clients: list) -> None:
+        """Start one tracking session per node (non-blocking)."""
+        if self._tasks:
+            return
+        for index, node_client in enumerate(node_clients):
+            session = _TrackingSession(node_client, self.prefixes)
+            self._sessions.append(session)
+            self._tasks.append(asyncio.create_task(self._track(index, session)))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        for session in self._sessions:
+            await session.close()
+        self._tasks = []
+        self._sessions = []
+        self._live.clear()
+        self.clear()
+
+    async def _track(self, index: int, session: _TrackingSession) -> None:
+        backoff = 0.1
+        while True:
+            try:
+                await session.open()
+                self._live.add(index)
+                backoff = 0.1
+                logger.debug(f"Near cache tracking session {index} subscribed")
+                next_check = time.monotonic() + self.keepalive
+                while not session.broken:
+                    message = await session.pubsub.get_message(
+                        ignore_subscribe_messages=True, timeout=min(1.0, self.keepalive or 1.0)
+                    )
+                    if message and message.get("type") == "message":
+                        self.invalidate(message["data"])
+                    if self.keepalive and time.monotonic() >= next_check:
+                        await session.check()
+                        next_check = time.monotonic() + self.keepalive
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Near cache tracking session {index} failed: {e}")
+            finally:
+                self._live.discard(index)
+                # Server-side tracking state is lost with the connection
+                self.clear()
+                session.broken = False
+                await session.close()
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 5.0)
@@ -15,6 +15,9 @@ from collections.abc import Callable
 from typing import Any
 
 from ..client import client as valkey_client
+from ..config import ValkeyConfig
+from ..metrics import record_compression
+from ..serialization import Compressor, decompress
 
 logger = logging.getLogger(__name__)
 
@@ -22,10 +25,39 @@ class ValkeyCache:
     """
     Async wrapper for VALKEY cache operations. Provides get, set, delete, and composite cache methods.
     Reuses the core async functions for all logic.
+
+    String/bytes values larger than compress_threshold are compressed when a
+    compression algorithm is set (defaults come from ValkeyConfig.VALKEY_COMPRESSION*).
+    Compressed values are always decompressed on read.
+
+    When the wrapped ValkeyClient has hot-key mitigation enabled
+    (VALKEY_HOT_KEY_MITIGATION), reads of promoted keys are served from its
+    local copies / replica keys, and writes through this cache invalidate them.
     """
-    def __init__(self, client=valkey_client):
+    def __init__(
+        self,
+        client=valkey_client,
+        compression: str | None = None,
+        compression_level: int | None = None,
+        compress_threshold: int | None = None,
+    ):
         # Accepts either a ValkeyClient (wrapper) or a raw async client
         self._client = client
+        self._hot_keys = getattr(client, "hot_key_mitigation", None)
+        compression = compression or ValkeyConfig.VALKEY_COMPRESSION
+        self._compressor = None
+        if compression:
+            self._compressor = Compressor(
+                compression,
+                level=compression_level if compression_level is not None else ValkeyConfig.VALKEY_COMPRESSION_LEVEL,
+                threshold=compress_threshold if compress_threshold is not None else ValkeyConfig.VALKEY_COMPRESSION_THRESHOLD,
+                on_bytes=self._count_compression_bytes,
+            )
+
+    @staticmethod
+    def _count_compression_bytes(direction: str, uncompressed: int, compressed: int) -> None:
+        if ValkeyConfig.VALKEY_METRICS_ENABLED:
+            record_compression("valkey_cache", direction, uncompressed, compressed)
 
     async def _get_raw_client(self):
         # If self._client is a ValkeyClient, get the underlying async client
@@ -33,17 +65,32 @@ class ValkeyCache:
             return await self._client.get_client()
         return self._client
 
+    async def _invalidate_hot_key(self, raw_client, key: str) -> None:
+        if self._hot_keys is not None:
+            replica_keys = self._hot_keys.invalidate([key])
+            if replica_keys:
+                await raw_client.delete(*replica_keys)
+
     async def get(self, key: str, default: Any = None) -> Any:
         """Get a value from the cache"""
         try:
             raw_client = await self._get_raw_client()
-            value = await raw_client.get(key)
+            mitigation = self._hot_keys
+            if mitigation is not None:
+                mitigation.record(key)
+            if mitigation is not None and mitigation.is_promoted(key):
+                value = await mitigation.read(
+                    key, raw_client.get, lambda k, v, px: raw_client.set(k, v, px=px)
+                )
+            else:
+                value = await raw_client.get(key)
             if value is None:
                 logger.debug(f"Cache miss for key: {key}")
                 return default
                 
             logger.debug(f"Cache hit for key: {key}")
             if isinstance(value, bytes):
+                value = self._compressor.decompress(value) if self._compressor else decompress(value)
                 return value.decode('utf-8')
             return value
         except Exception as e:
@@ -54,7 +101,12 @@ class ValkeyCache:
         """Set a value in the cache with optional TTL"""
         try:
             raw_client = await self._get_raw_client()
+            if self._compressor is not None and isinstance(value, (str, bytes)):
+                data = value.encode("utf-8") if isinstance(value, str) else value
+                if len(data) > self._compressor.threshold:
+                    value = self._compressor.compress(data)
             await raw_client.set(key, value, ex=ttl)
+            await self._invalidate_hot_key(raw_client, key)
             logger.debug(f"Cache set for key: {key}")
         except Exception as e:
             logger.warning(f"Error setting VALKEY cache: {str(e)}")
@@ -64,6 +116,7 @@ class ValkeyCache:
         try:
             raw_client = await self._get_raw_client()
             result = await raw_client.delete(key)
+            await self._invalidate_hot_key(raw_client, key)
             success = bool(result)
             logger.debug(f"Cache delete for key: {key}, success: {success}")
             return success
@@ -14,6 +14,7 @@ import asyncio
 import json
 import logging
 import time
+from collections.abc import AsyncIterator, Awaitable, Callable
 from typing import Any
 
 from valkey.asyncio import Valkey, ValkeyCluster
@@ -22,12 +23,31 @@ from valkey.backoff import (
     DecorrelatedJitterBackoff,
     ExponentialBackoff,
 )
+from valkey.exceptions import ConnectionError as ValkeyConnectionError
+from valkey.exceptions import NoScriptError, ResponseError
 from valkey.retry import Retry
 from .exceptions.exceptions import TimeoutError, ValkeyError
 
+from .auto_pipeline import AutoPipeliner
+from .batch_pipeline import BatchPipeline
+from .cache.near_cache import MISSING, NearCache
+from .concurrency import AdaptiveLimiter
 from .config import ValkeyConfig
-from .exceptions.exceptions import handle_valkey_exceptions
-from .decorators import track_valkey_metrics
+from .exceptions.exceptions import raise_valkey_exception
+from .deadlines import run_with_deadline
+from .decorators import MetricsRecorder, track_valkey_metrics
+from .functions import LIBRARY_NAME, LIBRARY_SOURCE, LIBRARY_VERSION, LOADED_SCOPES
+from .hedging import Hedger
+from .hotkeys import HotKeyMitigation, HotKeyTracker
+from .limiting.circuit_breaker import CircuitBreakerRegistry
+from .metrics import get_warm_up_seconds, record_compression
+from .pools import PoolMonitor, PoolSizer, export_pool_stats, instrument_client, open_connections
+from .pools import pool_stats as collect_pool_stats
+from .routing import READ_COMMANDS, ReadRouter
+from .serialization import Compressor, ValueSerializer
+from .scripts import SCRIPTS, Script, get_script
+from .sharding import ShardedValkey, shard_name
+from .transactions import ContentionTracker, run_transaction
 from ..prometheus.metrics import get_cache_count, get_cache_latency, get_cache_hit_ratio
 
 VALKEY_CLUSTER = ValkeyConfig.VALKEY_CLUSTER
@@ -44,7 +64,6 @@ logger = logging.getLogger(__name__)
 # Default timeout constants (in seconds)
 DEFAULT_CONNECTION_TIMEOUT = 5.0
 DEFAULT_SOCKET_TIMEOUT = 10.0
-DEFAULT_COMMAND_TIMEOUT = 5.0
 
 
 class ValkeyLock:
@@ -83,20 +102,139 @@ class ValkeyClient:
     - Connection pooling
     - Automatic reconnections
     - Timeout handling
-    - Sharding support
+    - Sharding support (Valkey Cluster, or client-side consistent hashing)
     - Structured Valkey exception handling
     - Distributed locking (see lock method)
     """
 
-    def __init__(self):
-        """Initialize with automatic cluster detection"""
+    def __init__(self, codec: str | None = None):
+        """
+        Initialize with automatic cluster detection.
+
+        Args:
+            codec: Value codec for this client (defaults to VALKEY_CODEC);
+                per-namespace overrides come from VALKEY_CODEC_NAMESPACES
+        """
         self._client = None
         self._cluster_mode = VALKEY_CLUSTER
+        self._sharded = ValkeyConfig.VALKEY_SHARDING_ENABLED and not self._cluster_mode
         self._metrics_task = None
         self._metrics_enabled = ValkeyConfig.VALKEY_METRICS_ENABLED
+        self._pool_monitor = PoolMonitor(export=self._metrics_enabled)
+        self._pool_sizer = None
+        self._pool_sizer_task = None
+        if ValkeyConfig.VALKEY_POOL_AUTOSIZE:
+            self._pool_sizer = PoolSizer(
+                self._pool_monitor,
+                floor=ValkeyConfig.VALKEY_POOL_SIZE,
+                ceiling=VALKEY_MAX_CONNECTIONS,
+                idle_timeout=ValkeyConfig.VALKEY_POOL_IDLE_TIMEOUT,
+            )
         self._metrics_namespace = getattr(
             ValkeyConfig, "REDIS_METRICS_NAMESPACE", "valkey"
         )
+        # Per-command metrics of @track_valkey_metrics methods
+        self._metrics_recorder = MetricsRecorder(
+            self._metrics_namespace,
+            sample_rate=ValkeyConfig.VALKEY_METRICS_SAMPLE_RATE,
+            aggregate=ValkeyConfig.VALKEY_METRICS_AGGREGATE,
+        )
+        self._metrics_flush_task = None
+        compressor = None
+        if ValkeyConfig.VALKEY_COMPRESSION:
+            compressor = Compressor(
+                ValkeyConfig.VALKEY_COMPRESSION,
+                level=ValkeyConfig.VALKEY_COMPRESSION_LEVEL,
+                threshold=ValkeyConfig.VALKEY_COMPRESSION_THRESHOLD,
+                on_bytes=self._count_compression_bytes,
+            )
+        self._serializer = ValueSerializer(
+            codec or ValkeyConfig.VALKEY_CODEC,
+            ValkeyConfig.VALKEY_CODEC_NAMESPACES,
+            fallback=self._maybe_json_decode,
+            compressor=compressor,
+        )
+        self._near_cache = None
+        self._near_cache_nodes = []
+        if ValkeyConfig.VALKEY_NEAR_CACHE_ENABLED:
+            self._near_cache = NearCache(
+                max_size=ValkeyConfig.VALKEY_NEAR_CACHE_MAX_SIZE,
+                ttl=ValkeyConfig.VALKEY_NEAR_CACHE_TTL,
+                prefixes=ValkeyConfig.VALKEY_NEAR_CACHE_PREFIXES,
+                on_invalidate=self._count_near_cache_invalidations,
+                keepalive=ValkeyConfig.VALKEY_NEAR_CACHE_KEEPALIVE,
+            )
+        self._read_router = ReadRouter(
+            ValkeyConfig.VALKEY_READ_POLICY,
+            max_lag=ValkeyConfig.VALKEY_REPLICA_MAX_LAG,
+            read_your_writes=ValkeyConfig.VALKEY_READ_YOUR_WRITES_WINDOW,
+        )
+        self._replica_clients: list[tuple[str, Valkey]] = []
+        self._replica_task = None
+        self._hedger = None
+        if ValkeyConfig.VALKEY_HEDGE_READS:
+            self._hedger = Hedger(
+                percentile=ValkeyConfig.VALKEY_HEDGE_PERCENTILE,
+                min_delay=ValkeyConfig.VALKEY_HEDGE_MIN_DELAY,
+                max_delay=ValkeyConfig.VALKEY_HEDGE_MAX_DELAY,
+                budget=ValkeyConfig.VALKEY_HEDGE_BUDGET,
+                export=self._metrics_enabled,
+            )
+        self._breakers = None
+        if ValkeyConfig.VALKEY_CIRCUIT_BREAKER_ENABLED:
+            self._breakers = CircuitBreakerRegistry(
+                failure_threshold=ValkeyConfig.VALKEY_CIRCUIT_FAILURE_THRESHOLD,
+                failure_rate=ValkeyConfig.VALKEY_CIRCUIT_FAILURE_RATE,
+                window=ValkeyConfig.VALKEY_CIRCUIT_WINDOW,
+                reset_timeout=ValkeyConfig.VALKEY_CIRCUIT_RESET_TIMEOUT,
+                half_open_max_calls=ValkeyConfig.VALKEY_CIRCUIT_HALF_OPEN_MAX_CALLS,
+                export=self._metrics_enabled,
+            )
+        self._limiter = None
+        if ValkeyConfig.VALKEY_ADAPTIVE_CONCURRENCY:
+            self._limiter = AdaptiveLimiter(
+                initial=ValkeyConfig.VALKEY_CONCURRENCY_INITIAL,
+                min_limit=ValkeyConfig.VALKEY_CONCURRENCY_MIN,
+                max_limit=ValkeyConfig.VALKEY_CONCURRENCY_MAX,
+                tolerance=ValkeyConfig.VALKEY_CONCURRENCY_TOLERANCE,
+                max_queue=ValkeyConfig.VALKEY_CONCURRENCY_MAX_QUEUE,
+                queue_timeout=ValkeyConfig.VALKEY_CONCURRENCY_QUEUE_TIMEOUT,
+                export=self._metrics_enabled,
+            )
+        self._hot_keys = None
+        self._hot_key_mitigation = None
+        if ValkeyConfig.VALKEY_HOT_KEYS_ENABLED or ValkeyConfig.VALKEY_HOT_KEY_MITIGATION:
+            self._hot_keys = HotKeyTracker(
+                sample_every=ValkeyConfig.VALKEY_HOT_KEYS_SAMPLE_EVERY,
+                capacity=ValkeyConfig.VALKEY_HOT_KEYS_CAPACITY,
+                window=ValkeyConfig.VALKEY_HOT_KEYS_WINDOW,
+                export_top=ValkeyConfig.VALKEY_HOT_KEYS_EXPORT_TOP if self._metrics_enabled else 0,
+            )
+        if ValkeyConfig.VALKEY_HOT_KEY_MITIGATION:
+            self._hot_key_mitigation = HotKeyMitigation(
+                self._hot_keys,
+                mode=ValkeyConfig.VALKEY_HOT_KEY_MITIGATION,
+                threshold=ValkeyConfig.VALKEY_HOT_KEY_THRESHOLD,
+                cool_down=ValkeyConfig.VALKEY_HOT_KEY_COOL_DOWN,
+                local_ttl=ValkeyConfig.VALKEY_HOT_KEY_LOCAL_TTL,
+                replicas=ValkeyConfig.VALKEY_HOT_KEY_REPLICAS,
+                replica_ttl=ValkeyConfig.VALKEY_HOT_KEY_REPLICA_TTL,
+                max_promoted=ValkeyConfig.VALKEY_HOT_KEY_MAX_PROMOTED,
+            )
+        self._contention = ContentionTracker(export=self._metrics_enabled)
+        # Seconds spent per startup stage, and warm_up()'s report once it completed
+        self.startup_timings: dict[str, float] = {}
+        self.warm_up_report: dict | None = None
+        # Cluster mode: per-primary connections for WATCH/MULTI/EXEC
+        self._node_clients: dict[str, Valkey] = {}
+        self._auto_pipeline = None
+        if ValkeyConfig.VALKEY_AUTO_PIPELINE_ENABLED:
+            self._auto_pipeline = AutoPipeliner(
+                self.get_client,
+                window_us=ValkeyConfig.VALKEY_AUTO_PIPELINE_WINDOW_US,
+                max_batch=ValkeyConfig.VALKEY_AUTO_PIPELINE_MAX_BATCH,
+                max_inflight=ValkeyConfig.VALKEY_AUTO_PIPELINE_MAX_INFLIGHT,
+            )
 
     async def get_client(self) -> Valkey | ValkeyCluster:
         """
@@ -108,91 +246,517 @@ class ValkeyClient:
             return await self._get_cluster_client()
         return await self._get_sharded_client()
 
+    @staticmethod
+    def _build_retry() -> Retry:
+        """Build the Retry policy shared by every connection this client opens"""
+        # Choose backoff strategy based on config
+        backoff_type = ValkeyConfig.VALKEY_RETRY_BACKOFF_TYPE
+        if backoff_type == "exponential":
+            backoff = ExponentialBackoff(
+                base=ValkeyConfig.VALKEY_RETRY_BACKOFF_BASE,
+                cap=ValkeyConfig.VALKEY_RETRY_BACKOFF_CAP,
+            )
+        elif backoff_type == "jitter":
+            backoff = DecorrelatedJitterBackoff(
+                base=ValkeyConfig.VALKEY_RETRY_BACKOFF_BASE,
+                cap=ValkeyConfig.VALKEY_RETRY_BACKOFF_CAP,
+            )
+        else:
+            backoff = ConstantBackoff(ValkeyConfig.VALKEY_RETRY_BACKOFF_BASE)
+        return Retry(
+            backoff,
+            retries=ValkeyConfig.VALKEY_RETRY_ATTEMPTS,
+            supported_errors=(TimeoutError, ValkeyError),
+        )
+
+    @classmethod
+    def _connection_kwargs(cls) -> dict:
+        """Connection options shared by cluster, standalone and per-node clients"""
+        return dict(
+            password=VALKEY_PASSWORD,
+            db=VALKEY_DB,
+            socket_timeout=VALKEY_SOCKET_TIMEOUT,
+            socket_connect_timeout=VALKEY_SOCKET_CONNECT_TIMEOUT,
+            max_connections=VALKEY_MAX_CONNECTIONS,
+            ssl=ValkeyConfig.VALKEY_SSL,
+            ssl_cert_reqs=ValkeyConfig.VALKEY_SSL_CERT_REQS,
+            ssl_ca_certs=ValkeyConfig.VALKEY_SSL_CA_CERTS,
+            ssl_keyfile=ValkeyConfig.VALKEY_SSL_KEYFILE,
+            ssl_certfile=ValkeyConfig.VALKEY_SSL_CERTFILE,
+            retry=cls._build_retry(),
+        )
+
     async def _get_cluster_client(self) -> ValkeyCluster:
         """Get a cluster Valkey client based on configuration"""
         if not self._client:
-            # Choose backoff strategy based on config
-            backoff_type = ValkeyConfig.VALKEY_RETRY_BACKOFF_TYPE
-            if backoff_type == "exponential":
-                backoff = ExponentialBackoff(
-                    base=ValkeyConfig.VALKEY_RETRY_BACKOFF_BASE,
-                    cap=ValkeyConfig.VALKEY_RETRY_BACKOFF_CAP,
-                )
-            elif backoff_type == "jitter":
-                backoff = DecorrelatedJitterBackoff(
-                    base=ValkeyConfig.VALKEY_RETRY_BACKOFF_BASE,
-                    cap=ValkeyConfig.VALKEY_RETRY_BACKOFF_CAP,
-                )
-            else:
-                backoff = ConstantBackoff(ValkeyConfig.VALKEY_RETRY_BACKOFF_BASE)
-            retry = Retry(
-                backoff,
-                retries=ValkeyConfig.VALKEY_RETRY_ATTEMPTS,
-                supported_errors=(TimeoutError, ValkeyError),
-            )
             self._client = ValkeyCluster(
                 host=VALKEY_HOST,
                 port=VALKEY_PORT,
-                password=VALKEY_PASSWORD,
-                db=VALKEY_DB,
-                socket_timeout=VALKEY_SOCKET_TIMEOUT,
-                socket_connect_timeout=VALKEY_SOCKET_CONNECT_TIMEOUT,
-                max_connections=VALKEY_MAX_CONNECTIONS,
-                ssl=ValkeyConfig.VALKEY_SSL,
-                ssl_cert_reqs=ValkeyConfig.VALKEY_SSL_CERT_REQS,
-                ssl_ca_certs=ValkeyConfig.VALKEY_SSL_CA_CERTS,
-                ssl_keyfile=ValkeyConfig.VALKEY_SSL_KEYFILE,
-                ssl_certfile=ValkeyConfig.VALKEY_SSL_CERTFILE,
-                retry=retry,
                 cluster_error_retry_attempts=ValkeyConfig.VALKEY_RETRY_ATTEMPTS,
+                # Installs the READONLY on-connect hook replica reads need
+                read_from_replicas=self._read_router.enabled,
+                **self._connection_kwargs(),
             )
+            # ...but only the read router's targeted reads may reach replicas: pipelines,
+            # get_many and raw aconn() users stay on primaries (no lag check, read-your-writes)
+            self._client.read_from_replicas = False
+            await self._start_client()
         return self._client
 
-    async def _get_sharded_client(self) -> Valkey:
-        """Get a sharded Valkey client based on configuration"""
+    async def _get_sharded_client(self) -> Valkey | ShardedValkey:
+        """
+        Get a sharded Valkey client based on configuration: one pool per
+        VALKEY_SHARD_NODES entry behind a consistent-hash ring when sharding is
+        enabled, otherwise a single standalone connection pool.
+        """
         if not self._client:
-            backoff_type = ValkeyConfig.VALKEY_RETRY_BACKOFF_TYPE
-            if backoff_type == "exponential":
-                backoff = ExponentialBackoff(
-                    base=ValkeyConfig.VALKEY_RETRY_BACKOFF_BASE,
-                    cap=ValkeyConfig.VALKEY_RETRY_BACKOFF_CAP,
+            if self._sharded:
+                self._client = ShardedValkey(
+                    ValkeyConfig.VALKEY_SHARD_NODES,
+                    vnodes=ValkeyConfig.VALKEY_SHARD_VNODES,
+                    previous_nodes=ValkeyConfig.VALKEY_SHARD_PREVIOUS_NODES,
+                    **self._connection_kwargs(),
                 )
-            elif backoff_type == "jitter":
-                backoff = DecorrelatedJitterBackoff(
-                    base=ValkeyConfig.VALKEY_RETRY_BACKOFF_BASE,
-                    cap=ValkeyConfig.VALKEY_RETRY_BACKOFF_CAP,
+            else:
+                self._client = Valkey(
+                    host=VALKEY_HOST,
+                    port=VALKEY_PORT,
+                    **self._connection_kwargs(),
                 )
+            await self._start_client()
+        return self._client
+
+    async def _start_client(self) -> None:
+        """Startup work for a newly created client, timed per stage."""
+        if self._metrics_enabled or self._pool_sizer is not None:
+            instrument_client(self._client, self._pool_monitor)
+        if self._metrics_enabled and self._metrics_task is None:
+            self._metrics_task = asyncio.create_task(self._sample_pools())
+        if self._metrics_recorder.aggregate and self._metrics_flush_task is None:
+            self._metrics_flush_task = asyncio.create_task(self._flush_metrics())
+        stages = [
+            ("near_cache", self._start_near_cache),
+            ("read_routing", self._start_read_routing),
+            ("scripts", self._preload_scripts),
+            ("functions", self._preload_functions),
+        ]
+        if self._cluster_mode:
+            # Slot map and node list; otherwise fetched by the first command
+            stages.insert(0, ("topology", self._discover_topology))
+        for stage, step in stages:
+            started = time.perf_counter()
+            await step()
+            self.startup_timings[stage] = time.perf_counter() - started
+        if self._pool_sizer is not None and self._pool_sizer_task is None:
+            self._pool_sizer_task = asyncio.create_task(self._size_pools())
+
+    def pool_stats(self) -> dict[str, dict]:
+        """{node: {"in_use", "idle", "max"}} for the client's connection pools."""
+        if self._client is None:
+            return {}
+        stats = collect_pool_stats(self._client)
+        for _, replica in self._replica_clients:
+            stats.update(collect_pool_stats(replica))
+        return stats
+
+    async def _sample_pools(self) -> None:
+        while True:
+            try:
+                export_pool_stats(self.pool_stats())
+            except Exception as e:
+                logger.warning(f"Valkey pool metrics sampling failed: {e}")
+            await asyncio.sleep(ValkeyConfig.VALKEY_POOL_METRICS_INTERVAL)
+
+    @property
+    def pool_sizer(self) -> PoolSizer | None:
+        """The pool sizer (None unless VALKEY_POOL_AUTOSIZE)."""
+        return self._pool_sizer
+
+    async def _size_pools(self) -> None:
+        while True:
+            await asyncio.sleep(ValkeyConfig.VALKEY_POOL_SIZING_INTERVAL)
+            try:
+                if self._client is not None:
+                    await self._pool_sizer.tick([pool for _, pool in self._warm_pools(self._client)])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Valkey pool sizing failed: {e}")
+
+    async def _flush_metrics(self) -> None:
+        while True:
+            await asyncio.sleep(ValkeyConfig.VALKEY_METRICS_FLUSH_INTERVAL)
+            try:
+                self._metrics_recorder.flush()
+            except Exception as e:
+                logger.warning(f"Valkey metrics flush failed: {e}")
+
+    async def _discover_topology(self) -> None:
+        try:
+            await self._client.initialize()
+        except Exception as e:
+            # Not fatal: the first command retries the discovery
+            logger.warning(f"Valkey cluster topology discovery failed: {e}")
+
+    def _warm_pools(self, client) -> list[tuple[str, Any]]:
+        """(name, pool or cluster node) for every node commands are sent to."""
+        if self._cluster_mode:
+            nodes = client.get_primaries()
+            if self._read_router.enabled:
+                nodes += client.get_replicas()
+            return [(node.name, node) for node in nodes]
+        if self._sharded:
+            pools = [(name, shard.connection_pool) for name, shard in client.shards.items()]
+        else:
+            pools = [("primary", client.connection_pool)]
+        return pools + [(name, replica.connection_pool) for name, replica in self._replica_clients]
+
+    async def warm_up(self, min_connections: int | None = None) -> dict:
+        """
+        Get the client hot before serving traffic: create it (cluster topology,
+        near cache, replicas, scripts and functions), then open and authenticate
+        min_connections connections per node so the first requests do not pay
+        for TCP/TLS/AUTH handshakes.
+
+        Returns {"total": seconds, "stages": {stage: seconds}, "connections": {node: opened}},
+        also kept as warm_up_report (readiness probes wait for it).
+        """
+        if min_connections is None:
+            min_connections = ValkeyConfig.VALKEY_WARM_UP_CONNECTIONS
+
+        # No per-call deadline: connecting a whole cluster can take longer than one command
+        return await self._run("valkey.warm_up", 0, self._warm_up, min_connections, wrap_http_exception=False)
+
+    async def _warm_up(self, min_connections: int) -> dict:
+        started = time.perf_counter()
+        client = await self.get_client()
+        if self._cluster_mode:
+            # Raises if the startup discovery failed and the cluster is still unreachable
+            await client.initialize()
+        connect_started = time.perf_counter()
+        pools = self._warm_pools(client)
+        opened = await asyncio.gather(
+            *(open_connections(pool, min_connections) for _, pool in pools)
+        )
+        stages = {
+            **self.startup_timings,
+            "connections": time.perf_counter() - connect_started,
+        }
+        report = {
+            "total": time.perf_counter() - started,
+            "stages": stages,
+            "connections": dict(zip((name for name, _ in pools), opened)),
+        }
+        if self._metrics_enabled:
+            for stage, seconds in stages.items():
+                get_warm_up_seconds().labels(stage).set(seconds)
+        logger.info(
+            f"Valkey warm-up done in {report['total']:.3f}s: "
+            + ", ".join(f"{stage}={seconds:.3f}s" for stage, seconds in stages.items())
+        )
+        self.warm_up_report = report
+        return report
+
+    async def _start_near_cache(self) -> None:
+        """
+        Start CLIENT TRACKING sessions for the near cache (one per primary).
+        Failures leave the near cache inactive; reads simply go to the server.
+        """
+        if self._near_cache is None:
+            return
+        try:
+            if self._cluster_mode:
+                nodes = [(n.host, n.port) for n in self._client.get_primaries()]
+            elif self._sharded:
+                nodes = [(n["host"], n["port"]) for n in ValkeyConfig.VALKEY_SHARD_NODES]
             else:
-                backoff = ConstantBackoff(ValkeyConfig.VALKEY_RETRY_BACKOFF_BASE)
-            retry = Retry(
-                backoff,
-                retries=ValkeyConfig.VALKEY_RETRY_ATTEMPTS,
-                supported_errors=(TimeoutError, ValkeyError),
-            )
-            self._client = Valkey(
-                host=VALKEY_HOST,
-                port=VALKEY_PORT,
-                password=VALKEY_PASSWORD,
-                db=VALKEY_DB,
-                socket_timeout=VALKEY_SOCKET_TIMEOUT,
-                socket_connect_timeout=VALKEY_SOCKET_CONNECT_TIMEOUT,
-                max_connections=VALKEY_MAX_CONNECTIONS,
-                ssl=ValkeyConfig.VALKEY_SSL,
-                ssl_cert_reqs=ValkeyConfig.VALKEY_SSL_CERT_REQS,
-                ssl_ca_certs=ValkeyConfig.VALKEY_SSL_CA_CERTS,
-                ssl_keyfile=ValkeyConfig.VALKEY_SSL_KEYFILE,
-                ssl_certfile=ValkeyConfig.VALKEY_SSL_CERTFILE,
-                retry=retry,
+                nodes = [(VALKEY_HOST, VALKEY_PORT)]
+            kwargs = self._connection_kwargs()
+            kwargs["max_connections"] = 2
+            self._near_cache_nodes = [
+                Valkey(host=host, port=port, **kwargs) for host, port in nodes
+            ]
+            await self._near_cache.start(self._near_cache_nodes)
+        except Exception as e:
+            logger.warning(f"Near cache disabled, tracking setup failed: {e}")
+
+    def _count_near_cache_invalidations(self, count: int) -> None:
+        if self._metrics_enabled:
+            get_cache_count().labels(self._metrics_namespace, "near_invalidation").inc(count)
+
+    def _count_compression_bytes(self, direction: str, uncompressed: int, compressed: int) -> None:
+        if self._metrics_enabled:
+            record_compression(self._metrics_namespace, direction, uncompressed, compressed)
+
+    def _on_keys_written(self, *keys: str) -> None:
+        """
+        Drop locally written keys from the near cache right away instead of
+        waiting for the server push, and keep their reads on the primary for
+        the read-your-writes window.
+        """
+        if self._near_cache is not None:
+            self._near_cache.invalidate(keys)
+        if self._read_router.enabled:
+            self._read_router.record_write(keys)
+
+    def _on_write_done(self, *keys: str) -> None:
+        """
+        Drop written keys from the near cache again once the write returns (or
+        fails, it may still have landed): a read that started during its round
+        trip may have stored the old value, and the server push may already
+        have been consumed.
+        """
+        if self._near_cache is not None:
+            self._near_cache.invalidate(keys)
+
+    async def _invalidate_hot_keys(self, *keys: str) -> None:
+        """After a write: drop local copies of promoted keys and delete their replica keys"""
+        if self._hot_key_mitigation is None:
+            return
+        replica_keys = self._hot_key_mitigation.invalidate(keys)
+        if replica_keys:
+            await (await self.get_client()).delete(*replica_keys)
+
+    @property
+    def hot_key_mitigation(self) -> HotKeyMitigation | None:
+        return self._hot_key_mitigation
+
+    @property
+    def circuit_breakers(self) -> CircuitBreakerRegistry | None:
+        return self._breakers
+
+    @property
+    def concurrency_limiter(self) -> AdaptiveLimiter | None:
+        return self._limiter
+
+    async def _node_of(self, key: str | None) -> str:
+        """Name of the node owning key (cluster primary or shard), "primary" standalone."""
+        if key is None:
+            return "all"
+        client = await self.get_client()
+        if self._cluster_mode:
+            nodes = client.nodes_manager.slots_cache.get(client.keyslot(key))
+            return nodes[0].name if nodes else "unknown"
+        ring = getattr(client, "ring", None)
+        return ring.get(key) if ring is not None else "primary"
+
+    async def _guarded(
+        self, kind: str, key: str | None, command: str, args: tuple, action: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Run action through the circuit breaker of key's node and kind, then the
+        adaptive concurrency limit, when enabled.
+        """
+        limiter = self._limiter
+        if limiter is not None:
+            limited = action
+
+            def action():
+                return limiter.run(limited)
+
+        breakers = self._breakers
+        if breakers is None:
+            return await action()
+        return await breakers.call(await self._node_of(key), kind, command, args, action)
+
+    async def _run(
+        self,
+        endpoint: str,
+        timeout: float | None,
+        action: Callable[..., Awaitable[Any]],
+        *args,
+        wrap_http_exception: bool = True,
+    ) -> Any:
+        """
+        Await action(*args) under the call's deadline, mapping errors like
+        handle_valkey_exceptions. Command methods pass their arguments through
+        instead of capturing them in closures, and the exception mapping only
+        runs once something has failed. A None timeout means
+        VALKEY_COMMAND_TIMEOUT (0 leaves only the context deadline).
+        """
+        if timeout is None:
+            timeout = ValkeyConfig.VALKEY_COMMAND_TIMEOUT
+        try:
+            return await run_with_deadline(action, timeout, *args)
+        except Exception as exc:
+            raise_valkey_exception(
+                exc, endpoint=endpoint, logger=logger, wrap_http_exception=wrap_http_exception
             )
-        return self._client
+
+    async def _execute(self, command: str, *args, **kwargs) -> Any:
+        """
+        Run a single-key command through the circuit breaker of its node and
+        read/write class and the adaptive concurrency limit, when enabled.
+        """
+        if self._breakers is None and self._limiter is None:
+            return await self._dispatch(command, *args, **kwargs)
+        return await self._guarded(
+            "read" if command in READ_COMMANDS else "write",
+            args[0],
+            command,
+            args,
+            lambda: self._dispatch(command, *args, **kwargs),
+        )
+
+    async def _dispatch(self, command: str, *args, **kwargs) -> Any:
+        """
+        Send a single-key command. Read-only commands are hedged when enabled and
+        go through the read router when replica reads are enabled; everything
+        else goes through the auto-pipeline when enabled, otherwise directly on
+        a pool connection.
+        """
+        if command in READ_COMMANDS:
+            if self._hedger is not None:
+                return await self._execute_hedged(command, *args)
+            if self._read_router.enabled:
+                return await self._execute_read(command, *args)
+        if self._auto_pipeline is not None:
+            return await self._auto_pipeline.execute(command, *args, **kwargs)
+        return await getattr(self._client or await self.get_client(), command)(*args, **kwargs)
+
+    async def _read_nodes(self, command: str, key: str, args: tuple):
+        """
+        The read's candidate nodes: (primary, replicas, call), where nodes are
+        (name, handle) pairs and call(handle) runs the command on one of them.
+        None when the key's slot is not known yet.
+        """
+        client = await self.get_client()
+        if self._cluster_mode:
+            nodes = client.nodes_manager.slots_cache.get(client.keyslot(key))
+            if not nodes:
+                return None
+            primary = (nodes[0].name, nodes[0])
+            replicas = [(node.name, node) for node in nodes[1:]]
+
+            # Targeted explicitly so the chosen node serves the read
+            def _call(node):
+                return client.execute_command(command.upper(), *args, target_nodes=node)
+        else:
+            primary = ("primary", client)
+            replicas = self._replica_clients
+
+            def _call(node):
+                return getattr(node, command)(*args)
+
+        return primary, replicas, _call
+
+    async def _execute_read(self, command: str, *args, key: str | None = None) -> Any:
+        """
+        Run a read-only command on the node picked by the read policy.
+        The routing key defaults to the first argument.
+        """
+        key = args[0] if key is None else key
+        targets = await self._read_nodes(command, key, args)
+        if targets is None:
+            return await getattr(await self.get_client(), command)(*args)
+        primary, replicas, _call = targets
+        router = self._read_router
+        name, node = router.choose(key, primary, replicas)
+        if node is primary[1]:
+            return await router.timed(name, lambda: _call(node))
+        try:
+            return await router.timed(name, lambda: _call(node))
+        except (ValkeyConnectionError, TimeoutError) as e:
+            logger.warning(f"Valkey replica {name} read failed, retrying on primary: {e}")
+            router.mark_failed(name)
+            return await router.timed(primary[0], lambda: _call(primary[1]))
+
+    async def _execute_hedged(self, command: str, *args) -> Any:
+        """
+        Run a read, duplicating it once it is slower than the hedge delay: on
+        another node (replica <-> primary) when read routing has one, otherwise
+        on a second connection to the same node.
+        """
+        router = self._read_router
+        targets = await self._read_nodes(command, args[0], args) if router.enabled else None
+        if targets is None:
+            client = await self.get_client()
+
+            def _read():
+                return getattr(client, command)(*args)
+
+            return await self._hedger.run(_read, _read)
+        primary, replicas, _call = targets
+        chosen = router.choose(args[0], primary, replicas)
+        other = router.alternative(args[0], chosen, primary, replicas)
+        return await self._hedger.run(
+            lambda: router.timed(chosen[0], lambda: _call(chosen[1])),
+            lambda: router.timed(other[0], lambda: _call(other[1])),
+        )
+
+    async def _start_read_routing(self) -> None:
+        """Connect standalone replicas and start the background replica health/lag probe"""
+        if not self._read_router.enabled or self._replica_task is not None:
+            return
+        # VALKEY_REPLICA_NODES replicate the single standalone node, not shards
+        if not self._cluster_mode and not self._sharded and not self._replica_clients:
+            kwargs = self._connection_kwargs()
+            self._replica_clients = [
+                (f"{node['host']}:{node['port']}", Valkey(host=node["host"], port=node["port"], **kwargs))
+                for node in ValkeyConfig.VALKEY_REPLICA_NODES
+            ]
+            if self._metrics_enabled or self._pool_sizer is not None:
+                for _, replica in self._replica_clients:
+                    instrument_client(replica, self._pool_monitor)
+        self._replica_task = asyncio.create_task(self._probe_replicas())
+
+    async def _probe_replicas(self) -> None:
+        while True:
+            try:
+                if self._cluster_mode:
+                    client = await self.get_client()
+                    probes = [
+                        (
+                            node.name,
+                            lambda node=node: client.execute_command(
+                                "INFO", "replication", target_nodes=node
+                            ),
+                        )
+                        for node in client.get_replicas()
+                    ]
+                else:
+                    probes = [
+                        (name, lambda replica=replica: replica.info("replication"))
+                        for name, replica in self._replica_clients
+                    ]
+                await self._read_router.refresh(probes)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Valkey replica probe failed: {e}")
+            await asyncio.sleep(ValkeyConfig.VALKEY_REPLICA_CHECK_INTERVAL)
 
     async def shutdown(self):
         """Cleanly shutdown Valkey client"""
+        if self._pool_sizer_task is not None:
+            self._pool_sizer_task.cancel()
+            self._pool_sizer_task = None
+        if self._replica_task is not None:
+            self._replica_task.cancel()
+            self._replica_task = None
+        for _, replica in self._replica_clients:
+            await replica.aclose()
+        self._replica_clients = []
+        for node_client in self._node_clients.values():
+            await node_client.aclose()
+        self._node_clients = {}
+        if self._auto_pipeline is not None:
+            await self._auto_pipeline.close()
+        if self._near_cache is not None:
+            await self._near_cache.stop()
+        for node_client in self._near_cache_nodes:
+            await node_client.aclose()
+        self._near_cache_nodes = []
         if self._client:
             await self._client.close()
             self._client = None
         if self._metrics_task:
             self._metrics_task.cancel()
+            self._metrics_task = None
+        if self._metrics_flush_task:
+            self._metrics_flush_task.cancel()
+            self._metrics_flush_task = None
+        self._metrics_recorder.flush()
 
     async def __aenter__(self):
         if not await self.is_healthy():
@@ -204,6 +768,7 @@ class ValkeyClient:
         """
         Safely decode JSON if value looks like JSON, else return as-is.
         Handles bytes by decoding to str first.
+        Legacy fallback for values stored without a codec marker.
         """
         if not value:
             return None
@@ -219,23 +784,52 @@ class ValkeyClient:
         return value
 
     @track_valkey_metrics('get')
-    async def get(self, key: str, timeout: float = None, wrap_http_exception: bool = True) -> Any:
-        if timeout is None:
-            timeout = ValkeyConfig.VALKEY_COMMAND_TIMEOUT
+    async def get(self, key: str, timeout: float | None = None, wrap_http_exception: bool = True) -> Any:
+        mitigation = self._hot_key_mitigation
+        if mitigation is not None:
+            mitigation.record(key)
+        elif self._hot_keys is not None:
+            self._hot_keys.record("get", key)
+        near_cache = self._near_cache
+        if near_cache is not None:
+            # Near cache hit: no exception wrapper, no network, no decode
+            value = near_cache.lookup(key)
+            if value is not MISSING:
+                if self._metrics_enabled:
+                    get_cache_count().labels(self._metrics_namespace, "near_hit").inc()
+                return value
 
-        async def _action():
-            logger.debug(f"Valkey get operation for key: {key}")
-            # Remove 'timeout' from direct call to backend client
-            value = await (await self.get_client()).get(key)
-            
-            # Don't try to update cache hit ratio metric here
-            # We'll leave this to the background metrics collector
-                    
-            return self._maybe_json_decode(value)
-
-        return await handle_valkey_exceptions(
-            _action, logger=logger, endpoint="valkey.get", wrap_http_exception=wrap_http_exception
-        )
+        if near_cache is None:
+            return await self._run(
+                "valkey.get", timeout, self._get, key, mitigation, wrap_http_exception=wrap_http_exception
+            )
+
+        token = near_cache.begin(key)
+        value = MISSING
+        try:
+            value = await self._run(
+                "valkey.get", timeout, self._get, key, mitigation, wrap_http_exception=wrap_http_exception
+            )
+            return value
+        finally:
+            near_cache.finish(key, token, value)
+
+    async def _get(self, key: str, mitigation: HotKeyMitigation | None) -> Any:
+        logger.debug("Valkey get operation for key: %s", key)
+        if mitigation is not None and mitigation.is_promoted(key):
+            value = await mitigation.read(
+                key,
+                lambda k: self._execute("get", k),
+                lambda k, v, px: self._execute("set", k, v, px=px),
+                lambda k: self._execute("delete", k),
+            )
+        else:
+            value = await self._execute("get", key)
+
+        # Don't try to update cache hit ratio metric here
+        # We'll leave this to the background metrics collector
+
+        return self._serializer.decode(value)
 
     @track_valkey_metrics('set')
     async def set(
@@ -243,44 +837,202 @@ class ValkeyClient:
         key: str,
         value: Any,
         ex: int | None = None,
-        timeout: float = None,
+        timeout: float | None = None,
     ) -> bool:
-        if timeout is None:
-            timeout = ValkeyConfig.VALKEY_COMMAND_TIMEOUT
+        if self._hot_keys is not None:
+            self._hot_keys.record("set", key)
 
-        async def _action():
-            logger.debug(f"Valkey set operation for key: {key}, ttl: {ex or 0}")
-            # Remove 'timeout' from direct call to backend client
-            result = await (await self.get_client()).set(
-                key, json.dumps(value), ex=ex
-            )
-            return result
+        return await self._run("valkey.set", timeout, self._set, key, value, ex)
 
-        return await handle_valkey_exceptions(
-            _action, logger=logger, endpoint="valkey.set"
-        )
+    async def _set(self, key: str, value: Any, ex: int | None) -> bool:
+        logger.debug("Valkey set operation for key: %s, ttl: %s", key, ex or 0)
+        self._on_keys_written(key)
+        try:
+            result = await self._execute("set", key, self._serializer.encode(key, value), ex=ex)
+        finally:
+            self._on_write_done(key)
+        await self._invalidate_hot_keys(key)
+        return result
 
     @track_valkey_metrics('delete')
-    async def delete(self, *keys: str, timeout: float = DEFAULT_COMMAND_TIMEOUT) -> int:
-        async def _action():
-            logger.debug(f"Valkey delete operation for keys: {keys}")
-            # Remove 'timeout' from direct call to backend client (see debugging_tests.md)
-            return await (await self.get_client()).delete(*keys)
-
-        return await handle_valkey_exceptions(
-            _action, logger=logger, endpoint="valkey.delete"
-        )
+    async def delete(self, *keys: str, timeout: float | None = None) -> int:
+        return await self._run("valkey.delete", timeout, self._delete, keys)
+
+    async def _delete(self, keys: tuple) -> int:
+        logger.debug("Valkey delete operation for keys: %s", keys)
+        self._on_keys_written(*keys)
+        try:
+            result = await (await self.get_client()).delete(*keys)
+        finally:
+            self._on_write_done(*keys)
+        await self._invalidate_hot_keys(*keys)
+        return result
 
     @track_valkey_metrics('delete')
-    async def delete_many(self, keys: list[str], timeout: float = DEFAULT_COMMAND_TIMEOUT) -> int:
-        """Delete multiple keys at once"""
-        async def _action():
-            logger.debug(f"Valkey delete_many operation for keys: {keys}")
-            return await (await self.get_client()).delete(*keys)
-
-        return await handle_valkey_exceptions(
-            _action, logger=logger, endpoint="valkey.delete_many"
-        )
+    async def delete_many(self, keys: list[str], timeout: float | None = None) -> int:
+        """
+        Delete multiple keys at once.
+        Cluster-safe: one DEL per hash slot, sent as one pipeline per node.
+        """
+        keys = list(keys)
+        if not keys:
+            return 0
+        return await self._run("valkey.delete_many", timeout, self._delete_many, keys)
+
+    async def _delete_many(self, keys: list[str]) -> int:
+        logger.debug("Valkey delete_many operation for %s keys", len(keys))
+        self._on_keys_written(*keys)
+        client = await self.get_client()
+        try:
+            if not self._cluster_mode:
+                result = await client.delete(*keys)
+            else:
+                pipe = client.pipeline()
+                for slot_keys in self._group_by_slot(client, keys).values():
+                    pipe.execute_command("DEL", *slot_keys)
+                result = sum(await pipe.execute())
+        finally:
+            self._on_write_done(*keys)
+        await self._invalidate_hot_keys(*keys)
+        return result
+
+    @staticmethod
+    def _group_by_slot(client: ValkeyCluster, keys: list[str]) -> dict[int, list[str]]:
+        """Group keys by hash slot so each multi-key command stays on one slot"""
+        slots: dict[int, list[str]] = {}
+        for key in keys:
+            slots.setdefault(client.keyslot(key), []).append(key)
+        return slots
+
+    def _key_groups(self, client, keys: list[str]) -> list[list[str]]:
+        """Split keys into groups a single multi-key command can serve"""
+        if self._cluster_mode:
+            return list(self._group_by_slot(client, keys).values())
+        if self._sharded:
+            return list(client.group_by_shard(keys).values())
+        return [keys]
+
+    @track_valkey_metrics('get_many')
+    async def get_many(self, keys: list[str], timeout: float | None = None) -> list[Any]:
+        """
+        Get multiple keys, returning decoded values (None for missing keys) in input order.
+        Standalone: a single MGET. Cluster: one MGET per hash slot, pipelined per node,
+        with all nodes queried concurrently.
+        """
+        keys = list(keys)
+        if not keys:
+            return []
+        results: list[Any] = [None] * len(keys)
+        pending = list(range(len(keys)))
+
+        near_cache = self._near_cache
+        tokens: dict[str, int] = {}
+        if near_cache is not None:
+            pending = []
+            for index, key in enumerate(keys):
+                value = near_cache.lookup(key)
+                if value is MISSING:
+                    pending.append(index)
+                else:
+                    results[index] = value
+            if not pending:
+                return results
+            for index in pending:
+                tokens.setdefault(keys[index], near_cache.begin(keys[index]))
+
+        fetch = list(dict.fromkeys(keys[index] for index in pending))
+        decoded = None
+        try:
+            decoded = await self._run("valkey.get_many", timeout, self._get_many, fetch)
+        finally:
+            for key, token in tokens.items():
+                near_cache.finish(key, token, decoded[key] if decoded is not None else MISSING)
+        for index in pending:
+            results[index] = decoded[keys[index]]
+        return results
+
+    async def _get_many(self, keys: list[str]) -> dict[str, Any]:
+        """Fetch and decode distinct keys: {key: value}"""
+        logger.debug("Valkey get_many operation for %s keys", len(keys))
+        client = await self.get_client()
+        if not self._cluster_mode:
+            values = await client.mget(keys)
+        else:
+            pipe = client.pipeline()
+            groups = list(self._group_by_slot(client, keys).values())
+            for slot_keys in groups:
+                pipe.execute_command("MGET", *slot_keys)
+            by_key = {}
+            for slot_keys, slot_values in zip(groups, await pipe.execute()):
+                by_key.update(zip(slot_keys, slot_values))
+            values = [by_key[key] for key in keys]
+        decode = self._serializer.decode
+        return {key: decode(value) for key, value in zip(keys, values)}
+
+    @track_valkey_metrics('set_many')
+    async def set_many(
+        self,
+        mapping: dict[str, Any],
+        ex: int | dict[str, int] | None = None,
+        timeout: float | None = None,
+    ) -> bool:
+        """
+        Set multiple keys in one round trip per node.
+
+        Args:
+            mapping: key -> value (values are encoded like set())
+            ex: Shared TTL in seconds for every key, or a dict of per-key TTLs
+                (keys missing from the dict get no TTL)
+        Returns:
+            True if every write succeeded
+        """
+        if not mapping:
+            return True
+        return await self._run("valkey.set_many", timeout, self._set_many, mapping, ex)
+
+    async def _set_many(self, mapping: dict[str, Any], ex: int | dict[str, int] | None) -> bool:
+        logger.debug("Valkey set_many operation for %s keys", len(mapping))
+        self._on_keys_written(*mapping)
+        client = await self.get_client()
+        encode = self._serializer.encode
+        encoded = {key: encode(key, value) for key, value in mapping.items()}
+        pipe = client.pipeline(transaction=False)
+        if ex is None:
+            # No TTLs: MSET per slot / shard (a single MSET when standalone)
+            for slot_keys in self._key_groups(client, list(encoded)):
+                pipe.execute_command(
+                    "MSET", *[part for key in slot_keys for part in (key, encoded[key])]
+                )
+        else:
+            for key, value in encoded.items():
+                ttl = ex.get(key) if isinstance(ex, dict) else ex
+                if ttl:
+                    pipe.execute_command("SET", key, value, "EX", ttl)
+                else:
+                    pipe.execute_command("SET", key, value)
+        try:
+            result = all(await pipe.execute())
+        finally:
+            self._on_write_done(*mapping)
+        await self._invalidate_hot_keys(*mapping)
+        return result
+
+    def hot_keys(
+        self, namespace: str | None = None, command: str | None = None, limit: int = 10
+    ) -> list[dict]:
+        """
+        Hottest keys seen by get/set/incr (requires VALKEY_HOT_KEYS_ENABLED).
+
+        Args:
+            namespace: Only keys with this prefix (text before the first ":")
+            command: Only this command ("get", "set" or "incr")
+        Returns:
+            [{"key", "namespace", "command", "count", "error", "rate"}] hottest first;
+            count is the estimated number of operations, rate per second
+        """
+        if self._hot_keys is None:
+            return []
+        return self._hot_keys.hot_keys(namespace, command, limit)
 
     async def is_healthy(self) -> bool:
         try:
@@ -288,166 +1040,436 @@ class ValkeyClient:
         except (ValkeyError, TimeoutError):
             return False
 
-    async def incr(self, key: str, timeout: float = DEFAULT_COMMAND_TIMEOUT) -> int:
-        async def _action():
-            logger.debug(f"Valkey incr operation for key: {key}")
-            value = await (await self.get_client()).incr(key)
-            return value
+    async def incr(self, key: str, timeout: float | None = None) -> int:
+        if self._hot_keys is not None:
+            self._hot_keys.record("incr", key)
 
-        return await handle_valkey_exceptions(
-            _action, logger=logger, endpoint="valkey.incr"
-        )
+        return await self._run("valkey.incr", timeout, self._write_key, "incr", key)
 
     async def expire(
-        self, key: str, ex: int, timeout: float = DEFAULT_COMMAND_TIMEOUT
+        self, key: str, ex: int, timeout: float | None = None
     ) -> bool:
-        async def _action():
-            logger.debug(f"Valkey expire operation for key: {key}, ttl: {ex}")
-            result = await (await self.get_client()).expire(key, ex)
-            return result
+        return await self._run("valkey.expire", timeout, self._write_key, "expire", key, ex)
 
-        return await handle_valkey_exceptions(
-            _action, logger=logger, endpoint="valkey.expire"
-        )
+    async def ttl(self, key: str, timeout: float | None = None) -> int:
+        return await self._run("valkey.ttl", timeout, self._read_key, "ttl", key)
 
-    async def ttl(self, key: str, timeout: float = DEFAULT_COMMAND_TIMEOUT) -> int:
-        async def _action():
-            logger.debug(f"Valkey ttl operation for key: {key}")
-            value = await (await self.get_client()).ttl(key)
-            return value
+    async def _read_key(self, command: str, key: str) -> Any:
+        logger.debug("Valkey %s operation for key: %s", command, key)
+        return await self._execute(command, key)
 
-        return await handle_valkey_exceptions(
-            _action, logger=logger, endpoint="valkey.ttl"
-        )
+    async def _write_key(self, command: str, key: str, *args) -> Any:
+        """Single-key write with near cache, read-your-writes and hot key bookkeeping."""
+        logger.debug("Valkey %s operation for key: %s, args: %s", command, key, args)
+        self._on_keys_written(key)
+        try:
+            result = await self._execute(command, key, *args)
+        finally:
+            self._on_write_done(key)
+        await self._invalidate_hot_keys(key)
+        return result
 
-    async def flushdb(self):
+    async def flushdb(self, timeout: float | None = None):
         """
         Flush the current Valkey database (for test isolation).
         """
-        async def _action():
-            logger.debug("Valkey flushdb operation")
-            client = await self.get_client()
-            result = await client.flushdb()
-            return result
+        return await self._run("valkey.flushdb", timeout, self._flushdb)
+
+    async def _flushdb(self):
+        logger.debug("Valkey flushdb operation")
+        if self._near_cache is not None:
+            self._near_cache.clear()
+        client = await self.get_client()
+        return await client.flushdb()
 
-        return await handle_valkey_exceptions(
-            _action, logger=logger, endpoint="valkey.flushdb"
+    async def exists(self, key: str, timeout: float | None = None) -> bool:
+        return await self._run("valkey.exists", timeout, self._read_key, "exists", key) == 1
+
+    async def pipeline(self):
+        return await self._run("valkey.pipeline", None, self._new_pipeline)
+
+    async def _new_pipeline(self):
+        logger.debug("Valkey pipeline operation")
+        return (await self.get_client()).pipeline()
+
+    def batch_pipeline(
+        self,
+        max_commands: int | None = None,
+        max_bytes: int | None = None,
+        max_inflight: int | None = None,
+        raise_on_error: bool = True,
+    ) -> BatchPipeline:
+        """
+        Chunked, node-aware pipeline for large batches: commands are grouped per
+        node, sent in bounded chunks concurrently and results streamed in order.
+        Values are sent as given (no codec), like pipeline().
+
+        Usage:
+            async for result in client.batch_pipeline().stream(("set", (k, v)) for k, v in items):
+                ...
+        """
+        return BatchPipeline(
+            self.get_client,
+            max_commands=max_commands or ValkeyConfig.VALKEY_BATCH_MAX_COMMANDS,
+            max_bytes=max_bytes or ValkeyConfig.VALKEY_BATCH_MAX_BYTES,
+            max_inflight=max_inflight or ValkeyConfig.VALKEY_BATCH_MAX_INFLIGHT,
+            raise_on_error=raise_on_error,
         )
 
-    async def exists(self, key: str, timeout: float = DEFAULT_COMMAND_TIMEOUT) -> bool:
-        async def _action():
-            logger.debug(f"Valkey exists operation for key: {key}")
-            exists = await (await self.get_client()).exists(key)
-            return exists == 1
+    async def pubsub(self):
+        return await self._run("valkey.pubsub", None, self._new_pubsub)
+
+    async def _new_pubsub(self):
+        logger.debug("Valkey pubsub operation")
+        return (await self.get_client()).pubsub()
+
+    @property
+    def _script_scope(self) -> str:
+        """Identity of the deployment this client talks to, for script preload bookkeeping"""
+        if self._cluster_mode:
+            return f"cluster:{VALKEY_HOST}:{VALKEY_PORT}"
+        if self._sharded:
+            return "sharded:" + ",".join(shard_name(n) for n in ValkeyConfig.VALKEY_SHARD_NODES)
+        return f"{VALKEY_HOST}:{VALKEY_PORT}/{VALKEY_DB}"
+
+    async def load_scripts(self, scripts: list[Script] | None = None) -> None:
+        """SCRIPT LOAD scripts (default: the whole registry) on every primary / shard"""
+        scripts = list(SCRIPTS.values()) if scripts is None else scripts
+        if not scripts:
+            return
+        # Startup/recovery work across every node: only the context deadline applies
+        await self._run("valkey.load_scripts", 0, self._load_scripts, scripts, wrap_http_exception=False)
+
+    async def _load_scripts(self, scripts: list[Script]) -> None:
+        client = await self.get_client()
+        await asyncio.gather(*(client.script_load(script.source) for script in scripts))
+        for script in scripts:
+            script.loaded.add(self._script_scope)
+
+    async def _preload_scripts(self) -> None:
+        scope = self._script_scope
+        pending = [script for script in SCRIPTS.values() if scope not in script.loaded]
+        try:
+            await self.load_scripts(pending)
+        except Exception as e:
+            # Not fatal: run_script reloads on NOSCRIPT
+            logger.warning(f"Valkey script preload failed: {e}")
 
-        return await handle_valkey_exceptions(
-            _action, logger=logger, endpoint="valkey.exists"
+    async def run_script(
+        self,
+        script: Script | str,
+        keys: list | tuple = (),
+        args: list | tuple = (),
+        all_nodes: bool = False,
+        timeout: float | None = None,
+    ) -> Any:
+        """
+        Run a registered script with EVALSHA, reloading it on NOSCRIPT.
+
+        Args:
+            script: A Script from register_script, or its registered name
+            keys/args: KEYS and ARGV
+            all_nodes: Run a keyless script on every primary (cluster) and
+                return {node: result}; keyless scripts always run on every
+                shard in sharded mode
+        """
+        if isinstance(script, str):
+            script = get_script(script)
+        return await self._run(
+            f"valkey.script.{script.name}", timeout, self._run_script, script, keys, args, all_nodes
         )
 
-    async def pipeline(self):
-        async def _action():
-            logger.debug("Valkey pipeline operation")
-            client = await self.get_client()
-            return client.pipeline()
+    async def _run_script(self, script: Script, keys: list | tuple, args: list | tuple, all_nodes: bool) -> Any:
+        if self._breakers is None and self._limiter is None:
+            return await self._eval_script(script, keys, args, all_nodes)
+        return await self._guarded(
+            "write",
+            keys[0] if keys else None,
+            "evalsha",
+            (script.name, *keys, *args),
+            lambda: self._eval_script(script, keys, args, all_nodes),
+        )
+
+    async def _eval_script(self, script: Script, keys: list | tuple, args: list | tuple, all_nodes: bool) -> Any:
+        """EVALSHA, reloading the registry on NOSCRIPT and falling back to EVAL."""
+        client = await self.get_client()
+        try:
+            return await self._evalsha(client, script, keys, args, all_nodes)
+        except NoScriptError:
+            logger.info(f"Valkey script {script.name} missing on server, reloading")
+        try:
+            await self.load_scripts()
+            return await self._evalsha(client, script, keys, args, all_nodes)
+        except NoScriptError:
+            return await client.eval(script.source, len(keys), *keys, *args)
+
+    async def _evalsha(self, client, script: Script, keys: list | tuple, args: list | tuple, all_nodes: bool) -> Any:
+        if all_nodes and self._cluster_mode:
+            return await client.execute_command(
+                "EVALSHA", script.sha, len(keys), *keys, *args,
+                target_nodes=ValkeyCluster.PRIMARIES,
+            )
+        return await client.evalsha(script.sha, len(keys), *keys, *args)
 
-        return await handle_valkey_exceptions(
-            _action, logger=logger, endpoint="valkey.pipeline"
+    async def ensure_functions(self) -> dict[str, int]:
+        """
+        Load the vapi Functions library on every primary / shard that has no
+        copy or an older version (FUNCTION LOAD REPLACE). Newer server copies
+        are left alone. Returns {node: version found on the server}.
+        """
+        # Startup/recovery work across every node: only the context deadline applies
+        return await self._run("valkey.ensure_functions", 0, self._ensure_functions, wrap_http_exception=False)
+
+    async def _ensure_functions(self) -> dict[str, int]:
+        client = await self.get_client()
+        if self._cluster_mode:
+            await client.initialize()
+            nodes = [
+                (node.name, lambda *args, node=node: client.execute_command(*args, target_nodes=node))
+                for node in client.get_primaries()
+            ]
+        elif self._sharded:
+            nodes = [(name, shard.execute_command) for name, shard in client.shards.items()]
+        else:
+            nodes = [("primary", client.execute_command)]
+        versions = await asyncio.gather(
+            *(self._ensure_library(name, execute) for name, execute in nodes)
         )
+        LOADED_SCOPES.add(self._script_scope)
+        return dict(zip((name for name, _ in nodes), versions))
 
-    async def pubsub(self):
-        async def _action():
-            logger.debug("Valkey pubsub operation")
-            client = await self.get_client()
-            return client.pubsub()
+    @staticmethod
+    async def _ensure_library(node: str, execute: Callable[..., Awaitable[Any]]) -> int:
+        try:
+            current = int(await execute("FCALL_RO", "vapi_version", 0))
+        except ResponseError:
+            # Library not loaded yet
+            current = 0
+        if current < LIBRARY_VERSION:
+            await execute("FUNCTION", "LOAD", "REPLACE", LIBRARY_SOURCE)
+            logger.info(f"Valkey function library {LIBRARY_NAME} v{current} -> v{LIBRARY_VERSION} on {node}")
+        elif current > LIBRARY_VERSION:
+            logger.info(f"Valkey function library {LIBRARY_NAME} v{current} on {node} is newer, keeping it")
+        return current
+
+    async def _preload_functions(self) -> None:
+        if not ValkeyConfig.VALKEY_FUNCTIONS_ENABLED or self._script_scope in LOADED_SCOPES:
+            return
+        try:
+            await self.ensure_functions()
+        except Exception as e:
+            # Not fatal: fcall loads the library when a function is missing
+            logger.warning(f"Valkey function library preload failed: {e}")
 
-        return await handle_valkey_exceptions(
-            _action, logger=logger, endpoint="valkey.pubsub"
+    async def fcall(
+        self,
+        function: str,
+        keys: list | tuple = (),
+        args: list | tuple = (),
+        read_only: bool = False,
+        timeout: float | None = None,
+    ) -> Any:
+        """
+        Call a function of the vapi library, loading the library if the node
+        does not know the function yet.
+
+        Args:
+            function: Function name, e.g. "vapi_token_bucket"
+            keys/args: KEYS and ARGV
+            read_only: Use FCALL_RO (functions flagged no-writes only); with
+                read routing enabled the call may be served by a replica
+        """
+        return await self._run(
+            f"valkey.function.{function}", timeout, self._fcall, function, keys, args, read_only
         )
 
-    async def publish(self, channel: str, message: str):
+    async def _fcall(self, function: str, keys: list | tuple, args: list | tuple, read_only: bool) -> Any:
+        if self._breakers is None and self._limiter is None:
+            return await self._call_function(function, keys, args, read_only)
+        return await self._guarded(
+            "read" if read_only else "write",
+            keys[0] if keys else None,
+            "fcall_ro" if read_only else "fcall",
+            (function, *keys, *args),
+            lambda: self._call_function(function, keys, args, read_only),
+        )
+
+    async def _call_function(self, function: str, keys: list | tuple, args: list | tuple, read_only: bool) -> Any:
+        """FCALL / FCALL_RO, loading the library when the node does not know the function."""
+        try:
+            return await self._fcall_once(function, keys, args, read_only)
+        except ResponseError as e:
+            if "function not found" not in str(e).lower():
+                raise
+            logger.info(f"Valkey function {function} missing on server, loading library")
+        await self.ensure_functions()
+        return await self._fcall_once(function, keys, args, read_only)
+
+    async def _fcall_once(self, function: str, keys: list | tuple, args: list | tuple, read_only: bool) -> Any:
+        if read_only and self._read_router.enabled and keys:
+            return await self._execute_read("fcall_ro", function, len(keys), *keys, *args, key=keys[0])
+        client = await self.get_client()
+        if read_only:
+            return await client.fcall_ro(function, len(keys), *keys, *args)
+        return await client.fcall(function, len(keys), *keys, *args)
+
+    async def publish(self, channel: str, message: str, timeout: float | None = None):
         """
         Publish a message to a channel.
         """
-        async def _action():
-            logger.debug(f"Valkey publish operation for channel: {channel}")
-            client = await self.get_client()
-            return await client.publish(channel, message)
-        
-        return await handle_valkey_exceptions(
-            _action, logger=logger, endpoint="valkey.publish"
-        )
+        return await self._run("valkey.publish", timeout, self._publish, channel, message)
+
+    async def _publish(self, channel: str, message: str) -> int:
+        logger.debug("Valkey publish operation for channel: %s", channel)
+        return await (self._client or await self.get_client()).publish(channel, message)
         
-    async def scan(self, match: str = "*") -> list[str]:
+    async def scan(self, match: str = "*", count: int = 1000) -> list[str]:
         """
         Asynchronously scan for all keys matching the pattern.
         Uses the underlying Redis/Valkey SCAN command.
+        Collects every key in memory: prefer scan_iter/scan_apply for large keyspaces.
         """
-        async def _action():
-            logger.debug(f"Valkey scan operation for pattern: {match}")
+        keys = []
+        async for batch in self.scan_iter(match, count=count):
+            keys.extend(batch)
+        return keys
+
+    async def scan_iter(
+        self, match: str = "*", count: int = 1000, type: str | None = None
+    ) -> AsyncIterator[list[str]]:
+        """
+        Stream keys matching the pattern in batches, as SCAN returns them.
+
+        Args:
+            match: Glob-style pattern
+            count: COUNT hint per SCAN step (keys examined per round trip)
+            type: Only return keys of this type (e.g. "string", "list")
+
+        Cluster mode scans every primary (sharded mode every shard)
+        concurrently; batches are yielded in arrival order. Keys are returned as the server sends them (bytes).
+
+        Usage:
+            async for batch in client.scan_iter("lru:*"):
+                ...
+        """
+        client = await self.get_client()
+        logger.debug("Valkey scan_iter operation for pattern: %s", match)
+
+        if not self._cluster_mode and not self._sharded:
             cursor = 0
-            keys = []
             while True:
-                cursor, batch = await (await self.get_client()).scan(cursor=cursor, match=match)
-                keys.extend(batch)
+                cursor, batch = await self._run("valkey.scan_iter", None, client.scan, cursor, match, count, type)
+                if batch:
+                    yield batch
                 if cursor == 0:
-                    break
-            return keys
-            
-        return await handle_valkey_exceptions(
-            _action, logger=logger, endpoint="valkey.scan"
-        )
+                    return
 
-    async def lrem(self, key: str, count: int, value: str) -> int:
+        if self._cluster_mode:
+            async def _step(node, cursor):
+                cursors, batch = await client.scan(
+                    cursor=cursor, match=match, count=count, _type=type, target_nodes=node
+                )
+                return cursors[node.name], batch
+
+            nodes = client.get_primaries()
+        else:
+            async def _step(shard, cursor):
+                return await shard.scan(cursor=cursor, match=match, count=count, _type=type)
+
+            nodes = list(client.shards.values())
+        queue: asyncio.Queue = asyncio.Queue(maxsize=2 * len(nodes))
+        done = object()
+
+        async def _scan_node(node):
+            try:
+                cursor = 0
+                while True:
+                    cursor, batch = await self._run("valkey.scan_iter", None, _step, node, cursor)
+                    if batch:
+                        await queue.put(batch)
+                    if cursor == 0:
+                        break
+            except Exception as e:
+                await queue.put(e)
+            finally:
+                await queue.put(done)
+
+        tasks = [asyncio.create_task(_scan_node(node)) for node in nodes]
+        try:
+            remaining = len(tasks)
+            while remaining:
+                item = await queue.get()
+                if item is done:
+                    remaining -= 1
+                    continue
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def scan_apply(
+        self,
+        callback: Callable[[list[str]], Awaitable[Any]],
+        match: str = "*",
+        count: int = 1000,
+        type: str | None = None,
+        max_pending: int = 4,
+    ) -> int:
+        """
+        Run callback on every scanned batch while the scan keeps going, so work
+        such as deletes streams behind the cursor instead of waiting for the
+        full key list. At most max_pending callbacks run at once.
+
+        Usage:
+            await client.scan_apply(client.delete_many, "lru:*")
+        Returns:
+            Number of keys passed to callback
+        """
+        pending: set[asyncio.Task] = set()
+        total = 0
+        try:
+            async for batch in self.scan_iter(match, count=count, type=type):
+                total += len(batch)
+                pending.add(asyncio.create_task(callback(batch)))
+                if len(pending) >= max_pending:
+                    finished, pending = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for task in finished:
+                        task.result()
+            if pending:
+                await asyncio.gather(*pending)
+                pending = set()
+        finally:
+            for task in pending:
+                task.cancel()
+        return total
+
+    async def lrem(self, key: str, count: int, value: str, timeout: float | None = None) -> int:
         """
         Remove elements from a list (like Redis LREM).
         """
-        async def _action():
-            logger.debug(f"Valkey lrem operation for key: {key}, count: {count}")
-            result = await (await self.get_client()).lrem(key, count, value)
-            return result
-            
-        return await handle_valkey_exceptions(
-            _action, logger=logger, endpoint="valkey.lrem"
-        )
+        return await self._run("valkey.lrem", timeout, self._write_key, "lrem", key, count, value)
 
-    async def rpush(self, key: str, value: str) -> int:
+    async def rpush(self, key: str, value: str, timeout: float | None = None) -> int:
         """
         Append a value to a list (like Redis RPUSH).
         """
-        async def _action():
-            logger.debug(f"Valkey rpush operation for key: {key}")
-            result = await (await self.get_client()).rpush(key, value)
-            return result
-            
-        return await handle_valkey_exceptions(
-            _action, logger=logger, endpoint="valkey.rpush"
-        )
+        return await self._run("valkey.rpush", timeout, self._write_key, "rpush", key, value)
 
-    async def llen(self, key: str) -> int:
+    async def llen(self, key: str, timeout: float | None = None) -> int:
         """
         Get the length of a list (like Redis LLEN).
         """
-        async def _action():
-            logger.debug(f"Valkey llen operation for key: {key}")
-            result = await (await self.get_client()).llen(key)
-            return result
-            
-        return await handle_valkey_exceptions(
-            _action, logger=logger, endpoint="valkey.llen"
-        )
+        return await self._run("valkey.llen", timeout, self._read_key, "llen", key)
 
-    async def rpop(self, key: str) -> str | None:
+    async def rpop(self, key: str, timeout: float | None = None) -> str | None:
         """
         Remove and get the last element in a list (like Redis RPOP).
         """
-        async def _action():
-            logger.debug(f"Valkey rpop operation for key: {key}")
-            result = await (await self.get_client()).rpop(key)
-            return result
-            
-        return await handle_valkey_exceptions(
-            _action, logger=logger, endpoint="valkey.rpop"
-        )
+        return await self._run("valkey.rpop", timeout, self._write_key, "rpop", key)
         
     @property
     def conn(self):
@@ -458,6 +1480,84 @@ class ValkeyClient:
         """Return the underlying Valkey/ValkeyCluster connection, initializing if needed (async)."""
         return await self.get_client()
 
+    async def _transaction_pipeline(self, keys: tuple) -> Callable[[], Any]:
+        """Factory of transactional pipelines on the node that owns every key"""
+        client = await self.get_client()
+        if self._cluster_mode:
+            if len({client.keyslot(key) for key in keys}) > 1:
+                raise ValueError("Valkey transaction keys must share a hash slot (use a {hash tag})")
+            await client.initialize()
+            node = client.get_node_from_key(keys[0]) if keys else client.get_default_node()
+            node_client = self._node_clients.get(node.name)
+            if node_client is None:
+                node_client = self._node_clients[node.name] = Valkey(
+                    host=node.host, port=node.port, **self._connection_kwargs()
+                )
+            return lambda: node_client.pipeline(transaction=True)
+        if self._sharded:
+            shards = {client.ring.get(key) for key in keys}
+            if len(shards) > 1:
+                raise ValueError("Valkey transaction keys must live on one shard (use a {hash tag})")
+            shard = client.shards[shards.pop()] if shards else client.shard_for("")
+            return lambda: shard.pipeline(transaction=True)
+        return lambda: client.pipeline(transaction=True)
+
+    async def transaction(
+        self,
+        fn: Callable[[Any], Any],
+        *watch_keys: str,
+        max_attempts: int | None = None,
+        value_from_callable: bool = False,
+        timeout: float | None = None,
+    ) -> Any:
+        """
+        Optimistic read-modify-write: WATCH watch_keys, run fn(pipe), EXEC, and
+        retry with jittered backoff while a watched key changes underneath.
+        Raises WatchError (409) once max_attempts is exhausted. timeout bounds
+        every attempt together.
+
+        Reads inside fn (before pipe.multi()) run immediately and return raw
+        values; writes queued after pipe.multi() run atomically. In cluster and
+        sharded mode all keys must map to one node (hash tags).
+
+        Usage:
+            async def _bump(pipe):
+                current = int(await pipe.get(key) or 0)
+                pipe.multi()
+                pipe.set(key, current + 1, ex=60)
+                return current + 1
+
+            count = await client.transaction(_bump, key, value_from_callable=True)
+        """
+        return await self._run(
+            "valkey.transaction", timeout, self._transaction, fn, watch_keys, max_attempts, value_from_callable
+        )
+
+    async def _transaction(
+        self, fn: Callable[[Any], Any], watch_keys: tuple, max_attempts: int | None, value_from_callable: bool
+    ) -> Any:
+        pipeline = await self._transaction_pipeline(watch_keys)
+        try:
+            result = await run_transaction(
+                pipeline,
+                fn,
+                watch_keys,
+                max_attempts=max_attempts or ValkeyConfig.VALKEY_TRANSACTION_MAX_ATTEMPTS,
+                backoff_base=ValkeyConfig.VALKEY_TRANSACTION_BACKOFF_BASE,
+                backoff_cap=ValkeyConfig.VALKEY_TRANSACTION_BACKOFF_CAP,
+                value_from_callable=value_from_callable,
+                tracker=self._contention,
+            )
+        finally:
+            self._on_write_done(*watch_keys)
+        self._on_keys_written(*watch_keys)
+        await self._invalidate_hot_keys(*watch_keys)
+        return result
+
+    def transaction_conflicts(self, limit: int = 10) -> list[dict]:
+        """Most contended watched keys with their conflict rate (conflicts / attempts)"""
+        return self._contention.conflicts(limit)
+
     def lock(self, name: str, timeout: float | None = None, sleep: float = 0.1, blocking: bool = True, blocking_timeout: float | None = None, thread_local: bool = True):
         """
         Acquire a distributed lock using Valkey's built-in locking.
@@ -487,6 +1587,9 @@ shutdown = client.shutdown
 get = client.get
 set = client.set
 delete = client.delete
+delete_many = client.delete_many
+get_many = client.get_many
+set_many = client.set_many
 is_healthy = client.is_healthy
 incr = client.incr
 expire = client.expire
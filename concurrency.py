@@ -0,0 +1,195 @@
+"""
+Adaptive concurrency limit for ValkeyClient commands.
+
+A fixed pool size is either too small for a burst or lets a struggling node
+be buried under requests it can only queue. AdaptiveLimiter instead caps the
+commands in flight at a limit it keeps near the knee of the latency curve
+(AIMD against a latency baseline, in the style of TCP Vegas):
+
+- every `window` commands, the window's mean latency is compared with the
+  baseline (the lowest window mean seen, drifting towards newer ones over
+  about a minute so a node that got permanently slower is re-baselined)
+- mean above `tolerance` x baseline, or any timeout in the window: the limit
+  shrinks by `backoff` (multiplicative decrease)
+- otherwise, if the window actually used at least half the limit, it grows
+  by ~sqrt(limit) (additive increase; an idle client does not inflate it)
+
+Callers over the limit wait in a FIFO queue for at most `queue_timeout`
+seconds (less when their deadline is closer); once `max_queue` callers wait,
+or the wait times out, the command is shed with MaxConnectionsError (HTTP 429).
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from valkey.exceptions import MaxConnectionsError, TimeoutError
+
+from .deadlines import remaining
+from .metrics import get_concurrency_limit, get_concurrency_shed
+
+# Seconds over which the baseline follows a lasting latency increase
+BASELINE_DRIFT = 60.0
+
+
+class AdaptiveLimiter:
+    """
+    AIMD in-flight limit with a bounded wait queue.
+
+    Args:
+        initial: Starting limit
+        min_limit/max_limit: Bounds of the limit
+        window: Commands per limit update
+        tolerance: Latency / baseline ratio treated as overload
+        backoff: Factor applied to the limit on overload
+        max_queue: Callers allowed to wait for a slot (0: shed immediately)
+        queue_timeout: Max seconds a caller waits for a slot
+        export: Export the limit and shed commands to Prometheus
+    """
+
+    def __init__(
+        self,
+        initial: int = 20,
+        min_limit: int = 4,
+        max_limit: int = 100,
+        window: int = 100,
+        tolerance: float = 2.0,
+        backoff: float = 0.9,
+        max_queue: int = 1000,
+        queue_timeout: float = 0.1,
+        export: bool = True,
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.window = window
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.export = export
+        self._limit = float(min(max_limit, max(min_limit, initial)))
+        self.inflight = 0
+        self.baseline: float | None = None
+        self._waiters: deque[asyncio.Future] = deque()
+        self._samples = 0
+        self._latency_sum = 0.0
+        self._peak = 0
+        self._dropped = False
+        self._window_started = time.monotonic()
+        self.shed = 0
+        if export:
+            get_concurrency_limit().set(self.limit)
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def _shed(self, reason: str) -> None:
+        self.shed += 1
+        if self.export:
+            get_concurrency_shed().labels(reason).inc()
+        raise MaxConnectionsError(
+            f"Valkey concurrency limit reached ({self.inflight}/{self.limit} in flight, "
+            f"{len(self._waiters)} queued)"
+        )
+
+    async def acquire(self) -> None:
+        if self.inflight < self.limit and not self._waiters:
+            self.inflight += 1
+            return
+        if len(self._waiters) >= self.max_queue:
+            self._shed("queue_full")
+        wait = self.queue_timeout
+        left = remaining()
+        if left is not None:
+            wait = min(wait, left)
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, max(wait, 0))
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                # Handed a slot just as the wait ran out
+                return
+            self._shed("timeout")
+        except BaseException:
+            # Cancelled after release() handed us the slot: pass it on
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            if not waiter.done():
+                waiter.cancel()
+            try:
+                self._waiters.remove(waiter)
+            except ValueError:
+                pass
+
+    def release(self) -> None:
+        """Free a slot, handing it straight to the next waiter while under the limit."""
+        self.inflight -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters and self.inflight < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.inflight += 1
+                waiter.set_result(None)
+
+    def observe(self, latency: float, dropped: bool = False) -> None:
+        """Record one finished command; updates the limit once per window."""
+        self._samples += 1
+        self._latency_sum += latency
+        self._dropped = self._dropped or dropped
+        self._peak = max(self._peak, self.inflight)
+        if self._samples < self.window:
+            return
+        now = time.monotonic()
+        mean = self._latency_sum / self._samples
+        if self.baseline is None or mean < self.baseline:
+            self.baseline = mean
+        else:
+            drift = min(1.0, (now - self._window_started) / BASELINE_DRIFT)
+            self.baseline += (mean - self.baseline) * drift
+        limit = self._limit
+        if self._dropped or mean > self.baseline * self.tolerance:
+            limit *= self.backoff
+        elif self._peak * 2 >= limit:
+            limit += math.sqrt(limit)
+        self._limit = min(self.max_limit, max(self.min_limit, limit))
+        self._samples = 0
+        self._latency_sum = 0.0
+        self._peak = 0
+        self._dropped = False
+        self._window_started = now
+        if self.export:
+            get_concurrency_limit().set(self.limit)
+        # A grown limit may admit queued callers
+        self._wake()
+
+    async def run(self, action: Callable[[], Awaitable[Any]]) -> Any:
+        """Await action() within the limit, feeding its latency back into it."""
+        await self.acquire()
+        start = time.perf_counter()
+        try:
+            result = await action()
+        except TimeoutError:
+            self.observe(time.perf_counter() - start, dropped=True)
+            raise
+        except Exception:
+            self.observe(time.perf_counter() - start)
+            raise
+        else:
+            self.observe(time.perf_counter() - start)
+        finally:
+            # Cancelled commands (caller gone, deadline) free the slot without a sample
+            self.release()
+        return result
@@ -33,6 +33,14 @@ class ValkeyConfig:
         ],
     )
     VALKEY_CLUSTER_MODE = getattr(settings, "VAPI_CLUSTER_MODE", False)
+    # Opt-in client-side sharding across VALKEY_SHARD_NODES (consistent-hash ring, see sharding.py).
+    # Nodes may set "weight" and a stable "name" (ring identity, defaults to host:port).
+    VALKEY_SHARDING_ENABLED = getattr(settings, "VAPI_SHARDING_ENABLED", False)
+    # Ring points per node per unit of weight
+    VALKEY_SHARD_VNODES = getattr(settings, "VAPI_SHARD_VNODES", 160)
+    # Old node list while a rebalance runs (see rebalance.py): reads fall back to the
+    # previous owner and deletes hit both owners. Clear once the migration finished.
+    VALKEY_SHARD_PREVIOUS_NODES = getattr(settings, "VAPI_SHARD_PREVIOUS_NODES", [])
 
     # --- Connection (shared, REDIS_*) ---
     # Use 127.0.0.1 as the default host for local development to ensure compatibility with Docker and Redis config
@@ -44,6 +52,17 @@ class ValkeyConfig:
     VALKEY_SOCKET_TIMEOUT = getattr(settings, "REDIS_SOCKET_TIMEOUT", 5)
     VALKEY_SOCKET_CONNECT_TIMEOUT = getattr(settings, "REDIS_SOCKET_CONNECT_TIMEOUT", 5)
 
+    # --- Pool sizing (Valkey-only, VAPI_*) ---
+    # Opt-in: keep between VALKEY_POOL_SIZE and VALKEY_MAX_CONNECTIONS connections open per
+    # node, growing ahead of sustained demand and closing surplus connections idle this long
+    VALKEY_POOL_AUTOSIZE = getattr(settings, "VAPI_POOL_AUTOSIZE", False)
+    VALKEY_POOL_IDLE_TIMEOUT = getattr(settings, "VAPI_POOL_IDLE_TIMEOUT", 60)
+    VALKEY_POOL_SIZING_INTERVAL = getattr(settings, "VAPI_POOL_SIZING_INTERVAL", 1)
+
+    # --- Warm-up (Valkey-only, VAPI_*) ---
+    # Connections ValkeyClient.warm_up() opens per node before the pod reports ready
+    VALKEY_WARM_UP_CONNECTIONS = getattr(settings, "VAPI_WARM_UP_CONNECTIONS", 4)
+
     # --- Cluster Mode (Valkey-only, VAPI_*) ---
     VALKEY_CLUSTER = getattr(settings, "VAPI_CLUSTER", False)
 
@@ -60,6 +79,31 @@ class ValkeyConfig:
     VALKEY_RETRY_BACKOFF_BASE = getattr(settings, "VAPI_RETRY_BACKOFF_BASE", 0.01)
     VALKEY_RETRY_BACKOFF_CAP = getattr(settings, "VAPI_RETRY_BACKOFF_CAP", 0.5)
 
+    # --- Circuit breaker (Valkey-only, VAPI_*) ---
+    # Opt-in: fail fast per node and read/write class during a brownout
+    # (see limiting/circuit_breaker.py)
+    VALKEY_CIRCUIT_BREAKER_ENABLED = getattr(settings, "VAPI_CIRCUIT_BREAKER_ENABLED", False)
+    # Open once this many failures make up at least FAILURE_RATE of the window's calls
+    VALKEY_CIRCUIT_FAILURE_THRESHOLD = getattr(settings, "VAPI_CIRCUIT_FAILURE_THRESHOLD", 5)
+    VALKEY_CIRCUIT_FAILURE_RATE = getattr(settings, "VAPI_CIRCUIT_FAILURE_RATE", 0.5)
+    VALKEY_CIRCUIT_WINDOW = getattr(settings, "VAPI_CIRCUIT_WINDOW", 10)
+    # Seconds open before trial calls, and concurrent trial calls while half-open
+    VALKEY_CIRCUIT_RESET_TIMEOUT = getattr(settings, "VAPI_CIRCUIT_RESET_TIMEOUT", 5)
+    VALKEY_CIRCUIT_HALF_OPEN_MAX_CALLS = getattr(settings, "VAPI_CIRCUIT_HALF_OPEN_MAX_CALLS", 1)
+
+    # --- Adaptive concurrency (Valkey-only, VAPI_*) ---
+    # Opt-in: AIMD limit on commands in flight, kept near the knee of the
+    # latency curve between MIN and MAX (see concurrency.py)
+    VALKEY_ADAPTIVE_CONCURRENCY = getattr(settings, "VAPI_ADAPTIVE_CONCURRENCY", False)
+    VALKEY_CONCURRENCY_INITIAL = getattr(settings, "VAPI_CONCURRENCY_INITIAL", 20)
+    VALKEY_CONCURRENCY_MIN = getattr(settings, "VAPI_CONCURRENCY_MIN", 4)
+    VALKEY_CONCURRENCY_MAX = getattr(settings, "VAPI_CONCURRENCY_MAX", VALKEY_MAX_CONNECTIONS)
+    # Latency / baseline ratio treated as overload
+    VALKEY_CONCURRENCY_TOLERANCE = getattr(settings, "VAPI_CONCURRENCY_TOLERANCE", 2.0)
+    # Callers over the limit wait (at most MAX_QUEUE of them, QUEUE_TIMEOUT seconds) or are shed (429)
+    VALKEY_CONCURRENCY_MAX_QUEUE = getattr(settings, "VAPI_CONCURRENCY_MAX_QUEUE", 1000)
+    VALKEY_CONCURRENCY_QUEUE_TIMEOUT = getattr(settings, "VAPI_CONCURRENCY_QUEUE_TIMEOUT", 0.1)
+
    
 
     # --- Locking (Valkey-only, VAPI_*) ---
@@ -67,7 +111,15 @@ class ValkeyConfig:
     VALKEY_LOCK_BLOCKING = getattr(settings, "VAPI_LOCK_BLOCKING", True)
     VALKEY_LOCK_BLOCKING_TIMEOUT = getattr(settings, "VAPI_LOCK_BLOCKING_TIMEOUT", 5)
 
+    # --- Optimistic transactions (Valkey-only, VAPI_*) ---
+    # ValkeyClient.transaction(): attempts before WatchError is raised, and the
+    # full-jitter backoff (seconds) between attempts
+    VALKEY_TRANSACTION_MAX_ATTEMPTS = getattr(settings, "VAPI_TRANSACTION_MAX_ATTEMPTS", 5)
+    VALKEY_TRANSACTION_BACKOFF_BASE = getattr(settings, "VAPI_TRANSACTION_BACKOFF_BASE", 0.005)
+    VALKEY_TRANSACTION_BACKOFF_CAP = getattr(settings, "VAPI_TRANSACTION_BACKOFF_CAP", 0.2)
+
     # --- Command Timeout (Valkey-only, VAPI_*) ---
+    # Deadline (seconds) for every command when no timeout is passed; 0 disables (see deadlines.py)
     VALKEY_COMMAND_TIMEOUT = getattr(settings, "VAPI_COMMAND_TIMEOUT", 5)
 
     # --- SSL/TLS (shared, REDIS_*) ---
@@ -80,6 +132,101 @@ class ValkeyConfig:
     # --- Monitoring (Valkey-only, VAPI_*) ---
     VALKEY_METRICS_ENABLED = getattr(settings, "VAPI_METRICS_ENABLED", True)
     VALKEY_METRICS_NAMESPACE = getattr(settings, "VAPI_METRICS_NAMESPACE", "valkey")
+    # Pools are instrumented when metrics are enabled; in-use/idle counts are sampled this often (seconds)
+    VALKEY_POOL_METRICS_INTERVAL = getattr(settings, "VAPI_POOL_METRICS_INTERVAL", 5)
+    # Command metrics (track_valkey_metrics): share of calls whose latency is measured (0 or 1/N), and
+    # whether counts/latencies are aggregated in-process and flushed every interval (seconds)
+    VALKEY_METRICS_SAMPLE_RATE = getattr(settings, "VAPI_METRICS_SAMPLE_RATE", 1.0)
+    VALKEY_METRICS_AGGREGATE = getattr(settings, "VAPI_METRICS_AGGREGATE", False)
+    VALKEY_METRICS_FLUSH_INTERVAL = getattr(settings, "VAPI_METRICS_FLUSH_INTERVAL", 1)
+
+    # --- Near Cache / client-side caching (Valkey-only, VAPI_*) ---
+    # Opt-in: keeps recently read keys in-process, invalidated via CLIENT TRACKING
+    VALKEY_NEAR_CACHE_ENABLED = getattr(settings, "VAPI_NEAR_CACHE_ENABLED", False)
+    VALKEY_NEAR_CACHE_MAX_SIZE = getattr(settings, "VAPI_NEAR_CACHE_MAX_SIZE", 10000)
+    # Upper bound on staleness (seconds) if an invalidation is ever missed; 0 disables
+    VALKEY_NEAR_CACHE_TTL = getattr(settings, "VAPI_NEAR_CACHE_TTL", 60)
+    # Only keys with these prefixes are tracked/cached (empty = all keys)
+    VALKEY_NEAR_CACHE_PREFIXES = getattr(settings, "VAPI_NEAR_CACHE_PREFIXES", [])
+    # Seconds between tracking checks; keep well under the server's idle timeout (0 disables)
+    VALKEY_NEAR_CACHE_KEEPALIVE = getattr(settings, "VAPI_NEAR_CACHE_KEEPALIVE", 30)
+
+    # --- Auto-pipelining (Valkey-only, VAPI_*) ---
+    # Opt-in: batch single-key commands issued in the same loop tick into one pipeline
+    VALKEY_AUTO_PIPELINE_ENABLED = getattr(settings, "VAPI_AUTO_PIPELINE_ENABLED", False)
+    # Extra wait before flushing, in microseconds (0 = flush on the next loop iteration)
+    VALKEY_AUTO_PIPELINE_WINDOW_US = getattr(settings, "VAPI_AUTO_PIPELINE_WINDOW_US", 0)
+    VALKEY_AUTO_PIPELINE_MAX_BATCH = getattr(settings, "VAPI_AUTO_PIPELINE_MAX_BATCH", 1000)
+    # Max pipelines (i.e. pool connections) in flight at once
+    VALKEY_AUTO_PIPELINE_MAX_INFLIGHT = getattr(settings, "VAPI_AUTO_PIPELINE_MAX_INFLIGHT", 8)
+
+    # --- Batch pipelines (Valkey-only, VAPI_*) ---
+    # ValkeyClient.batch_pipeline() defaults: chunk limits and chunks in flight (see batch_pipeline.py)
+    VALKEY_BATCH_MAX_COMMANDS = getattr(settings, "VAPI_BATCH_MAX_COMMANDS", 1000)
+    VALKEY_BATCH_MAX_BYTES = getattr(settings, "VAPI_BATCH_MAX_BYTES", 1 << 20)
+    VALKEY_BATCH_MAX_INFLIGHT = getattr(settings, "VAPI_BATCH_MAX_INFLIGHT", 4)
+
+    # --- Hot-key detection (Valkey-only, VAPI_*) ---
+    # Opt-in: sampled top-K of the keys passing through get/set/incr (see hotkeys.py)
+    VALKEY_HOT_KEYS_ENABLED = getattr(settings, "VAPI_HOT_KEYS_ENABLED", False)
+    # Sample about one operation in this many
+    VALKEY_HOT_KEYS_SAMPLE_EVERY = getattr(settings, "VAPI_HOT_KEYS_SAMPLE_EVERY", 100)
+    # Counters kept per namespace (key prefix) and command
+    VALKEY_HOT_KEYS_CAPACITY = getattr(settings, "VAPI_HOT_KEYS_CAPACITY", 128)
+    # Counts halve every window (seconds); top keys are exported to Prometheus each window
+    VALKEY_HOT_KEYS_WINDOW = getattr(settings, "VAPI_HOT_KEYS_WINDOW", 60)
+    VALKEY_HOT_KEYS_EXPORT_TOP = getattr(settings, "VAPI_HOT_KEYS_EXPORT_TOP", 10)
+    # Hot-key mitigation: None (off), "local" (short-TTL in-process copy) or
+    # "replicas" (reads spread over suffixed replica keys); uses the sampler above
+    VALKEY_HOT_KEY_MITIGATION = getattr(settings, "VAPI_HOT_KEY_MITIGATION", None)
+    # Reads per second that promote a key, and seconds below it before demotion
+    VALKEY_HOT_KEY_THRESHOLD = getattr(settings, "VAPI_HOT_KEY_THRESHOLD", 1000)
+    VALKEY_HOT_KEY_COOL_DOWN = getattr(settings, "VAPI_HOT_KEY_COOL_DOWN", 30)
+    VALKEY_HOT_KEY_LOCAL_TTL = getattr(settings, "VAPI_HOT_KEY_LOCAL_TTL", 1.0)
+    VALKEY_HOT_KEY_REPLICAS = getattr(settings, "VAPI_HOT_KEY_REPLICAS", 4)
+    # Every write through a client in replicas mode deletes the key's replicas;
+    # writes that bypass one leave them stale for up to this many seconds
+    VALKEY_HOT_KEY_REPLICA_TTL = getattr(settings, "VAPI_HOT_KEY_REPLICA_TTL", 5)
+    VALKEY_HOT_KEY_MAX_PROMOTED = getattr(settings, "VAPI_HOT_KEY_MAX_PROMOTED", 100)
+
+    # --- Value codecs (Valkey-only, VAPI_*) ---
+    # Supported codecs: json, orjson, msgpack, pickle, raw (see serialization.py)
+    VALKEY_CODEC = getattr(settings, "VAPI_CODEC", "json")
+    # Per-namespace overrides, key prefix -> codec name, e.g. {"lru:": "msgpack"}
+    VALKEY_CODEC_NAMESPACES = getattr(settings, "VAPI_CODEC_NAMESPACES", {})
+
+    # --- Compression (Valkey-only, VAPI_*) ---
+    # Supported algorithms: zlib, lzma (None disables compression on write)
+    VALKEY_COMPRESSION = getattr(settings, "VAPI_COMPRESSION", None)
+    VALKEY_COMPRESSION_LEVEL = getattr(settings, "VAPI_COMPRESSION_LEVEL", None)
+    # Only values larger than this many bytes are compressed
+    VALKEY_COMPRESSION_THRESHOLD = getattr(settings, "VAPI_COMPRESSION_THRESHOLD", 4096)
+
+    # --- Read routing (Valkey-only, VAPI_*) ---
+    # Supported policies: primary, prefer-replica, round-robin, lowest-latency
+    VALKEY_READ_POLICY = getattr(settings, "VAPI_READ_POLICY", "primary")
+    # Replicas that haven't heard from their primary for longer (seconds) get no reads
+    VALKEY_REPLICA_MAX_LAG = getattr(settings, "VAPI_REPLICA_MAX_LAG", 5)
+    # Reads of keys this client wrote within this window (seconds) stay on the primary
+    VALKEY_READ_YOUR_WRITES_WINDOW = getattr(settings, "VAPI_READ_YOUR_WRITES_WINDOW", 1.0)
+    VALKEY_REPLICA_CHECK_INTERVAL = getattr(settings, "VAPI_REPLICA_CHECK_INTERVAL", 5)
+    # Standalone-mode replicas, e.g. [{"host": "replica1", "port": 6379}] (cluster replicas are discovered)
+    VALKEY_REPLICA_NODES = getattr(settings, "VAPI_REPLICA_NODES", [])
+
+    # --- Hedged reads (Valkey-only, VAPI_*) ---
+    # Opt-in: re-send reads slower than the tracked latency percentile (see hedging.py)
+    VALKEY_HEDGE_READS = getattr(settings, "VAPI_HEDGE_READS", False)
+    VALKEY_HEDGE_PERCENTILE = getattr(settings, "VAPI_HEDGE_PERCENTILE", 0.95)
+    # Bounds (seconds) of the hedge delay
+    VALKEY_HEDGE_MIN_DELAY = getattr(settings, "VAPI_HEDGE_MIN_DELAY", 0.001)
+    VALKEY_HEDGE_MAX_DELAY = getattr(settings, "VAPI_HEDGE_MAX_DELAY", 0.05)
+    # Max share of extra reads sent as hedges
+    VALKEY_HEDGE_BUDGET = getattr(settings, "VAPI_HEDGE_BUDGET", 0.05)
+
+    # --- Valkey Functions (Valkey-only, VAPI_*) ---
+    # Opt-in (Valkey 7+): load/upgrade the vapi function library at startup and
+    # run the rate limiters through FCALL (see functions.py)
+    VALKEY_FUNCTIONS_ENABLED = getattr(settings, "VAPI_FUNCTIONS_ENABLED", False)
 
     # --- Docs ---
     # See _docs/best_practices for advanced usage, rationale, and tuning recommendations.
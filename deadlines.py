@@ -0,0 +1,119 @@
+"""
+Per-call deadlines for ValkeyClient commands.
+
+Every ValkeyClient command runs under a deadline: the smaller of its own
+`timeout` argument and the budget left on the current context's deadline
+(a contextvar, so it follows the request through every await and task it
+spawns). When the budget runs out the command is cancelled and a valkey
+TimeoutError (HTTP 504) is raised. valkey-py disconnects a connection whose
+command was cancelled mid-reply before returning it to the pool, so a late
+reply can never be read by the next command.
+
+Set a deadline for a block of work:
+
+    with deadline(0.2):
+        user = await client.get(f"user:{uid}")
+        await client.set(f"seen:{uid}", 1, ex=60)
+
+or per inbound request with DeadlineMiddleware (ASGI):
+
+    app.add_middleware(DeadlineMiddleware, default=1.0)
+
+Nested deadlines can only shorten the budget, never extend it.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from valkey.exceptions import TimeoutError
+
+# Absolute time.monotonic() by which work in this context must be done
+_deadline: contextvars.ContextVar[float | None] = contextvars.ContextVar(
+    "valkey_deadline", default=None
+)
+
+
+@contextlib.contextmanager
+def deadline(seconds: float | None):
+    """Bound every Valkey call in this context to finish within `seconds` (None: no change)."""
+    if seconds is None:
+        yield
+        return
+    expires = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(expires if current is None else min(current, expires))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> float | None:
+    """Seconds left on the current deadline, or None without one."""
+    expires = _deadline.get()
+    if expires is None:
+        return None
+    return expires - time.monotonic()
+
+
+def effective_timeout(timeout: float | None) -> float | None:
+    """
+    The budget for one call: min(timeout, remaining deadline). A falsy timeout
+    means no per-call limit. Raises TimeoutError when the deadline already passed.
+    """
+    left = remaining()
+    if left is None:
+        return timeout or None
+    if left <= 0:
+        raise TimeoutError("Valkey deadline exceeded before the command was sent")
+    return min(timeout, left) if timeout else left
+
+
+async def run_with_deadline(
+    action: Callable[..., Awaitable[Any]], timeout: float | None, *args, **kwargs
+) -> Any:
+    """Await action(*args, **kwargs) within the effective timeout, cancelling it when the budget runs out."""
+    budget = effective_timeout(timeout)
+    if budget is None:
+        return await action(*args, **kwargs)
+    try:
+        async with asyncio.timeout(budget):
+            return await action(*args, **kwargs)
+    except asyncio.TimeoutError:
+        raise TimeoutError(f"Valkey command exceeded its {budget:.3f}s deadline") from None
+
+
+class DeadlineMiddleware:
+    """
+    ASGI middleware that starts a deadline for every HTTP request.
+
+    Args:
+        app: The ASGI app
+        default: Budget in seconds when the request carries none (None: no deadline)
+        header: Request header with the caller's remaining budget in seconds
+    """
+
+    def __init__(self, app, default: float | None = None, header: str = "x-request-timeout"):
+        self.app = app
+        self.default = default
+        self.header = header.lower().encode("latin-1")
+
+    def _budget(self, scope) -> float | None:
+        for name, value in scope.get("headers", ()):
+            if name == self.header:
+                try:
+                    budget = float(value)
+                except ValueError:
+                    break
+                return budget if self.default is None else min(budget, self.default)
+        return self.default
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        with deadline(self._budget(scope)):
+            return await self.app(scope, receive, send)
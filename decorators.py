@@ -12,75 +12,182 @@ from app.core.prometheus.metrics import get_cache_count, get_cache_latency
 # Type variable for function return type
 T = TypeVar('T')
 
+
+class MetricsRecorder:
+    """
+    Per-client recorder behind track_valkey_metrics.
+
+    Labelled children are bound once per (cache_type, operation) instead of on
+    every call, and latency is measured with perf_counter_ns. Two knobs bring
+    the per-call cost down further on hot paths:
+
+    - sample_rate: share of calls whose latency is measured, 1/N for every
+      Nth call (or 0); counts stay exact, the latency histogram's _count
+      becomes sampled
+    - aggregate: counts and latency samples are kept locally and pushed to
+      Prometheus by flush() (called periodically by ValkeyClient) instead of
+      on every call; an operation is flushed early once max_buffered latency
+      samples are pending
+
+    Meant for one event loop: aggregated counts are not protected by a lock.
+
+    Args:
+        cache_type: cache_type label (the client's metrics namespace)
+        sample_rate: Share of calls timed: 0, or 1/N for a whole N
+        aggregate: Buffer locally until flush()
+        max_buffered: Latency samples per operation buffered before an early flush
+
+    Raises:
+        ValueError: If sample_rate is not 0 or 1/N
+    """
+
+    def __init__(
+        self,
+        cache_type: str = "valkey",
+        sample_rate: float = 1.0,
+        aggregate: bool = False,
+        max_buffered: int = 1024,
+    ):
+        self.cache_type = cache_type
+        self.aggregate = aggregate
+        self.max_buffered = max_buffered
+        # 0 times no call at all
+        self._every = round(1 / sample_rate) if sample_rate > 0 else 0
+        if not 0 <= sample_rate <= 1 or (self._every and abs(self._every * sample_rate - 1) > 1e-9):
+            raise ValueError(f"sample_rate must be 0 or 1/N for a whole N (e.g. 0.5, 0.1), got {sample_rate}")
+        self._calls = 0
+        self._counters: Dict[str, Any] = {}
+        self._latencies: Dict[str, Any] = {}
+        self._pending_counts: Dict[str, int] = {}
+        self._pending_samples: Dict[str, list] = {}
+
+    def _counter(self, outcome: str):
+        child = self._counters.get(outcome)
+        if child is None:
+            child = self._counters[outcome] = get_cache_count().labels(self.cache_type, outcome)
+        return child
+
+    def _latency(self, operation: str):
+        child = self._latencies.get(operation)
+        if child is None:
+            child = self._latencies[operation] = get_cache_latency().labels(self.cache_type, operation)
+        return child
+
+    def start(self) -> int:
+        """Start time (perf_counter_ns) if this call is sampled, else 0."""
+        if not self._every:
+            return 0
+        self._calls += 1
+        if self._calls < self._every:
+            return 0
+        self._calls = 0
+        return time.perf_counter_ns()
+
+    def record(self, operation: str, outcome: Optional[str], started: int) -> None:
+        """Count outcome (None when the call raised) and, if sampled, its latency under operation."""
+        if self.aggregate:
+            if outcome is not None:
+                self._pending_counts[outcome] = self._pending_counts.get(outcome, 0) + 1
+            if started:
+                samples = self._pending_samples.get(operation)
+                if samples is None:
+                    samples = self._pending_samples[operation] = []
+                samples.append(time.perf_counter_ns() - started)
+                if len(samples) >= self.max_buffered:
+                    self._flush_samples(operation, samples)
+            return
+        if outcome is not None:
+            self._counter(outcome).inc()
+        if started:
+            self._latency(operation).observe((time.perf_counter_ns() - started) / 1e9)
+
+    def _flush_samples(self, operation: str, samples: list) -> None:
+        observe = self._latency(operation).observe
+        for elapsed_ns in samples:
+            observe(elapsed_ns / 1e9)
+        samples.clear()
+
+    def flush(self) -> None:
+        """Push aggregated counts and latency samples to Prometheus."""
+        counts, self._pending_counts = self._pending_counts, {}
+        for outcome, count in counts.items():
+            self._counter(outcome).inc(count)
+        for operation, samples in self._pending_samples.items():
+            if samples:
+                self._flush_samples(operation, samples)
+
+
+# Direct (unsampled, unbuffered) recorders for objects without their own, by cache_type
+_default_recorders: Dict[str, MetricsRecorder] = {}
+
+
+def _outcome(operation: str, result: Any) -> str:
+    # Track hit or miss based on result for get operations
+    if operation == 'get':
+        return 'hit' if result is not None else 'miss'
+    # For set, delete, etc. operations
+    return operation
+
+
 def track_valkey_metrics(operation: str):
     """
     Decorator that tracks timing and outcome of Redis/Valkey operations.
-    
+
+    Methods of objects with a `_metrics_recorder` (ValkeyClient) record through
+    it (see MetricsRecorder); anything else records directly, labelled with
+    the object's `_metrics_namespace` when present.
+
     Args:
         operation: The operation name ('hit', 'miss', 'set', 'delete')
-    
+
     Usage:
         @track_valkey_metrics('get')
         async def get_from_cache(key):
             # Your function implementation
             return value
     """
+    def _recorder(args: tuple) -> MetricsRecorder:
+        recorder = getattr(args[0], '_metrics_recorder', None) if args else None
+        if recorder is None:
+            # Try to extract cache_type from self or args if available
+            cache_type = getattr(args[0], '_metrics_namespace', 'valkey') if args else 'valkey'
+            recorder = _default_recorders.get(cache_type)
+            if recorder is None:
+                recorder = _default_recorders[cache_type] = MetricsRecorder(cache_type)
+        return recorder
+
     def decorator(func: Callable[..., T]) -> Callable[..., T]:
         is_async = asyncio.iscoroutinefunction(func)
-        
+
         if is_async:
             @functools.wraps(func)
             async def wrapper_async(*args: Any, **kwargs: Any) -> T:
-                cache_type = "valkey"  # Default cache type
-                
-                # Try to extract cache_type from self or args if available
-                if args and hasattr(args[0], '_metrics_namespace'):
-                    cache_type = getattr(args[0], '_metrics_namespace', 'valkey')
-                
-                start_time = time.time()
+                recorder = _recorder(args)
+                started = recorder.start()
+                outcome = None
                 try:
                     result = await func(*args, **kwargs)
-                    # Track hit or miss based on result for get operations
-                    if operation == 'get':
-                        actual_op = 'hit' if result is not None else 'miss'
-                        get_cache_count().labels(cache_type, actual_op).inc()
-                    else:
-                        # For set, delete, etc. operations
-                        get_cache_count().labels(cache_type, operation).inc()
-                    
+                    outcome = _outcome(operation, result)
                     return result
                 finally:
                     # Always track operation latency
-                    elapsed = time.time() - start_time
-                    get_cache_latency().labels(cache_type, operation).observe(elapsed)
-            
+                    recorder.record(operation, outcome, started)
+
             return cast(Callable[..., T], wrapper_async)
         else:
             @functools.wraps(func)
             def wrapper_sync(*args: Any, **kwargs: Any) -> T:
-                cache_type = "valkey"
-                
-                # Try to extract cache_type from self or args if available
-                if args and hasattr(args[0], '_metrics_namespace'):
-                    cache_type = getattr(args[0], '_metrics_namespace', 'valkey')
-                
-                start_time = time.time()
+                recorder = _recorder(args)
+                started = recorder.start()
+                outcome = None
                 try:
                     result = func(*args, **kwargs)
-                    # Track hit or miss based on result for get operations
-                    if operation == 'get':
-                        actual_op = 'hit' if result is not None else 'miss'
-                        get_cache_count().labels(cache_type, actual_op).inc()
-                    else:
-                        # For set, delete, etc. operations
-                        get_cache_count().labels(cache_type, operation).inc()
-                    
+                    outcome = _outcome(operation, result)
                     return result
                 finally:
                     # Always track operation latency
-                    elapsed = time.time() - start_time
-                    get_cache_latency().labels(cache_type, operation).observe(elapsed)
-            
+                    recorder.record(operation, outcome, started)
+
             return wrapper_sync
-    
+
     return decorator
@@ -2,7 +2,10 @@
 Centralized exception handling with HTTP status codes.
 
 Defines:
+- CircuitOpenError, raised while a node's circuit breaker is open
+- VALKEY_ERRORS_MAPPING, the default exception -> HTTP status table
 - log_and_raise_valkey_exception utility
+- raise_valkey_exception, the error path of handle_valkey_exceptions
 - handle_valkey_exceptions async utility
 """
 import logging
@@ -45,6 +48,100 @@ from valkey.exceptions import (
 logger = logging.getLogger(__name__)
 
 
+class CircuitOpenError(ConnectionError):
+    """
+    Raised instead of sending a command while the circuit breaker of its node
+    and read/write class is open (see limiting/circuit_breaker.py).
+    """
+
+    status_code = 503
+
+    def __init__(self, node: str, kind: str, retry_after: float):
+        super().__init__(
+            f"Valkey circuit for {node} ({kind}) is open, retry in {retry_after:.2f}s"
+        )
+        self.node = node
+        self.kind = kind
+        self.retry_after = retry_after
+        self.details = {"node": node, "kind": kind, "retry_after": retry_after}
+
+
+# error_type name -> exception class for log_and_raise_valkey_exception
+VALKEY_ERROR_TYPES = {
+    "connection": ConnectionError,
+    "timeout": TimeoutError,
+    "auth": AuthenticationError,
+    "authorization": AuthorizationError,
+    "response": ResponseError,
+    "cluster": ValkeyClusterException,
+    "api": ValkeyError,
+    # Add direct mappings for all Valkey exception class names
+    "BusyLoadingError": BusyLoadingError,
+    "InvalidResponse": InvalidResponse,
+    "DataError": DataError,
+    "PubSubError": PubSubError,
+    "WatchError": WatchError,
+    "NoScriptError": NoScriptError,
+    "OutOfMemoryError": OutOfMemoryError,
+    "ExecAbortError": ExecAbortError,
+    "ReadOnlyError": ReadOnlyError,
+    "NoPermissionError": NoPermissionError,
+    "ModuleError": ModuleError,
+    "LockError": LockError,
+    "LockNotOwnedError": LockNotOwnedError,
+    "ChildDeadlockedError": ChildDeadlockedError,
+    "AuthenticationWrongNumberOfArgsError": AuthenticationWrongNumberOfArgsError,
+    "ClusterError": ClusterError,
+    "ClusterDownError": ClusterDownError,
+    "AskError": AskError,
+    "TryAgainError": TryAgainError,
+    "ClusterCrossSlotError": ClusterCrossSlotError,
+    "MovedError": MovedError,
+    "MasterDownError": MasterDownError,
+    "SlotNotCoveredError": SlotNotCoveredError,
+    "MaxConnectionsError": MaxConnectionsError,
+    "CircuitOpenError": CircuitOpenError,
+}
+
+# Default exception -> HTTP status mapping of handle_valkey_exceptions (exact type;
+# other Valkey errors map to 500 unless they carry a status_code)
+VALKEY_ERRORS_MAPPING = {
+    AuthenticationError: 401,
+    AuthorizationError: 403,
+    ConnectionError: 503,
+    TimeoutError: 504,
+    BusyLoadingError: 503,
+    ResponseError: 502,
+    DataError: 400,
+    PubSubError: 500,
+    WatchError: 409,
+    NoScriptError: 500,
+    OutOfMemoryError: 507,
+    ExecAbortError: 500,
+    ReadOnlyError: 403,
+    NoPermissionError: 403,
+    ModuleError: 500,
+    LockError: 423,
+    LockNotOwnedError: 423,
+    ChildDeadlockedError: 500,
+    AuthenticationWrongNumberOfArgsError: 400,
+    ValkeyClusterException: 500,
+    ClusterError: 500,
+    ClusterDownError: 503,
+    AskError: 502,
+    TryAgainError: 503,
+    ClusterCrossSlotError: 400,
+    MovedError: 502,
+    MasterDownError: 503,
+    SlotNotCoveredError: 503,
+    MaxConnectionsError: 429,
+    CircuitOpenError: 503,
+}
+# Aliases for functions whose VALKEY_ERRORS_MAPPING argument shadows the table
+_DEFAULT_ERRORS_MAPPING = VALKEY_ERRORS_MAPPING
+_DEFAULT_MAPPED_ERRORS = tuple(VALKEY_ERRORS_MAPPING)
+
+
 def log_and_raise_valkey_exception(
     logger, error_type: str, *args, log_message=None, **kwargs
 ):
@@ -59,47 +156,61 @@ def log_and_raise_valkey_exception(
     Raises:
         ValkeyError: An instance of the specified Valkey exception class
     """
-    error_map = {
-        "connection": ConnectionError,
-        "timeout": TimeoutError,
-        "auth": AuthenticationError,
-        "authorization": AuthorizationError,
-        "response": ResponseError,
-        "cluster": ValkeyClusterException,
-        "api": ValkeyError,
-        # Add direct mappings for all Valkey exception class names
-        "BusyLoadingError": BusyLoadingError,
-        "InvalidResponse": InvalidResponse,
-        "DataError": DataError,
-        "PubSubError": PubSubError,
-        "WatchError": WatchError,
-        "NoScriptError": NoScriptError,
-        "OutOfMemoryError": OutOfMemoryError,
-        "ExecAbortError": ExecAbortError,
-        "ReadOnlyError": ReadOnlyError,
-        "NoPermissionError": NoPermissionError,
-        "ModuleError": ModuleError,
-        "LockError": LockError,
-        "LockNotOwnedError": LockNotOwnedError,
-        "ChildDeadlockedError": ChildDeadlockedError,
-        "AuthenticationWrongNumberOfArgsError": AuthenticationWrongNumberOfArgsError,
-        "ClusterError": ClusterError,
-        "ClusterDownError": ClusterDownError,
-        "AskError": AskError,
-        "TryAgainError": TryAgainError,
-        "ClusterCrossSlotError": ClusterCrossSlotError,
-        "MovedError": MovedError,
-        "MasterDownError": MasterDownError,
-        "SlotNotCoveredError": SlotNotCoveredError,
-        "MaxConnectionsError": MaxConnectionsError,
-    }
-    exc_class = error_map.get(error_type, ValkeyError)
+    exc_class = VALKEY_ERROR_TYPES.get(error_type, ValkeyError)
     exception = exc_class(*args, **kwargs)
     message = log_message or str(exception)
-    logger.error(f"Valkey Exception [{exc_class.__name__}]: {message}")
+    logger.error("Valkey Exception [%s]: %s", exc_class.__name__, message)
     raise exception
 
 
+def raise_valkey_exception(
+    exc: Exception,
+    *,
+    endpoint: str | None = None,
+    logger=None,
+    current_user: dict | None = None,
+    extra_context: dict | None = None,
+    VALKEY_ERRORS_MAPPING: dict | None = None,
+    wrap_http_exception: bool = True,
+):
+    """
+    Error path of handle_valkey_exceptions: log exc with its context and raise
+    it as a mapped HTTPException (or unchanged when wrap_http_exception is
+    False). Call it from an except block; callers with their own try/except
+    pay nothing for the mapping until something fails.
+    """
+    if VALKEY_ERRORS_MAPPING is None:
+        mapping, mapped = _DEFAULT_ERRORS_MAPPING, _DEFAULT_MAPPED_ERRORS
+    else:
+        mapping, mapped = VALKEY_ERRORS_MAPPING, tuple(VALKEY_ERRORS_MAPPING)
+    if isinstance(exc, mapped):
+        status_code = getattr(exc, "status_code", None) or mapping.get(type(exc), 500)
+        detail = {
+            "error": type(exc).__name__,
+            "message": str(exc),
+            "endpoint": endpoint,
+            "user": current_user,
+            "context": extra_context,
+            "details": getattr(exc, "details", None),
+        }
+        if logger:
+            logger.error("[Valkey] Exception at %s: %s", endpoint, detail)
+    else:
+        status_code = 500
+        detail = {
+            "error": "UnhandledException",
+            "message": str(exc),
+            "endpoint": endpoint,
+            "user": current_user,
+            "context": extra_context,
+        }
+        if logger:
+            logger.error("[Valkey] Unhandled exception at %s: %s", endpoint, detail)
+    if wrap_http_exception:
+        raise HTTPException(status_code=status_code, detail=detail) from exc
+    raise exc
+
+
 async def handle_valkey_exceptions(
     func,
     *,
@@ -128,72 +239,20 @@ async def handle_valkey_exceptions(
         logger: Optional logger instance.
         current_user: Optional dict of user info.
         extra_context: Optional dict for additional context (e.g., request_id).
-        VALKEY_ERRORS_MAPPING: Optional dict mapping Valkey exceptions to HTTP response codes.
+        VALKEY_ERRORS_MAPPING: Optional dict mapping Valkey exceptions to HTTP response codes
+            (defaults to the module-level VALKEY_ERRORS_MAPPING).
     Returns:
         The result of func, or raises mapped HTTPException on error (if wrap_http_exception is True), otherwise raises the original exception.
     """
-    if VALKEY_ERRORS_MAPPING is None:
-        VALKEY_ERRORS_MAPPING = {
-            AuthenticationError: 401,
-            AuthorizationError: 403,
-            ConnectionError: 503,
-            TimeoutError: 504,
-            BusyLoadingError: 503,
-            ResponseError: 502,
-            DataError: 400,
-            PubSubError: 500,
-            WatchError: 409,
-            NoScriptError: 500,
-            OutOfMemoryError: 507,
-            ExecAbortError: 500,
-            ReadOnlyError: 403,
-            NoPermissionError: 403,
-            ModuleError: 500,
-            LockError: 423,
-            LockNotOwnedError: 423,
-            ChildDeadlockedError: 500,
-            AuthenticationWrongNumberOfArgsError: 400,
-            ValkeyClusterException: 500,
-            ClusterError: 500,
-            ClusterDownError: 503,
-            AskError: 502,
-            TryAgainError: 503,
-            ClusterCrossSlotError: 400,
-            MovedError: 502,
-            MasterDownError: 503,
-            SlotNotCoveredError: 503,
-            MaxConnectionsError: 429,
-        }
     try:
         return await func()
-    except tuple(VALKEY_ERRORS_MAPPING.keys()) as exc:
-        status_code = getattr(exc, "status_code", None) or VALKEY_ERRORS_MAPPING.get(type(exc), 500)
-        error_type = type(exc).__name__
-        detail = {
-            "error": error_type,
-            "message": str(exc),
-            "endpoint": endpoint,
-            "user": current_user,
-            "context": extra_context,
-            "details": getattr(exc, "details", None),
-        }
-        if logger:
-            logger.error(f"[Valkey] Exception at {endpoint}: {detail}")
-        if wrap_http_exception:
-            raise HTTPException(status_code=status_code, detail=detail) from exc
-        else:
-            raise exc
     except Exception as exc:
-        detail = {
-            "error": "UnhandledException",
-            "message": str(exc),
-            "endpoint": endpoint,
-            "user": current_user,
-            "context": extra_context,
-        }
-        if logger:
-            logger.error(f"[Valkey] Unhandled exception at {endpoint}: {detail}")
-        if wrap_http_exception:
-            raise HTTPException(status_code=500, detail=detail) from exc
-        else:
-            raise exc
+        raise_valkey_exception(
+            exc,
+            endpoint=endpoint,
+            logger=logger,
+            current_user=current_user,
+            extra_context=extra_context,
+            VALKEY_ERRORS_MAPPING=VALKEY_ERRORS_MAPPING,
+            wrap_http_exception=wrap_http_exception,
+        )
@@ -0,0 +1,125 @@
+"""
+Valkey Functions library ("vapi") for the rate-limit and cache primitives.
+
+Unlike EVALSHA scripts, a function library is stored by the server itself:
+it is persisted in RDB/AOF, replicated to replicas and survives restarts, so
+it is loaded once per deployment rather than once per process. Functions
+flagged `no-writes` can be called with FCALL_RO, which replicas accept, so
+read-only checks can be served by the read router (see routing.py).
+
+The library carries its own version (returned by vapi_version).
+ValkeyClient.ensure_functions() compares it with LIBRARY_VERSION on every
+primary / shard and runs FUNCTION LOAD REPLACE only when the server copy is
+older, so deploys upgrade the library and never downgrade it. Bump
+LIBRARY_VERSION with every change to LIBRARY_SOURCE.
+
+Only single-key primitives are packaged: every function touches KEYS[1] only,
+so calls route like any single-key command in cluster and sharded mode.
+
+Usage:
+    allowed = await client.fcall("vapi_token_bucket", keys=[key], args=[capacity, rate, interval, now])
+    count, pttl = await client.fcall("vapi_window_count", keys=[key], read_only=True)
+
+Requires Valkey (or Redis) 7+.
+"""
+
+LIBRARY_NAME = "vapi"
+LIBRARY_VERSION = 1
+
+LIBRARY_SOURCE = """#!lua name=vapi
+
+local VERSION = %(version)d
+
+local function version()
+  return VERSION
+end
+
+-- Rate limiting: each call counts one event, returns 1 (allowed) or 0 / the count
+
+local function token_bucket(keys, args)
+  local capacity = tonumber(args[1])
+  local refill_rate = tonumber(args[2])
+  local interval = tonumber(args[3])
+  local now = tonumber(args[4])
+  local bucket = redis.call('HMGET', keys[1], 'tokens', 'last')
+  local tokens = tonumber(bucket[1]) or capacity
+  local last = tonumber(bucket[2]) or now
+  local refill = math.floor(math.max(0, now - last) / interval) * refill_rate
+  tokens = math.min(capacity, tokens + refill)
+  local allowed = 0
+  if tokens > 0 then
+    tokens = tokens - 1
+    allowed = 1
+  end
+  redis.call('HSET', keys[1], 'tokens', tokens, 'last', now)
+  redis.call('EXPIRE', keys[1], interval * 2)
+  return allowed
+end
+
+local function fixed_window(keys, args)
+  local count = redis.call('INCR', keys[1])
+  if count == 1 then
+    redis.call('EXPIRE', keys[1], tonumber(args[1]))
+  end
+  return count
+end
+
+local function sliding_window(keys, args)
+  local window = tonumber(args[1])
+  local now = tonumber(args[2])
+  redis.call('ZREMRANGEBYSCORE', keys[1], 0, now - window)
+  redis.call('ZADD', keys[1], now, args[3])
+  local count = redis.call('ZCARD', keys[1])
+  redis.call('EXPIRE', keys[1], window)
+  return count
+end
+
+local function throttle(keys, args)
+  if redis.call('SET', keys[1], args[2], 'NX', 'EX', tonumber(args[1])) then
+    return 1
+  end
+  return 0
+end
+
+local function debounce(keys, args)
+  if redis.call('TTL', keys[1]) > 0 then
+    return 0
+  end
+  redis.call('SET', keys[1], args[2], 'EX', tonumber(args[1]))
+  return 1
+end
+
+-- Read-only checks (FCALL_RO, may run on replicas)
+
+local function window_count(keys, args)
+  local key_type = redis.call('TYPE', keys[1])['ok']
+  local count = 0
+  if key_type == 'string' then
+    count = tonumber(redis.call('GET', keys[1])) or 0
+  elseif key_type == 'zset' then
+    count = redis.call('ZCARD', keys[1])
+  elseif key_type == 'hash' then
+    count = tonumber(redis.call('HGET', keys[1], 'tokens')) or 0
+  end
+  return {count, redis.call('PTTL', keys[1])}
+end
+
+local function cache_peek(keys, args)
+  return {redis.call('GET', keys[1]), redis.call('PTTL', keys[1])}
+end
+
+redis.register_function{function_name='vapi_version', callback=version, flags={'no-writes'}}
+redis.register_function('vapi_token_bucket', token_bucket)
+redis.register_function('vapi_fixed_window', fixed_window)
+redis.register_function('vapi_sliding_window', sliding_window)
+redis.register_function('vapi_throttle', throttle)
+redis.register_function('vapi_debounce', debounce)
+redis.register_function{function_name='vapi_window_count', callback=window_count, flags={'no-writes'}}
+redis.register_function{function_name='vapi_cache_peek', callback=cache_peek, flags={'no-writes'}}
+""" % {"version": LIBRARY_VERSION}
+
+# Deployments (ValkeyClient script scopes) this process has checked the library on
+LOADED_SCOPES: set[str] = set()
+
+# Functions flagged no-writes, callable with FCALL_RO
+READ_ONLY_FUNCTIONS = frozenset({"vapi_version", "vapi_window_count", "vapi_cache_peek"})
@@ -90,3 +90,24 @@ valkey_health = ValkeyHealth()
 async def valkey_health_check():
     """Endpoint for Valkey health checks."""
     return await valkey_health.get_health_status()
+
+
+@router.get("/health/valkey/ready")
+async def valkey_readiness():
+    """Readiness probe: 503 until ValkeyClient.warm_up() has completed."""
+    report = valkey_client.warm_up_report
+    return JSONResponse(
+        status_code=200 if report is not None else 503,
+        content={"ready": report is not None, "warm_up": report},
+    )
+
+
+@router.get("/health/valkey/hot-keys")
+async def valkey_hot_keys(namespace: str | None = None, command: str | None = None, limit: int = 10):
+    """Hottest keys seen by this process (empty unless VAPI_HOT_KEYS_ENABLED)."""
+    return JSONResponse(
+        content={"hot_keys": [
+            {**entry, "key": str(entry["key"])}
+            for entry in valkey_client.hot_keys(namespace, command, limit)
+        ]}
+    )
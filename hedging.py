@@ -0,0 +1,142 @@
+"""
+Hedged reads for ValkeyClient.
+
+A read that has not answered within the recent p95 (configurable percentile)
+of read latency is sent a second time, to a replica when read routing has
+one available, otherwise on a second pool connection to the same node. The
+first reply wins and the other request is cancelled. Tail spikes of a single
+node or connection (fork for BGSAVE, a slow command ahead in the socket,
+a GC pause) are then paid by only the fraction of reads that would have hit
+them.
+
+Extra load is capped by a budget: every read earns `budget` hedge tokens
+(up to `burst`) and every hedge spends one, so at most ~budget (5% by
+default) extra reads are sent however slow the server gets.
+"""
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from .metrics import get_hedged_reads
+
+
+class LatencyTracker:
+    """
+    Percentile of the last `size` observed latencies (seconds), recomputed
+    every `refresh` samples.
+    """
+
+    __slots__ = ("percentile", "size", "refresh", "_samples", "_index", "_count", "_value")
+
+    def __init__(self, percentile: float = 0.95, size: int = 1000, refresh: int = 100):
+        if not 0 < percentile < 1:
+            raise ValueError("percentile must be in (0, 1)")
+        self.percentile = percentile
+        self.size = size
+        self.refresh = refresh
+        self._samples: list[float] = []
+        self._index = 0
+        self._count = 0
+        self._value: float | None = None
+
+    def observe(self, seconds: float) -> None:
+        if len(self._samples) < self.size:
+            self._samples.append(seconds)
+        else:
+            self._samples[self._index] = seconds
+            self._index = (self._index + 1) % self.size
+        self._count += 1
+        if self._count % self.refresh == 0:
+            ordered = sorted(self._samples)
+            self._value = ordered[min(len(ordered) - 1, int(len(ordered) * self.percentile))]
+
+    @property
+    def value(self) -> float | None:
+        """Current percentile, None until `refresh` samples were observed."""
+        return self._value
+
+
+class Hedger:
+    """
+    Runs a read and, if it is slower than the tracked percentile, a duplicate.
+
+    Args:
+        percentile: Latency percentile after which a read is hedged
+        min_delay/max_delay: Bounds (seconds) of the hedge delay; max_delay is
+            also used until enough latencies were observed
+        budget: Hedge tokens earned per read (max share of extra reads)
+        burst: Max tokens saved up
+        export: Count hedges in Prometheus
+    """
+
+    def __init__(
+        self,
+        percentile: float = 0.95,
+        min_delay: float = 0.001,
+        max_delay: float = 0.05,
+        budget: float = 0.05,
+        burst: float = 10,
+        export: bool = True,
+    ):
+        self.latency = LatencyTracker(percentile)
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.budget = budget
+        self.burst = burst
+        self.export = export
+        self._tokens = burst
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    @property
+    def delay(self) -> float:
+        value = self.latency.value
+        if value is None:
+            return self.max_delay
+        return min(self.max_delay, max(self.min_delay, value))
+
+    def _take_token(self) -> bool:
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+    def _count(self, outcome: str) -> None:
+        if self.export:
+            get_hedged_reads().labels(outcome).inc()
+
+    async def run(
+        self,
+        first: Callable[[], Awaitable[Any]],
+        second: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """Await first(); hedge with second() once the delay passes. First success wins."""
+        self._tokens = min(self.burst, self._tokens + self.budget)
+        start = time.perf_counter()
+        primary = asyncio.ensure_future(first())
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.delay)
+            if not done:
+                if not self._take_token():
+                    self._count("skipped")
+                    return await primary
+                self.hedged += 1
+                self._count("fired")
+                tasks.add(asyncio.ensure_future(second()))
+            while True:
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    tasks.discard(task)
+                    if task.exception() is None or not tasks:
+                        if task is not primary:
+                            self.hedge_wins += 1
+                            self._count("won")
+                        return task.result()
+                # The losing request failed while the other is still running: keep waiting
+        finally:
+            self.latency.observe(time.perf_counter() - start)
+            for task in tasks:
+                task.cancel()
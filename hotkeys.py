@@ -0,0 +1,362 @@
+"""
+Hot-key detection and mitigation for ValkeyClient.
+
+A sample of the keys passing through get/set/incr is fed into one
+Space-Saving sketch per (namespace, command), where the namespace is the key
+prefix before the first ":". Each sketch holds at most `capacity` counters,
+so memory stays bounded whatever the keyspace, and any key whose share of the
+sampled traffic exceeds 1/capacity is guaranteed to be tracked.
+
+Sampling keeps the hot path to a counter decrement: only about one operation
+in `sample_every` touches the sketch (randomised skip, so periodic access
+patterns cannot alias). Counts are scaled back up by `sample_every` and
+halved every `window` seconds, so the top-K follows current traffic; the top
+entries are exported to Prometheus at each window.
+
+HotKeyMitigation builds on the read rates to serve promoted keys locally or
+from replica keys. In replicas mode every write through a client with
+mitigation enabled deletes the written key's replica keys, whether or not
+that process has promoted it; writes that bypass such a client (other
+clients, raw connections, scripts) leave replicas serving the old value for
+up to `replica_ttl` (VALKEY_HOT_KEY_REPLICA_TTL).
+"""
+
+import random
+import time
+from typing import Any
+
+from .metrics import get_hot_key_ops
+
+OTHER_NAMESPACE = "_other"
+
+
+class SpaceSavingSketch:
+    """
+    Space-Saving top-K counter (Metwally et al.).
+
+    Every tracked key has a count and an error bound: its true count lies in
+    [count - error, count]. The count a key had when the current window
+    started is kept as its base, so count - base is what was added since.
+    """
+
+    __slots__ = ("capacity", "counts", "errors", "bases")
+
+    def __init__(self, capacity: int = 128):
+        self.capacity = capacity
+        self.counts: dict[Any, float] = {}
+        self.errors: dict[Any, float] = {}
+        self.bases: dict[Any, float] = {}
+
+    def add(self, key: Any, weight: float = 1) -> float:
+        """Count key, returning its new (over-)estimate."""
+        counts = self.counts
+        if key in counts:
+            counts[key] += weight
+            return counts[key]
+        if len(counts) < self.capacity:
+            counts[key] = weight
+            self.errors[key] = 0
+            self.bases[key] = 0
+            return weight
+        # Replace the smallest counter; the newcomer inherits its count as error
+        victim = min(counts, key=counts.__getitem__)
+        floor = counts.pop(victim)
+        del self.errors[victim]
+        del self.bases[victim]
+        counts[key] = floor + weight
+        self.errors[key] = floor
+        # The inherited count was not added in this window
+        self.bases[key] = floor
+        return counts[key]
+
+    def window_count(self, key: Any) -> float:
+        """Count added to key since the current window started."""
+        return self.counts.get(key, 0) - self.bases.get(key, 0)
+
+    def decay(self, factor: float = 0.5) -> None:
+        """Scale every count down and start a new window."""
+        for key in self.counts:
+            self.counts[key] *= factor
+            self.errors[key] *= factor
+            self.bases[key] = self.counts[key]
+
+    def top(self, limit: int = 10) -> list[tuple[Any, float, float]]:
+        """[(key, count, error)] by descending count."""
+        ranked = sorted(self.counts.items(), key=lambda item: item[1], reverse=True)
+        return [(key, count, self.errors[key]) for key, count in ranked[:limit]]
+
+
+class HotKeyTracker:
+    """
+    Sampled hot-key detection per namespace and command.
+
+    Args:
+        sample_every: Sample about one operation in this many (1 = every operation)
+        capacity: Counters per (namespace, command) sketch
+        window: Seconds between count halvings / Prometheus exports
+        max_namespaces: Namespaces beyond this share the "_other" sketch
+        export_top: Keys exported per sketch to Prometheus (0 disables export)
+    """
+
+    def __init__(
+        self,
+        sample_every: int = 100,
+        capacity: int = 128,
+        window: float = 60,
+        max_namespaces: int = 64,
+        export_top: int = 10,
+    ):
+        self.sample_every = max(1, sample_every)
+        self.capacity = capacity
+        self.window = window
+        self.max_namespaces = max_namespaces
+        self.export_top = export_top
+        self._sketches: dict[tuple[str, str], SpaceSavingSketch] = {}
+        self._namespaces: set[str] = set()
+        self._countdown = self._next_skip()
+        self._window_start = time.monotonic()
+
+    def _next_skip(self) -> int:
+        if self.sample_every == 1:
+            return 1
+        return random.randint(1, 2 * self.sample_every - 1)
+
+    @staticmethod
+    def namespace_of(key: Any) -> str:
+        if isinstance(key, bytes):
+            key = key.decode("utf-8", "replace")
+        prefix, sep, _ = str(key).partition(":")
+        return prefix if sep else ""
+
+    def record(self, command: str, key: Any) -> float | None:
+        """
+        Count one operation. Returns the key's estimated operations per second
+        when this operation was sampled, else None.
+        """
+        self._countdown -= 1
+        if self._countdown:
+            return None
+        self._countdown = self._next_skip()
+        return self._sample(command, key)
+
+    def _sample(self, command: str, key: Any) -> float:
+        now = time.monotonic()
+        if now - self._window_start >= self.window:
+            self._roll(now)
+        namespace = self.namespace_of(key)
+        if namespace not in self._namespaces:
+            if len(self._namespaces) < self.max_namespaces:
+                self._namespaces.add(namespace)
+            else:
+                namespace = OTHER_NAMESPACE
+        sketch = self._sketches.get((namespace, command))
+        if sketch is None:
+            sketch = self._sketches[(namespace, command)] = SpaceSavingSketch(self.capacity)
+        sketch.add(key, self.sample_every)
+        return self._rate(sketch, key, now)
+
+    def _rate(self, sketch: SpaceSavingSketch, key: Any, now: float) -> float:
+        # Only this window's operations: counts carried over from earlier
+        # windows were halved, not observed over the time since the roll
+        return sketch.window_count(key) / max(now - self._window_start, 1.0)
+
+    def _roll(self, now: float) -> None:
+        self.export()
+        for sketch in self._sketches.values():
+            sketch.decay()
+        self._window_start = now
+
+    def hot_keys(
+        self, namespace: str | None = None, command: str | None = None, limit: int = 10
+    ) -> list[dict]:
+        """
+        Current hottest keys, optionally for one namespace and/or command.
+        Counts are estimated operations (sampling and decay applied); rates are
+        operations per second in the current window.
+        """
+        now = time.monotonic()
+        found = []
+        for (ns, cmd), sketch in self._sketches.items():
+            if (namespace is None or ns == namespace) and (command is None or cmd == command):
+                for key, count, error in sketch.top(limit):
+                    found.append({
+                        "key": key,
+                        "namespace": ns,
+                        "command": cmd,
+                        "count": round(count),
+                        "error": round(error),
+                        "rate": self._rate(sketch, key, now),
+                    })
+        found.sort(key=lambda entry: entry["count"], reverse=True)
+        return found[:limit]
+
+    def export(self) -> None:
+        """Publish the top keys of every sketch as valkey_hot_key_ops{namespace, command, key}."""
+        if not self.export_top:
+            return
+        gauge = get_hot_key_ops()
+        gauge.clear()
+        for (namespace, command), sketch in self._sketches.items():
+            for key, count, _ in sketch.top(self.export_top):
+                gauge.labels(namespace, command, str(key)).set(count)
+
+    def reset(self) -> None:
+        self._sketches.clear()
+        self._namespaces.clear()
+        self._window_start = time.monotonic()
+
+
+class HotKeyMitigation:
+    """
+    Serves reads of detected hot keys without hammering their node.
+
+    A key is promoted once its sampled read rate reaches `threshold` reads per
+    second, and demoted after `cool_down` seconds without a sample above the
+    threshold. Promoted keys are read in one of two modes:
+
+    - "local": from a short-TTL in-process copy of the raw value
+    - "replicas": from one of `replicas` copies stored under
+      "<key>:hotrep:<i>" (picked at random, so in cluster mode the load
+      spreads over several slots unless the key has a hash tag), each
+      refreshed from the key on a miss and expiring after `replica_ttl` seconds
+
+    Writes through the client drop the local copy and, in replicas mode,
+    delete the replica keys of every written key, since another process may
+    have promoted it. Writes from processes that have not promoted the key
+    are picked up within `local_ttl`; writes that do not go through a client
+    in replicas mode are picked up within `replica_ttl`.
+
+    Args:
+        tracker: Sampled read counter used to estimate per-key read rates
+        mode: "local" or "replicas"
+        threshold: Reads per second that promote a key
+        cool_down: Seconds below the threshold before a key is demoted
+        local_ttl: Lifetime of in-process copies (seconds)
+        replicas: Replica keys per promoted key
+        replica_ttl: Lifetime of replica keys (seconds)
+        max_promoted: Max keys promoted at once
+    """
+
+    REPLICA_SUFFIX = ":hotrep:"
+
+    def __init__(
+        self,
+        tracker: HotKeyTracker,
+        mode: str = "local",
+        threshold: float = 1000,
+        cool_down: float = 30,
+        local_ttl: float = 1.0,
+        replicas: int = 4,
+        replica_ttl: float = 5,
+        max_promoted: int = 100,
+    ):
+        if mode not in ("local", "replicas"):
+            raise ValueError(f"Unknown Valkey hot-key mitigation mode: {mode}")
+        self.tracker = tracker
+        self.mode = mode
+        self.threshold = threshold
+        self.cool_down = cool_down
+        self.local_ttl = local_ttl
+        self.replicas = replicas
+        self.replica_ttl_ms = int(replica_ttl * 1000)
+        self.max_promoted = max_promoted
+        # key -> last time its sampled rate was above the threshold
+        self._promoted: dict[Any, float] = {}
+        # local mode: key -> (raw value, expires at)
+        self._copies: dict[Any, tuple[Any, float]] = {}
+        self._generations: dict[Any, int] = {}
+
+    @property
+    def promoted(self) -> list:
+        return list(self._promoted)
+
+    def record(self, key: Any) -> None:
+        """Count one read of key, promoting it when its rate crosses the threshold."""
+        rate = self.tracker.record("get", key)
+        if rate is not None:
+            self.observe(key, rate)
+
+    def observe(self, key: Any, rate: float) -> None:
+        if rate < self.threshold:
+            return
+        if key not in self._promoted and len(self._promoted) >= self.max_promoted:
+            return
+        self._promoted[key] = time.monotonic()
+
+    def is_promoted(self, key: Any) -> bool:
+        last_hot = self._promoted.get(key)
+        if last_hot is None:
+            return False
+        if time.monotonic() - last_hot > self.cool_down:
+            self._demote(key)
+            return False
+        return True
+
+    def _demote(self, key: Any) -> None:
+        self._promoted.pop(key, None)
+        self._copies.pop(key, None)
+        self._generations.pop(key, None)
+
+    def is_replica_key(self, key: Any) -> bool:
+        suffix = self.REPLICA_SUFFIX
+        return (suffix.encode() if isinstance(key, bytes) else suffix) in key
+
+    def replica_keys(self, key: Any) -> list:
+        suffix = self.REPLICA_SUFFIX
+        if isinstance(key, bytes):
+            return [key + f"{suffix}{i}".encode() for i in range(self.replicas)]
+        return [f"{key}{suffix}{i}" for i in range(self.replicas)]
+
+    async def read(self, key: Any, get, set, delete=None) -> Any:
+        """
+        Read a promoted key's raw value.
+
+        Args:
+            get: async get(key) -> raw value or None
+            set: async set(key, value, px=milliseconds)
+            delete: async delete(key), to drop a replica refreshed with a value
+                that a concurrent write through this client made stale
+        """
+        if self.mode == "local":
+            entry = self._copies.get(key)
+            now = time.monotonic()
+            if entry is not None and entry[1] > now:
+                return entry[0]
+            generation = self._generations.get(key, 0)
+            value = await get(key)
+            # Skip storing if a write through this client raced the read
+            if value is not None and self._generations.get(key, 0) == generation and key in self._promoted:
+                self._copies[key] = (value, now + self.local_ttl)
+            return value
+
+        replica = random.choice(self.replica_keys(key))
+        value = await get(replica)
+        if value is None:
+            generation = self._generations.get(key, 0)
+            value = await get(key)
+            # Skip the refresh if a write through this client raced the read
+            if value is None or self._generations.get(key, 0) != generation:
+                return value
+            await set(replica, value, px=self.replica_ttl_ms)
+            if self._generations.get(key, 0) != generation and delete is not None:
+                # The writer may have deleted the replicas before our SET landed
+                await delete(replica)
+        return value
+
+    def invalidate(self, keys) -> list:
+        """
+        Forget copies of written keys. Returns the replica keys the caller must
+        delete once its write has completed: in replicas mode that is every
+        written key's replicas, as the key may be promoted in another process.
+        """
+        replicas_mode = self.mode == "replicas"
+        if not self._promoted and not replicas_mode:
+            return []
+        stale = []
+        for key in keys:
+            if key in self._promoted:
+                self._copies.pop(key, None)
+                self._generations[key] = self._generations.get(key, 0) + 1
+            if replicas_mode and not self.is_replica_key(key):
+                stale.extend(self.replica_keys(key))
+        return stale
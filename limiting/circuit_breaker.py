@@ -0,0 +1,249 @@
+"""
+Circuit breakers for ValkeyClient commands, one per node and read/write class.
+
+During a brownout every command would otherwise wait out socket timeouts and
+VALKEY_RETRY_ATTEMPTS retries before failing, and callers pile up behind it.
+A breaker counts node failures (connection errors, timeouts, LOADING, CLUSTERDOWN,
+MASTERDOWN, TRYAGAIN) over a rolling window:
+
+- closed: commands run; once `failure_threshold` failures make up at least
+  `failure_rate` of the window's calls, the circuit opens
+- open: commands fail fast with CircuitOpenError (HTTP 503), or are answered
+  by the fallback registered for their class, for `reset_timeout` seconds
+- half_open: up to `half_open_max_calls` trial commands are let through; a
+  success closes the circuit, a failure opens it again
+
+Replies that are errors of the command itself (WRONGTYPE, NOSCRIPT, WatchError)
+prove the node is up and count as successes. A command cancelled by its
+deadline, or refused client-side (MaxConnectionsError from the pool or the
+adaptive concurrency limiter), counts as neither.
+
+    client.circuit_breakers.set_fallback("read", lambda command, args: None)
+"""
+
+import inspect
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from valkey.exceptions import (
+    BusyLoadingError,
+    ClusterDownError,
+    ConnectionError,
+    MasterDownError,
+    MaxConnectionsError,
+    TimeoutError,
+    TryAgainError,
+)
+
+from ..exceptions.exceptions import CircuitOpenError
+from ..metrics import get_circuit_rejections, get_circuit_state
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+# Errors that say the node is unhealthy rather than the command being wrong
+FAILURE_ERRORS = (
+    ConnectionError,
+    TimeoutError,
+    BusyLoadingError,
+    ClusterDownError,
+    MasterDownError,
+    TryAgainError,
+)
+
+
+class CircuitBreaker:
+    """
+    Closed/open/half-open breaker for one node and command class.
+
+    Args:
+        node: Node name (cluster node, shard, or "primary")
+        kind: "read" or "write"
+        failure_threshold: Failures in the window before the circuit may open
+        failure_rate: Share of the window's calls that must have failed
+        window: Length (seconds) of the rolling failure window
+        reset_timeout: Seconds the circuit stays open before trial calls
+        half_open_max_calls: Concurrent trial calls while half-open
+        export: Export state and rejections to Prometheus
+    """
+
+    def __init__(
+        self,
+        node: str,
+        kind: str,
+        failure_threshold: int = 5,
+        failure_rate: float = 0.5,
+        window: float = 10.0,
+        reset_timeout: float = 5.0,
+        half_open_max_calls: int = 1,
+        export: bool = True,
+    ):
+        self.node = node
+        self.kind = kind
+        self.failure_threshold = failure_threshold
+        self.failure_rate = failure_rate
+        self.window = window
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.export = export
+        self.state = CLOSED
+        self._calls = 0
+        self._failures = 0
+        self._window_start = time.monotonic()
+        self._opened_at = 0.0
+        self._trials = 0
+        self.rejected = 0
+        if export:
+            get_circuit_state().labels(node, kind).set(0)
+
+    @property
+    def retry_after(self) -> float:
+        """Seconds until an open circuit lets trial calls through."""
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self.reset_timeout - time.monotonic())
+
+    def _transition(self, state: str) -> None:
+        self.state = state
+        self._trials = 0
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+        elif state == CLOSED:
+            self._calls = self._failures = 0
+            self._window_start = time.monotonic()
+        if self.export:
+            get_circuit_state().labels(self.node, self.kind).set(_STATE_VALUES[state])
+
+    def allow(self) -> bool:
+        """Whether a command may be sent now (reserves a trial slot when half-open)."""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN:
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            self._transition(HALF_OPEN)
+        if self._trials >= self.half_open_max_calls:
+            return False
+        self._trials += 1
+        return True
+
+    def _count(self, failed: bool) -> None:
+        now = time.monotonic()
+        if now - self._window_start >= self.window:
+            self._calls = self._failures = 0
+            self._window_start = now
+        self._calls += 1
+        if failed:
+            self._failures += 1
+
+    def record_success(self) -> None:
+        if self.state == HALF_OPEN:
+            self._transition(CLOSED)
+        elif self.state == CLOSED:
+            self._count(False)
+
+    def record_failure(self) -> None:
+        if self.state == HALF_OPEN:
+            self._transition(OPEN)
+        elif self.state == CLOSED:
+            self._count(True)
+            if (
+                self._failures >= self.failure_threshold
+                and self._failures >= self.failure_rate * self._calls
+            ):
+                self._transition(OPEN)
+
+    def release(self) -> None:
+        """Give back a trial slot whose call ended without a verdict (cancelled)."""
+        if self.state == HALF_OPEN and self._trials > 0:
+            self._trials -= 1
+
+    async def call(
+        self,
+        action: Callable[[], Awaitable[Any]],
+        fallback: Callable[[], Awaitable[Any]] | None = None,
+    ) -> Any:
+        """Await action() through the breaker; fallback() or CircuitOpenError when open."""
+        if not self.allow():
+            self.rejected += 1
+            if self.export:
+                get_circuit_rejections().labels(self.node, self.kind).inc()
+            if fallback is not None:
+                return await fallback()
+            raise CircuitOpenError(self.node, self.kind, self.retry_after)
+        try:
+            result = await action()
+        except MaxConnectionsError:
+            # Refused by this client, not by the node
+            self.release()
+            raise
+        except FAILURE_ERRORS:
+            self.record_failure()
+            raise
+        except Exception:
+            self.record_success()
+            raise
+        except BaseException:
+            self.release()
+            raise
+        self.record_success()
+        return result
+
+
+class CircuitBreakerRegistry:
+    """
+    Breakers by (node, kind), created on first use with the same settings,
+    plus optional per-kind fallbacks: fallback(command, args), sync or async,
+    whose result is returned instead of raising CircuitOpenError.
+    """
+
+    def __init__(self, **settings):
+        self._settings = settings
+        self._breakers: dict[tuple[str, str], CircuitBreaker] = {}
+        self._fallbacks: dict[str, Callable[[str, tuple], Any]] = {}
+
+    def get(self, node: str, kind: str) -> CircuitBreaker:
+        breaker = self._breakers.get((node, kind))
+        if breaker is None:
+            breaker = self._breakers[(node, kind)] = CircuitBreaker(node, kind, **self._settings)
+        return breaker
+
+    def set_fallback(self, kind: str, fallback: Callable[[str, tuple], Any] | None) -> None:
+        """Answer `kind` ("read"/"write") commands with fallback while open; None removes it."""
+        if kind not in ("read", "write"):
+            raise ValueError("kind must be 'read' or 'write'")
+        if fallback is None:
+            self._fallbacks.pop(kind, None)
+        else:
+            self._fallbacks[kind] = fallback
+
+    async def call(
+        self,
+        node: str,
+        kind: str,
+        command: str,
+        args: tuple,
+        action: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        fallback = self._fallbacks.get(kind)
+        if fallback is None:
+            return await self.get(node, kind).call(action)
+
+        async def _fallback():
+            value = fallback(command, args)
+            if inspect.isawaitable(value):
+                value = await value
+            return value
+
+        return await self.get(node, kind).call(action, _fallback)
+
+    def states(self) -> dict[str, str]:
+        """{"node/kind": state} for every breaker created so far."""
+        return {f"{node}/{kind}": breaker.state for (node, kind), breaker in self._breakers.items()}
+
+    def reset(self) -> None:
+        self._breakers.clear()
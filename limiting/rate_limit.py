@@ -22,6 +22,7 @@ async def get_auth_service():
     return await get_mock_auth_service()
 
 from app.core.valkey_core.client import client as valkey_client
+from app.core.valkey_core.scripts import register_script
 
 logger = logging.getLogger(__name__)
 
@@ -42,6 +43,7 @@ for _, key in ipairs(keys) do
 end
 return #keys
 """
+CLEANUP = register_script("rate_meta_cleanup", CLEANUP_SCRIPT)
 
 
 async def check_rate_limit(client, key: str, limit: int, window: int) -> bool:
@@ -174,16 +176,12 @@ async def increment_rate_limit(identifier: str, endpoint: str, window: int = 60)
     key = f"rate_limit:{endpoint}:{identifier}"
     redis = await client.aconn()
 
-    # Get or initialize counter
-    current = await redis.get(key)
-    if current is None:
-        await redis.set(key, 1, ex=window)
-        return 1
-
-    # Increment and return
-    count = int(current) + 1
-    await redis.set(key, count, ex=window)
-    return count
+    # INCR is atomic, so concurrent requests get distinct counts without WATCH retries
+    pipe = redis.pipeline(transaction=False)
+    pipe.incr(key)
+    pipe.expire(key, window)
+    count, _ = await pipe.execute()
+    return int(count)
 
 
 async def get_remaining_limit(
@@ -335,6 +333,5 @@ async def service_rate_limit(
 
 
 async def init_cleanup():
-    redis = await client.aconn()
-    await redis.eval(CLEANUP_SCRIPT, 0)
+    await client.run_script(CLEANUP, all_nodes=True)
     # asyncio.create_task(run_weekly(init_cleanup))  # This line is commented out because run_weekly is not defined in the provided code
@@ -0,0 +1,194 @@
+"""
+Prometheus metrics owned by valkey_core.
+
+Follows the lazy getter pattern of app.core.prometheus.metrics: collectors are
+created on first use and reused afterwards, so importing this module (or
+creating many clients in tests) never registers a timeseries twice.
+"""
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from .config import ValkeyConfig
+
+_collectors: dict = {}
+
+
+def _metric(cls, name: str, documentation: str, labelnames: tuple[str, ...], **kwargs):
+    collector = _collectors.get(name)
+    if collector is None:
+        collector = cls(
+            name,
+            documentation,
+            labelnames,
+            namespace=ValkeyConfig.VALKEY_METRICS_NAMESPACE,
+            **kwargs,
+        )
+        _collectors[name] = collector
+    return collector
+
+
+def get_compression_bytes() -> Counter:
+    """Bytes before/after compression, by direction (write/read) and form (uncompressed/compressed)."""
+    return _metric(
+        Counter,
+        "compression_bytes",
+        "Valkey value bytes before and after transparent compression",
+        ("cache_type", "direction", "form"),
+    )
+
+
+def record_compression(cache_type: str, direction: str, uncompressed: int, compressed: int) -> None:
+    counter = get_compression_bytes()
+    counter.labels(cache_type, direction, "uncompressed").inc(uncompressed)
+    counter.labels(cache_type, direction, "compressed").inc(compressed)
+
+
+def get_rebalance_keys() -> Counter:
+    """Keys handled by the shard rebalancer, by status (moved/skipped/failed)."""
+    return _metric(
+        Counter,
+        "rebalance_keys",
+        "Keys handled by the Valkey shard rebalancer",
+        ("status",),
+    )
+
+
+def get_rebalance_throughput() -> Gauge:
+    return _metric(
+        Gauge,
+        "rebalance_keys_per_second",
+        "Current Valkey shard rebalancer throughput",
+        (),
+    )
+
+
+def get_hot_key_ops() -> Gauge:
+    """Estimated operations per window for the current hot keys (top entries only)."""
+    return _metric(
+        Gauge,
+        "hot_key_ops",
+        "Estimated operations per window on the hottest Valkey keys",
+        ("namespace", "command", "key"),
+    )
+
+
+def get_transaction_attempts() -> Counter:
+    """Optimistic transaction attempts, by namespace and outcome (committed/conflict/exhausted)."""
+    return _metric(
+        Counter,
+        "transaction_attempts",
+        "Valkey WATCH/MULTI/EXEC transaction attempts",
+        ("namespace", "outcome"),
+    )
+
+
+def get_hedged_reads() -> Counter:
+    """Hedged reads, by outcome (fired/won/skipped when out of budget)."""
+    return _metric(
+        Counter,
+        "hedged_reads",
+        "Valkey reads duplicated after the hedge delay",
+        ("outcome",),
+    )
+
+
+def get_circuit_state() -> Gauge:
+    """Circuit breaker state per node and read/write class: 0 closed, 1 half-open, 2 open."""
+    return _metric(
+        Gauge,
+        "circuit_state",
+        "Valkey circuit breaker state (0 closed, 1 half-open, 2 open)",
+        ("node", "kind"),
+    )
+
+
+def get_circuit_rejections() -> Counter:
+    """Commands failed fast (or served by a fallback) while a circuit was open."""
+    return _metric(
+        Counter,
+        "circuit_rejections",
+        "Valkey commands rejected by an open circuit breaker",
+        ("node", "kind"),
+    )
+
+
+def get_concurrency_limit() -> Gauge:
+    """Current adaptive in-flight command limit."""
+    return _metric(
+        Gauge,
+        "concurrency_limit",
+        "Valkey adaptive in-flight command limit",
+        (),
+    )
+
+
+def get_concurrency_shed() -> Counter:
+    """Commands shed by the adaptive limiter, by reason (queue_full/timeout)."""
+    return _metric(
+        Counter,
+        "concurrency_shed",
+        "Valkey commands shed by the adaptive concurrency limiter",
+        ("reason",),
+    )
+
+
+def get_warm_up_seconds() -> Gauge:
+    """Duration of the last ValkeyClient.warm_up(), by stage."""
+    return _metric(
+        Gauge,
+        "warm_up_seconds",
+        "Valkey client warm-up duration per stage",
+        ("stage",),
+    )
+
+
+def get_pool_connections() -> Gauge:
+    """Pool connections per node, by state (in_use/idle)."""
+    return _metric(
+        Gauge,
+        "pool_connections",
+        "Valkey pool connections by state",
+        ("node", "state"),
+    )
+
+
+def get_pool_checkout_seconds() -> Histogram:
+    """Time to get a connection from a node's pool, including connecting a new one."""
+    return _metric(
+        Histogram,
+        "pool_checkout_seconds",
+        "Valkey connection checkout wait",
+        ("node",),
+        buckets=(0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0),
+    )
+
+
+def get_pool_connections_created() -> Counter:
+    """Connections opened per node."""
+    return _metric(
+        Counter,
+        "pool_connections_created",
+        "Valkey connections opened",
+        ("node",),
+    )
+
+
+def get_pool_connection_lifetime() -> Histogram:
+    """Seconds between connecting and disconnecting a connection."""
+    return _metric(
+        Histogram,
+        "pool_connection_lifetime_seconds",
+        "Valkey connection lifetime",
+        ("node",),
+        buckets=(1, 10, 60, 300, 900, 3600, 4 * 3600, 24 * 3600),
+    )
+
+
+def get_pool_errors() -> Counter:
+    """Pool errors per node, by kind (connect/io/exhausted)."""
+    return _metric(
+        Counter,
+        "pool_errors",
+        "Valkey connection pool errors",
+        ("node", "kind"),
+    )
@@ -0,0 +1,357 @@
+"""
+Connection pool instrumentation and sizing for ValkeyClient.
+
+MaxConnectionsError (HTTP 429) is the first sign of an undersized pool unless
+the pool is watched beforehand. instrument_client() swaps the pools (and, in
+cluster mode, the connection class of every node) of a freshly created client
+for instrumented ones that export, per node:
+
+- valkey_pool_connections{node, state}: connections in use / idle, sampled
+  every VAPI_POOL_METRICS_INTERVAL seconds
+- valkey_pool_checkout_seconds{node}: time to get a connection from the pool,
+  including connecting a new one
+- valkey_pool_connections_created_total{node} and
+  valkey_pool_connection_lifetime_seconds{node}: connection churn
+- valkey_pool_errors_total{node, kind}: connect failures, I/O errors on open
+  connections, and checkouts refused because the pool was exhausted
+
+Cluster nodes hand out connections without waiting, so their checkout time is
+the connect time of new connections.
+
+PoolSizer uses the same bookkeeping (a PoolMonitor per client) to keep the
+connections open per node between VALKEY_POOL_SIZE and VALKEY_MAX_CONNECTIONS,
+the pools' hard cap: it opens connections ahead of sustained demand and closes
+the ones left idle during quiet periods.
+"""
+
+import asyncio
+import contextvars
+import math
+import time
+
+from valkey.asyncio.connection import ConnectionPool
+from valkey.exceptions import ConnectionError, TimeoutError
+
+from .metrics import (
+    get_pool_checkout_seconds,
+    get_pool_connection_lifetime,
+    get_pool_connections,
+    get_pool_connections_created,
+    get_pool_errors,
+)
+
+# Set while connections are opened ahead of demand (warm-up, sizing)
+_warming: contextvars.ContextVar[bool] = contextvars.ContextVar("valkey_pool_warming", default=False)
+
+
+def node_name(connection_kwargs: dict) -> str:
+    if connection_kwargs.get("path"):
+        return connection_kwargs["path"]
+    return f"{connection_kwargs.get('host', 'localhost')}:{connection_kwargs.get('port', 6379)}"
+
+
+class PoolMonitor:
+    """
+    Bookkeeping shared by the instrumented pools and connections of one client:
+    Prometheus export (when export is set), and per node the peak number of
+    connections checked out and the connections commands had to open
+    themselves, both since the last take().
+    """
+
+    def __init__(self, export: bool = True):
+        self.export = export
+        self._peak_in_use: dict[str, int] = {}
+        self._on_demand: dict[str, int] = {}
+
+    def checked_out(self, node: str, in_use: int) -> None:
+        if in_use > self._peak_in_use.get(node, 0):
+            self._peak_in_use[node] = in_use
+
+    def connected(self, node: str) -> None:
+        if not _warming.get():
+            self._on_demand[node] = self._on_demand.get(node, 0) + 1
+        if self.export:
+            get_pool_connections_created().labels(node).inc()
+
+    def disconnected(self, node: str, lifetime: float) -> None:
+        if self.export:
+            get_pool_connection_lifetime().labels(node).observe(lifetime)
+
+    def error(self, node: str, kind: str) -> None:
+        if self.export:
+            get_pool_errors().labels(node, kind).inc()
+
+    def take(self, node: str) -> tuple[int, int]:
+        """(peak in use, connections opened on demand) since the last call, then reset."""
+        return self._peak_in_use.pop(node, 0), self._on_demand.pop(node, 0)
+
+
+class InstrumentedConnectionMixin:
+    """Reports connects, connection lifetimes and I/O errors of one connection to its PoolMonitor."""
+
+    _connected_at: float | None = None
+    # Last connect or reply (monotonic), for idle reaping
+    active_at: float = 0.0
+
+    def __init__(self, *args, monitor: PoolMonitor | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._monitor = monitor or PoolMonitor()
+
+    @property
+    def node(self) -> str:
+        return getattr(self, "path", "") or f"{self.host}:{self.port}"
+
+    async def connect(self):
+        if self.is_connected:
+            return
+        try:
+            await super().connect()
+        except (ConnectionError, TimeoutError, OSError):
+            self._monitor.error(self.node, "connect")
+            raise
+        self._connected_at = self.active_at = time.monotonic()
+        self._monitor.connected(self.node)
+
+    async def disconnect(self, nowait: bool = False) -> None:
+        if self._connected_at is not None:
+            self._monitor.disconnected(self.node, time.monotonic() - self._connected_at)
+            self._connected_at = None
+        await super().disconnect(nowait)
+
+    async def read_response(self, *args, **kwargs):
+        try:
+            response = await super().read_response(*args, **kwargs)
+        except (ConnectionError, TimeoutError):
+            self._monitor.error(self.node, "io")
+            raise
+        self.active_at = time.monotonic()
+        return response
+
+
+_connection_classes: dict[type, type] = {}
+
+
+def instrumented_connection_class(base: type) -> type:
+    """base (Connection, SSLConnection, ...) with InstrumentedConnectionMixin."""
+    if issubclass(base, InstrumentedConnectionMixin):
+        return base
+    cls = _connection_classes.get(base)
+    if cls is None:
+        cls = _connection_classes[base] = type(
+            f"Instrumented{base.__name__}", (InstrumentedConnectionMixin, base), {}
+        )
+    return cls
+
+
+class InstrumentedConnectionPool(ConnectionPool):
+    """ConnectionPool that times checkouts and tracks peak usage and exhaustion per node."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.node = node_name(self.connection_kwargs)
+        self._monitor: PoolMonitor = self.connection_kwargs.setdefault("monitor", PoolMonitor())
+        self._checkout = (
+            get_pool_checkout_seconds().labels(self.node) if self._monitor.export else None
+        )
+
+    async def get_connection(self, command_name, *keys, **options):
+        started = time.perf_counter()
+        try:
+            connection = await super().get_connection(command_name, *keys, **options)
+        except ConnectionError as e:
+            if str(e) == "Too many connections":
+                self._monitor.error(self.node, "exhausted")
+            raise
+        if self._checkout is not None:
+            self._checkout.observe(time.perf_counter() - started)
+        self._monitor.checked_out(self.node, len(self._in_use_connections))
+        return connection
+
+    @classmethod
+    def replacing(
+        cls, pool: ConnectionPool, monitor: PoolMonitor | None = None
+    ) -> "InstrumentedConnectionPool":
+        """An empty instrumented pool with the settings of pool."""
+        return cls(
+            connection_class=instrumented_connection_class(pool.connection_class),
+            max_connections=pool.max_connections,
+            **{**pool.connection_kwargs, "monitor": monitor or PoolMonitor()},
+        )
+
+
+def instrument_client(client, monitor: PoolMonitor | None = None) -> None:
+    """Instrument the pools of a new, unused Valkey, ShardedValkey or ValkeyCluster."""
+    monitor = monitor or PoolMonitor()
+    nodes_manager = getattr(client, "nodes_manager", None)
+    if nodes_manager is not None:
+        # Nodes discovered later are created with these kwargs
+        kwargs = nodes_manager.connection_kwargs
+        kwargs["connection_class"] = instrumented_connection_class(kwargs["connection_class"])
+        kwargs["monitor"] = monitor
+        for node in nodes_manager.startup_nodes.values():
+            node.connection_class = kwargs["connection_class"]
+            node.connection_kwargs["monitor"] = monitor
+        return
+    for valkey in _standalone_clients(client):
+        valkey.connection_pool = InstrumentedConnectionPool.replacing(valkey.connection_pool, monitor)
+
+
+def _standalone_clients(client) -> list:
+    shards = getattr(client, "shards", None)
+    return list(shards.values()) if shards is not None else [client]
+
+
+def _idle_connections(pool) -> list:
+    # ClusterNode keeps idle connections in _free, ConnectionPool in _available_connections
+    return list(pool._free) if hasattr(pool, "_free") else list(pool._available_connections)
+
+
+def pool_node(pool) -> str:
+    """Node name of a ConnectionPool or ClusterNode, as used in metric labels."""
+    return pool.name if hasattr(pool, "_free") else node_name(pool.connection_kwargs)
+
+
+def counts(pool) -> dict[str, int]:
+    """{"in_use", "idle", "max"} of a ConnectionPool or ClusterNode."""
+    idle = len(_idle_connections(pool))
+    if hasattr(pool, "_free"):
+        in_use = len(pool._connections) - idle
+    else:
+        in_use = len(pool._in_use_connections)
+    return {"in_use": in_use, "idle": idle, "max": pool.max_connections}
+
+
+def pool_stats(client) -> dict[str, dict]:
+    """{node: {"in_use", "idle", "max"}} for every pool of a Valkey, ShardedValkey or ValkeyCluster."""
+    nodes_manager = getattr(client, "nodes_manager", None)
+    if nodes_manager is not None:
+        return {node.name: counts(node) for node in nodes_manager.nodes_cache.values()}
+    return {
+        node_name(valkey.connection_pool.connection_kwargs): counts(valkey.connection_pool)
+        for valkey in _standalone_clients(client)
+    }
+
+
+def export_pool_stats(stats: dict[str, dict]) -> None:
+    gauge = get_pool_connections()
+    for node, node_counts in stats.items():
+        gauge.labels(node, "in_use").set(node_counts["in_use"])
+        gauge.labels(node, "idle").set(node_counts["idle"])
+
+
+async def open_connections(pool, count: int) -> int:
+    """
+    Connect (and authenticate) up to count connections of a ConnectionPool or
+    ClusterNode, then return them to the pool idle. Idle connections are taken
+    first; stops early when the pool is full. Returns the connections taken.
+    """
+    cluster_node = hasattr(pool, "acquire_connection")
+    acquire = pool.acquire_connection if cluster_node else pool.get_available_connection
+    connections = []
+    try:
+        for _ in range(count):
+            connections.append(acquire())
+    except ConnectionError:
+        # Pool full
+        pass
+    token = _warming.set(True)
+    try:
+        await asyncio.gather(*(connection.connect() for connection in connections))
+    finally:
+        _warming.reset(token)
+        if cluster_node:
+            # ClusterNode has no release(); its own commands return connections this way
+            pool._free.extend(connections)
+        else:
+            for connection in connections:
+                await pool.release(connection)
+    return len(connections)
+
+
+async def close_idle(pool, count: int, idle_for: float) -> int:
+    """Close up to count connections that have sat idle in the pool for idle_for seconds."""
+    now = time.monotonic()
+    stale = [
+        connection
+        for connection in _idle_connections(pool)
+        if now - getattr(connection, "active_at", now) >= idle_for
+    ][:count]
+    for connection in stale:
+        if hasattr(pool, "_free"):
+            pool._free.remove(connection)
+            pool._connections.remove(connection)
+        else:
+            pool._available_connections.remove(connection)
+    await asyncio.gather(*(connection.disconnect() for connection in stale), return_exceptions=True)
+    return len(stale)
+
+
+class PoolSizer:
+    """
+    Keeps the open connections of each node between floor and ceiling.
+
+    Every tick, a node's demand is the peak number of connections in use since
+    the previous tick, smoothed so that only sustained load moves it. The
+    target is demand * headroom plus the connections commands had to open
+    themselves since the previous tick (checkouts that paid for a connect),
+    bounded by floor and ceiling. Missing connections are opened ahead of the
+    next burst; idle connections above the target are closed once idle for
+    idle_timeout.
+
+    Peak usage is tracked on checkout for standalone and sharded pools; cluster
+    nodes are sampled at each tick. Cluster nodes also rotate through their
+    idle connections, so they only shrink once traffic is really quiet.
+
+    Args:
+        monitor: PoolMonitor of the instrumented pools
+        floor: Connections kept open per node (VALKEY_POOL_SIZE)
+        ceiling: Connections opened at most per node (VALKEY_MAX_CONNECTIONS)
+        idle_timeout: Seconds a surplus connection may stay idle
+        headroom: Spare capacity kept over smoothed demand
+        smoothing: Weight of the latest tick in the smoothed demand
+    """
+
+    def __init__(
+        self,
+        monitor: PoolMonitor,
+        floor: int = 20,
+        ceiling: int = 100,
+        idle_timeout: float = 60.0,
+        headroom: float = 1.25,
+        smoothing: float = 0.3,
+    ):
+        self.monitor = monitor
+        self.floor = min(floor, ceiling)
+        self.ceiling = ceiling
+        self.idle_timeout = idle_timeout
+        self.headroom = headroom
+        self.smoothing = smoothing
+        self.demand: dict[str, float] = {}
+        self.targets: dict[str, int] = {}
+
+    def target(self, node: str, in_use: int) -> int:
+        peak, on_demand = self.monitor.take(node)
+        peak = max(peak, in_use)
+        demand = self.demand.get(node)
+        demand = peak if demand is None else demand + (peak - demand) * self.smoothing
+        self.demand[node] = demand
+        target = min(self.ceiling, max(self.floor, math.ceil(demand * self.headroom) + on_demand))
+        self.targets[node] = target
+        return target
+
+    async def resize(self, pool) -> int:
+        """Move one pool towards its target; returns connections opened (> 0) or closed (< 0)."""
+        current = counts(pool)
+        target = self.target(pool_node(pool), current["in_use"])
+        open_now = current["in_use"] + current["idle"]
+        if open_now < target:
+            taken = await open_connections(pool, target - current["in_use"])
+            return taken - current["idle"]
+        if open_now > target:
+            return -await close_idle(pool, open_now - target, self.idle_timeout)
+        return 0
+
+    async def tick(self, pools: list) -> dict[str, int]:
+        """Resize every ConnectionPool or ClusterNode in pools; returns the changes per node."""
+        changes = await asyncio.gather(*(self.resize(pool) for pool in pools))
+        return dict(zip(map(pool_node, pools), changes))
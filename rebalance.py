@@ -0,0 +1,263 @@
+"""
+Online shard rebalancing for client-side sharding (see sharding.py).
+
+When VALKEY_SHARD_NODES changes, the keys whose owner changed between the old
+and the new ring are copied to their new shard so the cache stays warm:
+
+1. every old shard is SCANned (streaming, batch by batch)
+2. keys that the new ring places elsewhere are DUMPed together with their PTTL
+   in one pipeline on the source shard
+3. they are RESTOREd on the new owner in one pipeline, keeping the TTL
+4. optionally deleted from the source once restored
+
+RESTORE runs without REPLACE by default, so values already written through the
+new ring win over the migrated copy. Run clients with
+VALKEY_SHARD_PREVIOUS_NODES set to the old node list for the duration of the
+migration (dual-read), then clear it.
+
+Usage:
+    from app.core.valkey_core.rebalance import ShardRebalancer
+
+    progress = await ShardRebalancer(old_nodes, new_nodes, rate_limit=5000).run()
+
+CLI (old/new default to VALKEY_SHARD_PREVIOUS_NODES / VALKEY_SHARD_NODES):
+    python -m app.core.valkey_core.rebalance \\
+        --new '[{"host": "shard1", "port": 6379}, {"host": "shard3", "port": 6379}]' \\
+        --rate-limit 5000 --delete-source
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+from collections.abc import Callable, Iterable, Mapping
+from typing import Any
+
+from valkey.asyncio import Valkey
+from valkey.exceptions import ResponseError
+
+from .config import ValkeyConfig
+from .metrics import get_rebalance_keys, get_rebalance_throughput
+from .sharding import HashRing, shard_name
+
+logger = logging.getLogger(__name__)
+
+
+class MigrationProgress:
+    """Running totals of a rebalance."""
+
+    def __init__(self):
+        self.scanned = 0
+        self.moved = 0
+        self.skipped = 0
+        self.failed = 0
+        self.bytes = 0
+        self.started = time.monotonic()
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    @property
+    def keys_per_second(self) -> float:
+        return self.moved / self.elapsed if self.elapsed > 0 else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "scanned": self.scanned,
+            "moved": self.moved,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "bytes": self.bytes,
+            "elapsed": round(self.elapsed, 3),
+            "keys_per_second": round(self.keys_per_second, 1),
+        }
+
+
+class ShardRebalancer:
+    """
+    Copies keys whose owner changed between two rings to their new shard.
+
+    Args:
+        old_nodes: Shard node list the data currently lives on
+        new_nodes: Target shard node list
+        vnodes: Ring points per unit of weight (must match the clients)
+        match: Only migrate keys matching this pattern
+        batch_size: SCAN COUNT hint and max keys per DUMP/RESTORE pipeline
+        rate_limit: Max keys moved per second (None = unlimited)
+        replace: RESTORE ... REPLACE (overwrites values written via the new ring)
+        delete_source: Delete keys from the old shard once restored
+        dry_run: Only count the keys that would move (in the returned progress,
+            not the Prometheus counters)
+        on_progress: Called with MigrationProgress after every batch
+        **connection_kwargs: Passed to every shard client
+    """
+
+    def __init__(
+        self,
+        old_nodes: Iterable[Mapping[str, Any]],
+        new_nodes: Iterable[Mapping[str, Any]],
+        vnodes: int = ValkeyConfig.VALKEY_SHARD_VNODES,
+        match: str = "*",
+        batch_size: int = 500,
+        rate_limit: float | None = None,
+        replace: bool = False,
+        delete_source: bool = False,
+        dry_run: bool = False,
+        on_progress: Callable[[MigrationProgress], None] | None = None,
+        **connection_kwargs,
+    ):
+        old_nodes, new_nodes = list(old_nodes), list(new_nodes)
+        self.old_ring = HashRing({shard_name(n): n.get("weight", 1) for n in old_nodes}, vnodes)
+        self.new_ring = HashRing({shard_name(n): n.get("weight", 1) for n in new_nodes}, vnodes)
+        self._addresses = {shard_name(n): (n["host"], n["port"]) for n in (*old_nodes, *new_nodes)}
+        self._connection_kwargs = connection_kwargs
+        self._shards: dict[str, Valkey] = {}
+        self.match = match
+        self.batch_size = batch_size
+        self.rate_limit = rate_limit
+        self.replace = replace
+        self.delete_source = delete_source
+        self.dry_run = dry_run
+        self.on_progress = on_progress
+        self.progress = MigrationProgress()
+
+    def _shard(self, name: str) -> Valkey:
+        shard = self._shards.get(name)
+        if shard is None:
+            host, port = self._addresses[name]
+            shard = self._shards[name] = Valkey(host=host, port=port, **self._connection_kwargs)
+        return shard
+
+    async def run(self) -> MigrationProgress:
+        """Migrate every old shard (concurrently) and return the final totals."""
+        self.progress = MigrationProgress()
+        try:
+            await asyncio.gather(*(self._migrate_shard(name) for name in self.old_ring.nodes))
+        finally:
+            await asyncio.gather(*(shard.aclose() for shard in self._shards.values()))
+            self._shards = {}
+        logger.info(f"Valkey rebalance finished: {self.progress.as_dict()}")
+        return self.progress
+
+    async def _migrate_shard(self, source: str) -> None:
+        shard = self._shard(source)
+        cursor = 0
+        while True:
+            cursor, keys = await shard.scan(cursor=cursor, match=self.match, count=self.batch_size)
+            self.progress.scanned += len(keys)
+            moves: dict[str, list] = {}
+            for key in keys:
+                # The old ring check skips stray keys that never belonged here
+                if self.old_ring.get(key) != source:
+                    continue
+                target = self.new_ring.get(key)
+                if target != source:
+                    moves.setdefault(target, []).append(key)
+            for target, target_keys in moves.items():
+                for start in range(0, len(target_keys), self.batch_size):
+                    await self._move(source, target, target_keys[start:start + self.batch_size])
+            if cursor == 0:
+                return
+
+    async def _move(self, source: str, target: str, keys: list) -> None:
+        if self.dry_run:
+            # Reported through the returned progress only, not as migration traffic
+            self.progress.moved += len(keys)
+            return
+        pipe = self._shard(source).pipeline(transaction=False)
+        for key in keys:
+            pipe.dump(key)
+            pipe.pttl(key)
+        dumped = await pipe.execute()
+
+        restored, restore_keys = self._shard(target).pipeline(transaction=False), []
+        for key, payload, ttl in zip(keys, dumped[::2], dumped[1::2]):
+            if payload is None or ttl == -2:
+                # Expired or deleted since the scan
+                self._count("skipped")
+                continue
+            restored.restore(key, max(ttl, 0), payload, replace=self.replace)
+            restore_keys.append(key)
+            self.progress.bytes += len(payload)
+        results = await restored.execute(raise_on_error=False) if restore_keys else []
+
+        done, moved = [], 0
+        for key, result in zip(restore_keys, results):
+            if not isinstance(result, Exception):
+                moved += 1
+                done.append(key)
+            elif isinstance(result, ResponseError) and "BUSYKEY" in str(result):
+                # Already written through the new ring: the newer value wins
+                self._count("skipped")
+                done.append(key)
+            else:
+                logger.warning(f"Valkey rebalance failed to restore {key!r} on {target}: {result}")
+                self._count("failed")
+        if self.delete_source and done:
+            await self._shard(source).delete(*done)
+        self._count("moved", moved)
+        await self._throttle()
+        if self.on_progress:
+            self.on_progress(self.progress)
+
+    def _count(self, status: str, amount: int = 1) -> None:
+        setattr(self.progress, status, getattr(self.progress, status) + amount)
+        if ValkeyConfig.VALKEY_METRICS_ENABLED:
+            get_rebalance_keys().labels(status).inc(amount)
+
+    async def _throttle(self) -> None:
+        if ValkeyConfig.VALKEY_METRICS_ENABLED:
+            get_rebalance_throughput().set(self.progress.keys_per_second)
+        if self.rate_limit:
+            ahead = self.progress.moved / self.rate_limit - self.progress.elapsed
+            if ahead > 0:
+                await asyncio.sleep(ahead)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Migrate Valkey keys between shard rings")
+    parser.add_argument("--old", help="JSON node list (default: VAPI_SHARD_PREVIOUS_NODES)")
+    parser.add_argument("--new", help="JSON node list (default: VAPI_SHARD_NODES)")
+    parser.add_argument("--match", default="*")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--rate-limit", type=float, default=None, help="Max keys/second")
+    parser.add_argument("--replace", action="store_true")
+    parser.add_argument("--delete-source", action="store_true")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args(argv)
+
+    old_nodes = json.loads(args.old) if args.old else ValkeyConfig.VALKEY_SHARD_PREVIOUS_NODES
+    new_nodes = json.loads(args.new) if args.new else ValkeyConfig.VALKEY_SHARD_NODES
+    if not old_nodes:
+        parser.error("no old node list: pass --old or set VAPI_SHARD_PREVIOUS_NODES")
+
+    logging.basicConfig(level=logging.INFO)
+    last_report = [0.0]
+
+    def _report(progress: MigrationProgress) -> None:
+        if progress.elapsed - last_report[0] >= 5:
+            last_report[0] = progress.elapsed
+            logger.info(f"Valkey rebalance progress: {progress.as_dict()}")
+
+    rebalancer = ShardRebalancer(
+        old_nodes,
+        new_nodes,
+        match=args.match,
+        batch_size=args.batch_size,
+        rate_limit=args.rate_limit,
+        replace=args.replace,
+        delete_source=args.delete_source,
+        dry_run=args.dry_run,
+        on_progress=_report,
+        password=ValkeyConfig.VALKEY_PASSWORD,
+        db=ValkeyConfig.VALKEY_DB,
+        ssl=ValkeyConfig.VALKEY_SSL,
+    )
+    progress = asyncio.run(rebalancer.run())
+    print(json.dumps(progress.as_dict()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+Read-from-replica routing for ValkeyClient.
+
+Read-only commands can be served by replicas according to a policy:
+
+- "primary":         everything goes to primaries (default, no behaviour change)
+- "prefer-replica":  a healthy replica when one exists, else the primary
+- "round-robin":     rotate over the primary and its healthy replicas
+- "lowest-latency":  the node (primary or healthy replica) with the lowest
+                     observed latency (EWMA of command and probe round trips)
+
+A replica is eligible only while its replication link is up and it has heard
+from its primary within max_lag seconds (INFO replication, refreshed in the
+background). Writes never go through the router, and reads of keys this client
+wrote within the read-your-writes window, or inside read_from_primary(), stay
+on the primary.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import itertools
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Iterable
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+READ_POLICIES = ("primary", "prefer-replica", "round-robin", "lowest-latency")
+
+# Commands ValkeyClient may route to replicas
+READ_COMMANDS = frozenset({"get", "exists", "ttl", "llen"})
+
+_force_primary: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "valkey_force_primary", default=False
+)
+
+
+@contextlib.contextmanager
+def read_from_primary():
+    """
+    Pin every routed read in this context to primaries.
+
+    Usage:
+        with read_from_primary():
+            value = await client.get("order:42")
+    """
+    token = _force_primary.set(True)
+    try:
+        yield
+    finally:
+        _force_primary.reset(token)
+
+
+class NodeStats:
+    """Health and latency bookkeeping for one node."""
+
+    __slots__ = ("name", "latency", "healthy", "lag")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.latency: float | None = None
+        self.healthy = True
+        self.lag: float | None = None
+
+    def observe(self, seconds: float, alpha: float = 0.2) -> None:
+        if self.latency is None:
+            self.latency = seconds
+        else:
+            self.latency += alpha * (seconds - self.latency)
+
+
+class ReadRouter:
+    """
+    Picks the node for a read among a primary and its replicas.
+
+    Nodes are opaque handles (ClusterNode objects in cluster mode, Valkey
+    clients in standalone mode); the caller supplies a name for each.
+    """
+
+    def __init__(
+        self,
+        policy: str = "primary",
+        max_lag: float = 5.0,
+        read_your_writes: float = 1.0,
+        max_tracked_writes: int = 10000,
+    ):
+        if policy not in READ_POLICIES:
+            raise ValueError(f"Unknown Valkey read policy: {policy}")
+        self.policy = policy
+        self.max_lag = max_lag
+        self.read_your_writes = read_your_writes
+        self._max_tracked_writes = max_tracked_writes
+        self._recent_writes: OrderedDict[str, float] = OrderedDict()
+        self._stats: dict[str, NodeStats] = {}
+        self._rr = itertools.count()
+
+    @property
+    def enabled(self) -> bool:
+        return self.policy != "primary"
+
+    def stats(self, name: str) -> NodeStats:
+        stats = self._stats.get(name)
+        if stats is None:
+            stats = self._stats[name] = NodeStats(name)
+        return stats
+
+    def record_write(self, keys: Iterable[str]) -> None:
+        """Remember written keys so reads of them stay on the primary for a while."""
+        if not self.read_your_writes:
+            return
+        until = time.monotonic() + self.read_your_writes
+        for key in keys:
+            self._recent_writes[key] = until
+            self._recent_writes.move_to_end(key)
+        while len(self._recent_writes) > self._max_tracked_writes:
+            self._recent_writes.popitem(last=False)
+
+    def _recently_written(self, key: str) -> bool:
+        until = self._recent_writes.get(key)
+        if until is None:
+            return False
+        if until < time.monotonic():
+            del self._recent_writes[key]
+            return False
+        return True
+
+    def choose(self, key: str, primary: tuple[str, Any], replicas: list[tuple[str, Any]]):
+        """Return the (name, node) to read key from."""
+        if (
+            not self.enabled
+            or _force_primary.get()
+            or self._recently_written(key)
+        ):
+            return primary
+        healthy = [r for r in replicas if self.stats(r[0]).healthy]
+        if not healthy:
+            return primary
+        if self.policy == "prefer-replica":
+            return healthy[next(self._rr) % len(healthy)]
+        candidates = [primary, *healthy]
+        if self.policy == "round-robin":
+            return candidates[next(self._rr) % len(candidates)]
+        # lowest-latency: unmeasured nodes get probed first
+        return min(
+            candidates,
+            key=lambda c: -1.0 if self.stats(c[0]).latency is None else self.stats(c[0]).latency,
+        )
+
+    def alternative(
+        self,
+        key: str,
+        chosen: tuple[str, Any],
+        primary: tuple[str, Any],
+        replicas: list[tuple[str, Any]],
+    ):
+        """
+        Another (name, node) able to serve the read: the primary when chosen is a
+        replica, else the fastest healthy replica, else the primary again.
+        """
+        if chosen[0] != primary[0]:
+            return primary
+        if not self.enabled or _force_primary.get() or self._recently_written(key):
+            return primary
+        healthy = [r for r in replicas if self.stats(r[0]).healthy]
+        if not healthy:
+            return primary
+        return min(healthy, key=lambda r: self.stats(r[0]).latency or 0.0)
+
+    async def timed(self, name: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Run call, feeding its latency into the node's EWMA."""
+        start = time.perf_counter()
+        result = await call()
+        self.stats(name).observe(time.perf_counter() - start)
+        return result
+
+    def mark_failed(self, name: str) -> None:
+        self.stats(name).healthy = False
+
+    def update_replica(self, name: str, info: dict, probe_latency: float) -> None:
+        """Apply an INFO replication snapshot taken from a replica."""
+        stats = self.stats(name)
+        stats.observe(probe_latency)
+        link_up = info.get("master_link_status") == "up"
+        lag = info.get("master_last_io_seconds_ago")
+        stats.lag = float(lag) if lag is not None else None
+        stats.healthy = link_up and stats.lag is not None and stats.lag <= self.max_lag
+
+    async def refresh(self, replicas: list[tuple[str, Callable[[], Awaitable[dict]]]]) -> None:
+        """Probe every replica's INFO replication concurrently."""
+
+        async def _probe(name, fetch_info):
+            start = time.perf_counter()
+            try:
+                info = await fetch_info()
+            except Exception as e:
+                logger.warning(f"Valkey replica {name} health probe failed: {e}")
+                self.mark_failed(name)
+                return
+            self.update_replica(name, info, time.perf_counter() - start)
+
+        await asyncio.gather(*(_probe(name, fetch) for name, fetch in replicas))
@@ -0,0 +1,56 @@
+"""
+Lua script registry for EVALSHA.
+
+Modules declare their scripts once, at import time:
+
+    TOKEN_BUCKET = register_script("token_bucket", TOKEN_BUCKET_LUA)
+
+and run them through the client, which sends only the SHA1:
+
+    await client.run_script(TOKEN_BUCKET, keys=[key], args=[capacity, ...])
+
+ValkeyClient SCRIPT LOADs every registered script on its first connection
+(to every primary in cluster mode, every shard in sharded mode). Loading is
+remembered per process and deployment, so short-lived clients don't reload.
+If a node answers NOSCRIPT (restart, failover, SCRIPT FLUSH, a node added to
+the cluster), the client reloads the registry and retries, falling back to a
+plain EVAL, which also caches the script on that node.
+"""
+
+import hashlib
+
+SCRIPTS: dict[str, "Script"] = {}
+
+
+class Script:
+    """A registered Lua script and its SHA1 digest."""
+
+    __slots__ = ("name", "source", "sha", "loaded")
+
+    def __init__(self, name: str, source: str):
+        self.name = name
+        self.source = source
+        self.sha = hashlib.sha1(source.encode("utf-8")).hexdigest()
+        # Deployments (ValkeyClient script scopes) this process has loaded it into
+        self.loaded: set[str] = set()
+
+    def __repr__(self) -> str:
+        return f"Script({self.name!r}, sha={self.sha[:12]})"
+
+
+def register_script(name: str, source: str) -> Script:
+    """Register a script under a unique name (idempotent for the same source)."""
+    existing = SCRIPTS.get(name)
+    if existing is not None:
+        if existing.source != source:
+            raise ValueError(f"Valkey script '{name}' is already registered with a different source")
+        return existing
+    script = SCRIPTS[name] = Script(name, source)
+    return script
+
+
+def get_script(name: str) -> Script:
+    try:
+        return SCRIPTS[name]
+    except KeyError:
+        raise ValueError(f"Unknown Valkey script: {name}")
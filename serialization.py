@@ -0,0 +1,264 @@
+"""
+Pluggable value codecs for ValkeyClient.
+
+Every encoded value starts with a one-byte format marker, so reads dispatch
+straight to the right decoder instead of sniffing the payload:
+
+    0x01 json     (stdlib json, or orjson when installed; same wire format)
+    0x02 msgpack  (optional dependency)
+    0x03 pickle   (only decoded when a pickle codec is configured)
+    0x04 raw      (bytes passthrough, used automatically for bytes values)
+
+Values above a size threshold can additionally be compressed (zlib or lzma).
+Compressed values carry their own marker in front of the encoded value and are
+decompressed automatically on read, whether or not the reader compresses:
+
+    0x05 zlib
+    0x06 lzma
+
+Plain integers are stored unmarked (e.g. b"42") so INCR/DECR keep working on
+values written through ValkeyClient.set. Unmarked values (integers and data
+written before codecs existed) fall back to the legacy JSON sniffing decoder.
+"""
+
+import json
+import lzma
+import pickle
+import zlib
+from collections.abc import Callable, Mapping
+from typing import Any
+
+from valkey.exceptions import DataError
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # optional dependency
+    msgpack = None
+
+JSON_MARKER = b"\x01"
+MSGPACK_MARKER = b"\x02"
+PICKLE_MARKER = b"\x03"
+RAW_MARKER = b"\x04"
+ZLIB_MARKER = b"\x05"
+LZMA_MARKER = b"\x06"
+
+
+class Codec:
+    """A named value format with its one-byte marker."""
+
+    def __init__(
+        self,
+        name: str,
+        marker: bytes,
+        dumps: Callable[[Any], bytes],
+        loads: Callable[[bytes], Any],
+    ):
+        self.name = name
+        self.marker = marker
+        self.dumps = dumps
+        self.loads = loads
+
+    def encode(self, value: Any) -> bytes:
+        return self.marker + self.dumps(value)
+
+    def decode(self, payload: bytes) -> Any:
+        """Decode a payload with the marker already stripped."""
+        return self.loads(payload)
+
+
+def _json_dumps(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+
+def _raw_dumps(value: Any) -> bytes:
+    if not isinstance(value, (bytes, bytearray, memoryview)):
+        raise DataError(f"raw codec expects bytes, got {type(value).__name__}")
+    return bytes(value)
+
+
+CODECS: dict[str, Codec] = {
+    "json": Codec("json", JSON_MARKER, _json_dumps, json.loads),
+    "pickle": Codec(
+        "pickle",
+        PICKLE_MARKER,
+        lambda v: pickle.dumps(v, protocol=pickle.HIGHEST_PROTOCOL),
+        pickle.loads,
+    ),
+    "raw": Codec("raw", RAW_MARKER, _raw_dumps, bytes),
+}
+if orjson is not None:
+    CODECS["orjson"] = Codec("orjson", JSON_MARKER, orjson.dumps, orjson.loads)
+if msgpack is not None:
+    CODECS["msgpack"] = Codec(
+        "msgpack",
+        MSGPACK_MARKER,
+        lambda v: msgpack.packb(v, use_bin_type=True),
+        lambda b: msgpack.unpackb(b, raw=False),
+    )
+
+
+def register_codec(codec: Codec) -> None:
+    """Register a custom codec (its marker must not clash with another format)."""
+    for existing in CODECS.values():
+        if existing.marker == codec.marker and existing.name != codec.name:
+            if {existing.name, codec.name} != {"json", "orjson"}:
+                raise ValueError(
+                    f"Codec marker {codec.marker!r} already used by '{existing.name}'"
+                )
+    CODECS[codec.name] = codec
+
+
+def get_codec(name: str) -> Codec:
+    try:
+        return CODECS[name]
+    except KeyError:
+        if name in ("orjson", "msgpack"):
+            raise ImportError(f"Valkey codec '{name}' requires the '{name}' package")
+        raise ValueError(f"Unknown Valkey codec: {name}")
+
+
+_DECOMPRESSORS: dict[int, Callable[[bytes], bytes]] = {
+    ZLIB_MARKER[0]: zlib.decompress,
+    LZMA_MARKER[0]: lzma.decompress,
+}
+
+
+def is_compressed(data: bytes | str | None) -> bool:
+    return isinstance(data, bytes) and bool(data) and data[0] in _DECOMPRESSORS
+
+
+def decompress(data: bytes) -> bytes:
+    """
+    Strip a compression header if present, returning the original bytes.
+
+    Values that merely start with a marker byte (written before compression
+    existed, or raw bytes from other clients) are returned unchanged.
+    """
+    if is_compressed(data):
+        try:
+            return _DECOMPRESSORS[data[0]](data[1:])
+        except (zlib.error, lzma.LZMAError):
+            return data
+    return data
+
+
+class Compressor:
+    """
+    Threshold-based compression with a one-byte algorithm header.
+
+    Args:
+        algorithm: "zlib" or "lzma"
+        level: zlib level (0-9) or lzma preset (0-9); None uses the library default
+        threshold: Only payloads larger than this many bytes are compressed
+        on_bytes: Optional hook called as on_bytes(direction, uncompressed, compressed)
+            for every compressed write ("write") and decompressed read ("read")
+    """
+
+    def __init__(
+        self,
+        algorithm: str = "zlib",
+        level: int | None = None,
+        threshold: int = 4096,
+        on_bytes: Callable[[str, int, int], None] | None = None,
+    ):
+        if algorithm == "zlib":
+            self.marker = ZLIB_MARKER
+            lvl = -1 if level is None else level
+            self._compress = lambda data: zlib.compress(data, lvl)
+        elif algorithm == "lzma":
+            self.marker = LZMA_MARKER
+            self._compress = lambda data: lzma.compress(data, preset=level)
+        else:
+            raise ValueError(f"Unsupported Valkey compression algorithm: {algorithm}")
+        self.algorithm = algorithm
+        self.threshold = threshold
+        self._on_bytes = on_bytes
+
+    def compress(self, data: bytes) -> bytes:
+        if len(data) <= self.threshold:
+            return data
+        packed = self.marker + self._compress(data)
+        # Incompressible payloads (already compressed media, etc.) are stored as-is
+        if len(packed) >= len(data):
+            return data
+        if self._on_bytes:
+            self._on_bytes("write", len(data), len(packed))
+        return packed
+
+    def decompress(self, data: bytes) -> bytes:
+        if not is_compressed(data):
+            return data
+        raw = decompress(data)
+        if self._on_bytes and raw is not data:
+            self._on_bytes("read", len(raw), len(data))
+        return raw
+
+
+class ValueSerializer:
+    """
+    Encodes values for a client: default codec plus optional per-namespace
+    (key prefix) overrides, then optional compression. Decoding is
+    marker-driven and ignores the key.
+    """
+
+    def __init__(
+        self,
+        default: str = "json",
+        namespaces: Mapping[str, str] | None = None,
+        fallback: Callable[[Any], Any] | None = None,
+        compressor: Compressor | None = None,
+    ):
+        self.default = get_codec(default)
+        self.compressor = compressor
+        # Longest prefix wins
+        self._namespaces = sorted(
+            ((prefix, get_codec(name)) for prefix, name in (namespaces or {}).items()),
+            key=lambda item: len(item[0]),
+            reverse=True,
+        )
+        self._fallback = fallback
+        in_use = {self.default.name, *(codec.name for _, codec in self._namespaces)}
+        self._decoders: dict[int, Codec] = {}
+        for codec in CODECS.values():
+            if codec.name == "pickle" and "pickle" not in in_use:
+                # Never unpickle data this client wasn't configured to write
+                continue
+            self._decoders.setdefault(codec.marker[0], codec)
+        # Prefer the fastest JSON decoder when both are available
+        if "orjson" in CODECS:
+            self._decoders[JSON_MARKER[0]] = CODECS["orjson"]
+
+    def codec_for(self, key: str) -> Codec:
+        for prefix, codec in self._namespaces:
+            if key.startswith(prefix):
+                return codec
+        return self.default
+
+    def encode(self, key: str, value: Any) -> bytes:
+        if type(value) is int:
+            return str(value).encode("ascii")
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            data = RAW_MARKER + bytes(value)
+        else:
+            data = self.codec_for(key).encode(value)
+        if self.compressor is not None:
+            return self.compressor.compress(data)
+        return data
+
+    def decode(self, value: bytes | str | None) -> Any:
+        if value is None:
+            return None
+        if is_compressed(value):
+            value = self.compressor.decompress(value) if self.compressor else decompress(value)
+        if isinstance(value, bytes) and value:
+            codec = self._decoders.get(value[0])
+            if codec is not None:
+                return codec.decode(value[1:])
+            if value[0] == PICKLE_MARKER[0]:
+                raise DataError("Refusing to unpickle a value: pickle codec not configured")
+        return self._fallback(value) if self._fallback else value
@@ -0,0 +1,395 @@
+"""
+Client-side consistent-hash sharding over VALKEY_SHARD_NODES.
+
+Keys are mapped to shard nodes with a ketama-style hash ring: every node owns
+vnodes * weight points on a 32-bit ring (md5 of "<node name>-<i>"), and a key
+belongs to the first point at or after its own hash. Adding or removing a node
+only moves the keys of the ring segments it gains or loses (~1/N of the
+keyspace), never reshuffles the rest.
+
+Hash tags work as in Valkey Cluster: when a key contains "{...}" with a
+non-empty body, only the body is hashed, so "user:{42}:profile" and
+"user:{42}:orders" always land on the same shard.
+
+ShardedValkey keeps one connection pool per shard and behaves like a Valkey
+client for the commands ValkeyClient and the rate limiters use:
+
+- single-key commands (get/set/incr/hset/eval or fcall with keys/lock/...) go
+  to the key's shard
+- multi-key commands (delete/unlink/exists/touch/mget/mset) are split per
+  shard and run concurrently
+- keyless commands (ping/flushdb/dbsize/eval with 0 keys/...) run on every shard
+- pipeline() groups queued commands per shard and executes them concurrently;
+  transactions are only atomic within one shard (use hash tags)
+
+Pub/Sub is served by the first shard so publishers and subscribers meet.
+
+While keys are being migrated to a new ring (see rebalance.py), pass the old
+node list as previous_nodes: get/mget fall back to a key's previous owner on a
+miss, and deletes hit both owners so the old copy cannot be read back.
+"""
+
+import asyncio
+import bisect
+import hashlib
+from collections.abc import Iterable, Mapping
+from typing import Any
+
+from valkey.asyncio import Valkey
+
+# Keyless commands that run on every shard (results returned per shard name
+# unless a merge rule below applies)
+_FAN_OUT_COMMANDS = frozenset({
+    "ping", "flushdb", "flushall", "dbsize", "info", "script_load",
+    "script_flush", "script_exists", "function_load", "function_list",
+    "function_flush", "config_set", "config_get", "memory_stats",
+})
+
+
+def hash_tag(key: str | bytes) -> bytes:
+    """Return the part of key that is hashed (the "{tag}" body when present)."""
+    data = key.encode("utf-8") if isinstance(key, str) else bytes(key)
+    start = data.find(b"{")
+    if start != -1:
+        end = data.find(b"}", start + 1)
+        if end > start + 1:
+            return data[start + 1:end]
+    return data
+
+
+def _ring_hashes(label: str) -> list[int]:
+    """Four ring points per md5 digest, as in libketama."""
+    digest = hashlib.md5(label.encode("utf-8")).digest()
+    return [int.from_bytes(digest[i:i + 4], "little") for i in range(0, 16, 4)]
+
+
+class HashRing:
+    """
+    Ketama-style consistent-hash ring.
+
+    Args:
+        nodes: node name -> weight
+        vnodes: Ring points per unit of weight (rounded up to a multiple of 4)
+    """
+
+    def __init__(self, nodes: Mapping[str, int] | None = None, vnodes: int = 160):
+        self.vnodes = vnodes
+        self._weights: dict[str, int] = {}
+        self._points: list[int] = []
+        self._owners: list[str] = []
+        for name, weight in (nodes or {}).items():
+            self._weights[name] = weight
+        self._build()
+
+    @property
+    def nodes(self) -> list[str]:
+        return list(self._weights)
+
+    def add(self, name: str, weight: int = 1) -> None:
+        self._weights[name] = weight
+        self._build()
+
+    def remove(self, name: str) -> None:
+        del self._weights[name]
+        self._build()
+
+    def _build(self) -> None:
+        ring: dict[int, str] = {}
+        for name, weight in self._weights.items():
+            for i in range((self.vnodes * weight + 3) // 4):
+                for point in _ring_hashes(f"{name}-{i}"):
+                    # Ties resolve by name so every process builds the same ring
+                    if point not in ring or name < ring[point]:
+                        ring[point] = name
+        self._points = sorted(ring)
+        self._owners = [ring[point] for point in self._points]
+
+    def get(self, key: str | bytes) -> str:
+        """Return the node name that owns key."""
+        if not self._points:
+            raise LookupError("Hash ring has no nodes")
+        digest = hashlib.md5(hash_tag(key)).digest()
+        index = bisect.bisect_left(self._points, int.from_bytes(digest[:4], "little"))
+        return self._owners[index % len(self._points)]
+
+
+def shard_name(node: Mapping[str, Any]) -> str:
+    """Stable ring identity of a shard node: its "name", else "host:port"."""
+    return node.get("name") or f"{node['host']}:{node['port']}"
+
+
+class ShardedValkey:
+    """
+    Valkey-compatible facade over one pool per shard node.
+
+    Args:
+        nodes: Shard node dicts: {"host", "port"} plus optional "name" (ring
+            identity, defaults to host:port) and "weight" (default 1)
+        vnodes: Ring points per unit of weight
+        previous_nodes: The node list being migrated away from, enables
+            dual-read (see module docstring)
+        **connection_kwargs: Passed to every per-shard Valkey client
+    """
+
+    def __init__(
+        self,
+        nodes: Iterable[Mapping[str, Any]],
+        vnodes: int = 160,
+        previous_nodes: Iterable[Mapping[str, Any]] | None = None,
+        **connection_kwargs,
+    ):
+        # Pools for every node of either ring, by ring identity
+        self.shards: dict[str, Valkey] = {}
+        self.ring = self._build_ring(nodes, vnodes, connection_kwargs)
+        if not self.ring.nodes:
+            raise ValueError("Sharded Valkey mode needs at least one shard node")
+        self.previous_ring = (
+            self._build_ring(previous_nodes, vnodes, connection_kwargs) if previous_nodes else None
+        )
+        self._first = self.shards[self.ring.nodes[0]]
+
+    def _build_ring(self, nodes, vnodes: int, connection_kwargs: dict) -> HashRing:
+        weights: dict[str, int] = {}
+        for node in nodes:
+            name = shard_name(node)
+            if name not in self.shards:
+                self.shards[name] = Valkey(host=node["host"], port=node["port"], **connection_kwargs)
+            weights[name] = node.get("weight", 1)
+        return HashRing(weights, vnodes)
+
+    def _previous_owner(self, key) -> str | None:
+        """The key's owner on the previous ring, if it differs from the current one"""
+        if self.previous_ring is None:
+            return None
+        owner = self.previous_ring.get(key)
+        return owner if owner != self.ring.get(key) else None
+
+    def shard_for(self, key: str | bytes) -> Valkey:
+        return self.shards[self.ring.get(key)]
+
+    def group_by_shard(self, keys: Iterable[str | bytes]) -> dict[str, list]:
+        """Group keys by owning shard name, preserving order within each shard"""
+        groups: dict[str, list] = {}
+        for key in keys:
+            groups.setdefault(self.ring.get(key), []).append(key)
+        return groups
+
+    async def _per_shard(self, keys: Iterable, call) -> list:
+        groups = self.group_by_shard(keys)
+        return await asyncio.gather(
+            *(call(self.shards[name], shard_keys) for name, shard_keys in groups.items())
+        )
+
+    async def _on_all(self, command: str, *args, **kwargs) -> dict[str, Any]:
+        results = await asyncio.gather(
+            *(getattr(shard, command)(*args, **kwargs) for shard in self.shards.values())
+        )
+        return dict(zip(self.shards, results))
+
+    # --- multi-key commands, split per shard ---
+
+    async def _delete(self, command: str, keys) -> int:
+        if self.previous_ring is None:
+            return sum(await self._per_shard(keys, lambda shard, ks: getattr(shard, command)(*ks)))
+        # Migrating: remove both copies, counting each key once
+        targets: dict[str, list] = {}
+        for key in dict.fromkeys(keys):
+            targets.setdefault(self.ring.get(key), []).append(key)
+            previous = self._previous_owner(key)
+            if previous is not None:
+                targets.setdefault(previous, []).append(key)
+
+        async def _run(name, shard_keys):
+            pipe = self.shards[name].pipeline(transaction=False)
+            for key in shard_keys:
+                getattr(pipe, command)(key)
+            return zip(shard_keys, await pipe.execute())
+
+        deleted = set()
+        for results in await asyncio.gather(*(_run(n, ks) for n, ks in targets.items())):
+            deleted.update(key for key, count in results if count)
+        return len(deleted)
+
+    async def delete(self, *keys) -> int:
+        return await self._delete("delete", keys)
+
+    async def unlink(self, *keys) -> int:
+        return await self._delete("unlink", keys)
+
+    async def exists(self, *keys) -> int:
+        return sum(await self._per_shard(keys, lambda shard, ks: shard.exists(*ks)))
+
+    async def touch(self, *keys) -> int:
+        return sum(await self._per_shard(keys, lambda shard, ks: shard.touch(*ks)))
+
+    async def mget(self, keys, *args) -> list:
+        keys = [keys] if isinstance(keys, (str, bytes)) else list(keys)
+        keys.extend(args)
+        groups = self.group_by_shard(dict.fromkeys(keys))
+        values = await asyncio.gather(
+            *(self.shards[name].mget(shard_keys) for name, shard_keys in groups.items())
+        )
+        by_key = {}
+        for shard_keys, shard_values in zip(groups.values(), values):
+            by_key.update(zip(shard_keys, shard_values))
+        if self.previous_ring is not None:
+            fallback: dict[str, list] = {}
+            for key, value in by_key.items():
+                previous = self._previous_owner(key) if value is None else None
+                if previous is not None:
+                    fallback.setdefault(previous, []).append(key)
+            values = await asyncio.gather(
+                *(self.shards[name].mget(shard_keys) for name, shard_keys in fallback.items())
+            )
+            for shard_keys, shard_values in zip(fallback.values(), values):
+                by_key.update(zip(shard_keys, shard_values))
+        return [by_key[key] for key in keys]
+
+    async def get(self, key) -> Any:
+        value = await self.shard_for(key).get(key)
+        if value is None:
+            previous = self._previous_owner(key)
+            if previous is not None:
+                value = await self.shards[previous].get(key)
+        return value
+
+    async def mset(self, mapping: Mapping) -> bool:
+        results = await self._per_shard(
+            mapping, lambda shard, ks: shard.mset({key: mapping[key] for key in ks})
+        )
+        return all(results)
+
+    async def keys(self, pattern: str = "*", **kwargs) -> list:
+        results = await self._on_all("keys", pattern, **kwargs)
+        return [key for shard_keys in results.values() for key in shard_keys]
+
+    # --- keyless commands, run on every shard ---
+
+    async def ping(self, **kwargs) -> bool:
+        return all((await self._on_all("ping", **kwargs)).values())
+
+    async def flushdb(self, *args, **kwargs) -> bool:
+        return all((await self._on_all("flushdb", *args, **kwargs)).values())
+
+    async def dbsize(self) -> int:
+        return sum((await self._on_all("dbsize")).values())
+
+    async def eval(self, script: str, numkeys: int, *keys_and_args) -> Any:
+        """Scripts with keys run on the first key's shard; keyless scripts run everywhere."""
+        if numkeys:
+            return await self.shard_for(keys_and_args[0]).eval(script, numkeys, *keys_and_args)
+        return await self._on_all("eval", script, numkeys, *keys_and_args)
+
+    async def evalsha(self, sha: str, numkeys: int, *keys_and_args) -> Any:
+        if numkeys:
+            return await self.shard_for(keys_and_args[0]).evalsha(sha, numkeys, *keys_and_args)
+        return await self._on_all("evalsha", sha, numkeys, *keys_and_args)
+
+    async def fcall(self, function: str, numkeys: int, *keys_and_args) -> Any:
+        if numkeys:
+            return await self.shard_for(keys_and_args[0]).fcall(function, numkeys, *keys_and_args)
+        return await self._on_all("fcall", function, numkeys, *keys_and_args)
+
+    async def fcall_ro(self, function: str, numkeys: int, *keys_and_args) -> Any:
+        if numkeys:
+            return await self.shard_for(keys_and_args[0]).fcall_ro(function, numkeys, *keys_and_args)
+        return await self._on_all("fcall_ro", function, numkeys, *keys_and_args)
+
+    async def execute_command(self, *args, **options) -> Any:
+        command = str(args[0]).lower()
+        if len(args) > 1 and command not in _FAN_OUT_COMMANDS:
+            return await self.shard_for(args[1]).execute_command(*args, **options)
+        return await self._on_all("execute_command", *args, **options)
+
+    # --- pub/sub lives on the first shard ---
+
+    def pubsub(self, **kwargs):
+        return self._first.pubsub(**kwargs)
+
+    async def publish(self, channel, message, **kwargs) -> int:
+        return await self._first.publish(channel, message, **kwargs)
+
+    def pipeline(self, transaction: bool = True, shard_hint=None) -> "ShardedPipeline":
+        return ShardedPipeline(self, transaction)
+
+    async def aclose(self) -> None:
+        await asyncio.gather(*(shard.aclose() for shard in self.shards.values()))
+
+    close = aclose
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if name in _FAN_OUT_COMMANDS:
+            return lambda *args, **kwargs: self._on_all(name, *args, **kwargs)
+
+        def _routed(key, *args, **kwargs):
+            return getattr(self.shard_for(key), name)(key, *args, **kwargs)
+
+        return _routed
+
+
+class ShardedPipeline:
+    """
+    Pipeline over ShardedValkey: commands are routed by their first key, one
+    Valkey pipeline per shard, all shards executed concurrently. Results come
+    back in queue order. Multi-key commands must share a shard (hash tags).
+    """
+
+    def __init__(self, client: ShardedValkey, transaction: bool = True):
+        self._client = client
+        self._transaction = transaction
+        self._queue: list[tuple[str, str, tuple, dict]] = []
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def __await__(self):
+        async def _self():
+            return self
+        return _self().__await__()
+
+    async def __aenter__(self) -> "ShardedPipeline":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self._queue = []
+
+    def execute_command(self, *args, **kwargs) -> "ShardedPipeline":
+        shard = self._client.ring.get(args[1]) if len(args) > 1 else next(iter(self._client.shards))
+        self._queue.append((shard, "execute_command", args, kwargs))
+        return self
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        def _queued(key, *args, **kwargs):
+            self._queue.append((self._client.ring.get(key), name, (key, *args), kwargs))
+            return self
+
+        return _queued
+
+    async def execute(self, raise_on_error: bool = True) -> list:
+        queue, self._queue = self._queue, []
+        if not queue:
+            return []
+        positions: dict[str, list[int]] = {}
+        pipes = {}
+        for index, (shard, command, args, kwargs) in enumerate(queue):
+            pipe = pipes.get(shard)
+            if pipe is None:
+                pipe = pipes[shard] = self._client.shards[shard].pipeline(transaction=self._transaction)
+            getattr(pipe, command)(*args, **kwargs)
+            positions.setdefault(shard, []).append(index)
+        replies = await asyncio.gather(
+            *(pipe.execute(raise_on_error=raise_on_error) for pipe in pipes.values())
+        )
+        results: list[Any] = [None] * len(queue)
+        for shard, shard_results in zip(pipes, replies):
+            for index, result in zip(positions[shard], shard_results):
+                results[index] = result
+        return results
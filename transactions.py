@@ -0,0 +1,122 @@
+"""
+Optimistic transactions (WATCH/MULTI/EXEC) with a bounded retry loop.
+
+    async def _add_item(pipe):
+        cart = json.loads(await pipe.get("cart:{42}") or "[]")
+        pipe.multi()
+        pipe.set("cart:{42}", json.dumps(cart + [item]))
+
+    await client.transaction(_add_item, "cart:{42}")
+
+fn runs with the keys WATCHed: commands before pipe.multi() execute
+immediately (reads), commands after it are queued and sent with EXEC. If a
+watched key changes before EXEC, the server aborts the transaction and fn is
+run again on fresh data, after a full-jitter exponential backoff so competing
+writers spread out instead of colliding again. WatchError is raised once
+max_attempts is exhausted.
+
+ContentionTracker keeps bounded per-key attempt/conflict counts so the most
+contended keys and their conflict rates can be inspected, and exports
+attempts per namespace and outcome to Prometheus.
+"""
+
+import asyncio
+import inspect
+import random
+from collections.abc import Callable
+from typing import Any
+
+from valkey.exceptions import WatchError
+
+from .hotkeys import HotKeyTracker, SpaceSavingSketch
+from .metrics import get_transaction_attempts
+
+
+class ContentionTracker:
+    """
+    Per-key WATCH conflict counts, bounded to the `capacity` most active keys.
+
+    Args:
+        capacity: Keys tracked (Space-Saving counters)
+        export: Count attempts in Prometheus, by namespace and outcome
+    """
+
+    def __init__(self, capacity: int = 128, export: bool = True):
+        self.export = export
+        self._attempts = SpaceSavingSketch(capacity)
+        self._conflicts = SpaceSavingSketch(capacity)
+
+    def record(self, keys: tuple, outcome: str) -> None:
+        """outcome: "committed", "conflict" or "exhausted" """
+        for key in keys:
+            self._attempts.add(key)
+            if outcome != "committed":
+                self._conflicts.add(key)
+        if self.export and keys:
+            get_transaction_attempts().labels(HotKeyTracker.namespace_of(keys[0]), outcome).inc()
+
+    def conflicts(self, limit: int = 10) -> list[dict]:
+        """Most contended keys: [{"key", "conflicts", "attempts", "rate"}]"""
+        found = []
+        for key, conflicts, _ in self._conflicts.top(limit):
+            attempts = max(self._attempts.counts.get(key, conflicts), conflicts)
+            found.append({
+                "key": key,
+                "conflicts": round(conflicts),
+                "attempts": round(attempts),
+                "rate": conflicts / attempts,
+            })
+        return found
+
+    def reset(self) -> None:
+        self._attempts = SpaceSavingSketch(self._attempts.capacity)
+        self._conflicts = SpaceSavingSketch(self._conflicts.capacity)
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Full-jitter exponential backoff for the given (1-based) failed attempt."""
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+async def run_transaction(
+    pipeline: Callable[[], Any],
+    fn: Callable[[Any], Any],
+    watch_keys: tuple,
+    max_attempts: int = 5,
+    backoff_base: float = 0.005,
+    backoff_cap: float = 0.2,
+    value_from_callable: bool = False,
+    tracker: ContentionTracker | None = None,
+) -> Any:
+    """
+    Run fn inside WATCH/MULTI/EXEC until it commits or max_attempts is reached.
+
+    Args:
+        pipeline: Returns a new transactional pipeline on the node owning the keys
+        fn: fn(pipe), sync or async
+        watch_keys: Keys to WATCH
+        value_from_callable: Return fn's result instead of the EXEC results
+        tracker: Records attempts and conflicts per key
+    """
+    for attempt in range(1, max_attempts + 1):
+        async with pipeline() as pipe:
+            try:
+                if watch_keys:
+                    await pipe.watch(*watch_keys)
+                value = fn(pipe)
+                if inspect.isawaitable(value):
+                    value = await value
+                results = await pipe.execute()
+            except WatchError:
+                if attempt == max_attempts:
+                    if tracker is not None:
+                        tracker.record(watch_keys, "exhausted")
+                    raise
+                if tracker is not None:
+                    tracker.record(watch_keys, "conflict")
+            else:
+                if tracker is not None:
+                    tracker.record(watch_keys, "committed")
+                return value if value_from_callable else results
+        # Outside the pipeline block: its connection is back in the pool while we wait
+        await asyncio.sleep(backoff_delay(attempt, backoff_base, backoff_cap))